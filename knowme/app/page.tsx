@@ -7,7 +7,8 @@ interface RepoProfile {
   skills: string[];
   intentions: string[];
   interests: string[];
-  evidence_ids: string[];
+  evidence_ids?: string[];
+  evidence_count?: number; // --compact output carries the count instead of the ids
 }
 
 interface Consensus {
@@ -209,7 +210,7 @@ export default function Home() {
                     </div>
                     <div className="flex items-center gap-1 text-white/30 text-xs font-mono">
                       <GitBranch className="h-3 w-3" />
-                      {profile.evidence_ids.length} evidence
+                      {profile.evidence_count ?? profile.evidence_ids?.length ?? 0} evidence
                     </div>
                   </div>
 
@@ -0,0 +1,318 @@
+from __future__ import annotations
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from repo_mesh.context import estimate_tokens
+from repo_mesh.contracts import AgentPolicy, DiscussionOptions, RepoProfile, RepoRegistration
+from repo_mesh.coordinator import _map_guarded
+from repo_mesh.evidence import MODEL, _collect_repo_text
+from repo_mesh.transport import estimate_request_tokens, get_transport
+
+# Owner agents (one per repo, run concurrently) report structured findings; a
+# mediator reconciles them and may ask follow-up questions, which only the
+# owners of the repos involved answer. Every call draws on one shared
+# TokenBudgetScheduler, so a run never exceeds its token or time budget.
+
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+_OWNER_PROMPT = "repo_owner_codex.prompt.md"
+_MEDIATOR_PROMPT = "cross_repo_mediator_codex.prompt.md"
+FINDING_FIELDS = ("skills", "intentions", "interests")
+_MAX_VALUE_CHARS = 120
+
+
+def load_policy(policy_yaml: str) -> AgentPolicy:
+    import yaml
+
+    return AgentPolicy(**(yaml.safe_load(Path(policy_yaml).read_text(encoding="utf-8")) or {}))
+
+
+def _prompt(name: str) -> str:
+    return (PROMPTS_DIR / name).read_text(encoding="utf-8").strip()
+
+
+class TokenBudgetScheduler:
+    """Global token and wall-clock budget for one discussion.
+
+    Each call reserves its estimated input plus max output tokens before it
+    starts and settles to actual usage afterwards; a call that does not fit,
+    or would start after the deadline, is cancelled instead. Follow-up
+    questions are admitted highest value first, so when the budget runs short
+    the low-value ones are the ones dropped.
+    """
+
+    def __init__(self, token_budget: int, deadline_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.token_budget = token_budget
+        self._clock = clock
+        self._deadline = clock() + deadline_s
+        self._lock = threading.Lock()
+        self._reserved = 0
+        self.used = 0
+        self.calls = 0
+        self.cancelled: list[dict] = []
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self.token_budget - self.used - self._reserved
+
+    def time_left(self) -> float:
+        return self._deadline - self._clock()
+
+    def reserve(self, tokens: int) -> str | None:
+        """Reserve tokens for one call; None on success, else why it cannot run."""
+        if self.time_left() <= 0:
+            return "deadline"
+        with self._lock:
+            if self.used + self._reserved + tokens > self.token_budget:
+                return "budget"
+            self._reserved += tokens
+            self.calls += 1
+        return None
+
+    def settle(self, reserved: int, used: int) -> None:
+        with self._lock:
+            self._reserved -= reserved
+            self.used += used
+
+    def cancel(self, kind: str, reason: str, **detail) -> None:
+        with self._lock:
+            self.cancelled.append({"kind": kind, "reason": reason, **detail})
+
+    def admit(self, questions: list["Question"], cost: Callable[["Question"], int], limit: int) -> list["Question"]:
+        """Highest-value questions whose estimated cost fits what is left; the rest are cancelled."""
+        left = self.remaining()
+        admitted: list[Question] = []
+        for question in sorted(questions, key=lambda q: -q.value):
+            if question.value <= 0:
+                self.cancel("question", "low value", question=question.text)
+            elif len(admitted) >= limit:
+                self.cancel("question", "question limit", question=question.text)
+            elif self.time_left() <= 0:
+                self.cancel("question", "deadline", question=question.text)
+            elif cost(question) > left:
+                self.cancel("question", "budget", question=question.text)
+            else:
+                left -= cost(question)
+                admitted.append(question)
+        return admitted
+
+
+@dataclass(frozen=True)
+class Question:
+    text: str
+    repos: tuple[str, ...]
+    value: float  # higher is asked first; conflict-backed questions rank above the rest
+
+
+def _clean_list(value: object) -> list[str]:
+    """Short single-line strings only: derived labels, never code or file contents."""
+    if not isinstance(value, list):
+        return []
+    out = []
+    for item in value:
+        if isinstance(item, str) and "\n" not in item and item.strip() and len(item) <= _MAX_VALUE_CHARS:
+            out.append(item.strip())
+    return out
+
+
+def derived_findings(findings: dict[str, dict], policy: AgentPolicy) -> list[dict]:
+    """What the mediator may see of each owner's findings under the sharing policy.
+
+    derived_only keeps skill/intention/interest labels and drops everything
+    else an owner returned (evidence refs, snippets, free text).
+    """
+    rows = []
+    for repo_id, finding in findings.items():
+        row = {"repo_id": repo_id, **{field: _clean_list(finding.get(field)) for field in FINDING_FIELDS}}
+        if policy.cross_repo_share_mode != "derived_only":
+            row["evidence_refs"] = _clean_list(finding.get("evidence_refs"))
+        rows.append(row)
+    return rows
+
+
+def _parse_json(response) -> dict:
+    text = "".join(getattr(block, "text", "") for block in response.content if block.type == "text")
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("model reply has no JSON object")
+    data = json.loads(text[start:end + 1])
+    if not isinstance(data, dict):
+        raise ValueError("model reply is not a JSON object")
+    return data
+
+
+def _request(system: str, user: str, options: DiscussionOptions) -> dict:
+    return {
+        "model": MODEL,
+        "max_tokens": options.max_output_tokens,
+        "system": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": user}],
+    }
+
+
+def _cost(params: dict) -> int:
+    return estimate_request_tokens(params) + params["max_tokens"]
+
+
+def _call(scheduler: TokenBudgetScheduler, params: dict, kind: str, **detail) -> dict | None:
+    """One model call under the budget; None if it was cancelled."""
+    cost = _cost(params)
+    reason = scheduler.reserve(cost)
+    if reason is not None:
+        scheduler.cancel(kind, reason, **detail)
+        return None
+    response = None
+    try:
+        response = get_transport().create(params)
+        return _parse_json(response)
+    finally:
+        usage = getattr(response, "usage", None)
+        used = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+        scheduler.settle(cost, used if usage is not None else 0)
+
+
+def _owner_request(
+    repo: RepoRegistration,
+    profile: RepoProfile | None,
+    policy: AgentPolicy,
+    options: DiscussionOptions,
+    previous: dict | None = None,
+    questions: list[str] | None = None,
+) -> dict:
+    parts = [f"REPO_ID: {repo.repo_id}", f"NAME: {repo.display_name}"]
+    if profile is not None:
+        hints = {field: getattr(profile, field) for field in FINDING_FIELDS}
+        parts.append(f"LOCAL PROFILE (keyword/model extraction):\n{json.dumps(hints)}")
+    if policy.allow_code_read:
+        parts.append(f"REPOSITORY CONTENT:\n{_collect_repo_text(repo.local_path, options.owner_context_tokens)}")
+    if previous is not None:
+        parts.append(f"YOUR PREVIOUS FINDINGS:\n{json.dumps(previous)}")
+    if questions:
+        listed = "\n".join(f"- {q}" for q in questions)
+        parts.append(f"MEDIATOR QUESTIONS (answer by returning updated findings):\n{listed}")
+    return _request(_prompt(_OWNER_PROMPT), "\n\n".join(parts), options)
+
+
+def _mediator_request(findings: dict[str, dict], policy: AgentPolicy, options: DiscussionOptions) -> dict:
+    user = f"OWNER FINDINGS:\n{json.dumps(derived_findings(findings, policy), indent=1)}"
+    return _request(_prompt(_MEDIATOR_PROMPT), user, options)
+
+
+def _names_repo(text: str, repo_id: str) -> bool:
+    """Whole-id match: "a" is not named by "caching" or "repo-a"."""
+    return re.search(rf"(?<![\w-]){re.escape(repo_id)}(?![\w-])", text) is not None
+
+
+def _questions(mediation: dict, known: set[str]) -> list[Question]:
+    """next_questions resolved to the repos (with findings) that should answer them."""
+    conflicted = [set(c.get("repos") or []) for c in mediation.get("conflicts") or [] if isinstance(c, dict)]
+    out = []
+    for raw in mediation.get("next_questions") or []:
+        if isinstance(raw, dict):
+            text = str(raw.get("question", ""))
+            repos = [r for r in raw.get("repos") or [] if r in known]
+        else:
+            text = str(raw)
+            repos = [r for r in sorted(known) if _names_repo(text, r)]  # bare-string questions name their repos
+        if not text or not repos:
+            continue
+        value = 1.0 + sum(1.0 for group in conflicted if group & set(repos))
+        out.append(Question(text, tuple(dict.fromkeys(repos)), value))
+    return out
+
+
+def run_discussion(
+    repos: list[RepoRegistration],
+    profiles: dict[str, RepoProfile] | None = None,
+    policy: AgentPolicy | None = None,
+    options: DiscussionOptions | None = None,
+    max_workers: int = 4,
+    clock: Callable[[], float] = time.monotonic,
+) -> dict:
+    """Owner agents for every repo, then the mediator, then budgeted follow-up rounds.
+
+    Owners run concurrently (max_workers) and see their own repo; the
+    mediator sees only derived_findings. Each follow-up round admits the
+    mediator's most valuable next_questions that fit the remaining budget,
+    asks only the owners of the repos involved, and re-runs the mediator on
+    the updated findings. Calls that fail or are cancelled are recorded, not
+    raised.
+    """
+    policy = policy or AgentPolicy()
+    options = options or DiscussionOptions()
+    profiles = profiles or {}
+    if policy.repo_access_mode != "read_only":
+        raise ValueError("owner agents only run with repo_access_mode=read_only")
+    scheduler = TokenBudgetScheduler(options.token_budget, options.deadline_s, clock)
+    by_id = {repo.repo_id: repo for repo in repos}
+    findings: dict[str, dict] = {}
+    errors: list[dict] = []
+    rounds: list[dict] = []
+
+    owner_costs: dict[str, int] = {}
+
+    def ask_owner(ask: tuple[RepoRegistration, list[str] | None]) -> dict | None:
+        repo, questions = ask
+        params = _owner_request(
+            repo, profiles.get(repo.repo_id), policy, options, findings.get(repo.repo_id), questions
+        )
+        owner_costs[repo.repo_id] = _cost(params)
+        return _call(scheduler, params, "owner", repo_id=repo.repo_id)
+
+    def ask_owners(asks: list[tuple[RepoRegistration, list[str] | None]]) -> list[str]:
+        answered = []
+        for (repo, _), result in zip(asks, _map_guarded(ask_owner, asks, max_workers)):
+            if isinstance(result, Exception):
+                errors.append({"repo_id": repo.repo_id, "error": f"{type(result).__name__}: {result}"})
+            elif result is not None:
+                findings[repo.repo_id] = {**result, "repo_id": repo.repo_id}
+                answered.append(repo.repo_id)
+        return answered
+
+    def mediate() -> dict | None:
+        try:
+            return _call(scheduler, _mediator_request(findings, policy, options), "mediator")
+        except Exception as exc:
+            errors.append({"repo_id": None, "error": f"mediator: {type(exc).__name__}: {exc}"})
+            return None
+
+    rounds.append({"round": 0, "owners": ask_owners([(repo, None) for repo in repos])})
+    mediation = mediate() if findings else None
+    for round_no in range(1, options.follow_up_rounds + 1):
+        if mediation is None:
+            break
+        questions = _questions(mediation, set(findings))
+        if not questions:
+            break
+        # a follow-up resends the owner's context plus its findings and the questions
+        mediator_cost = _cost(_mediator_request(findings, policy, options))
+        owner_cost = {
+            repo_id: owner_costs[repo_id] + estimate_tokens(json.dumps(finding))
+            for repo_id, finding in findings.items()
+        }
+        admitted = scheduler.admit(
+            questions,
+            lambda q: sum(owner_cost[r] + estimate_tokens(q.text) for r in q.repos) + mediator_cost,
+            options.max_questions,
+        )
+        if not admitted:
+            break
+        asked: dict[str, list[str]] = {}
+        for question in admitted:
+            for repo_id in question.repos:
+                asked.setdefault(repo_id, []).append(question.text)
+        answered = ask_owners([(by_id[repo_id], texts) for repo_id, texts in asked.items()])
+        rounds.append({"round": round_no, "questions": [q.text for q in admitted], "owners": answered})
+        mediation = mediate() or mediation
+
+    return {
+        "findings": derived_findings(findings, policy),
+        "mediation": mediation,
+        "rounds": rounds,
+        "cancelled": scheduler.cancelled,
+        "errors": errors,
+        "budget": {"token_budget": options.token_budget, "tokens_used": scheduler.used, "calls": scheduler.calls},
+    }
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable
+from repo_mesh import metrics
+from repo_mesh.cache import EvidenceCache
+from repo_mesh.contracts import EvidenceItem, ExtractionOptions, RepoRegistration
+from repo_mesh.evidence import (
+    _Chunk,
+    _build_extraction_request,
+    _candidate_skills,
+    _collect_chunks,
+    _extraction_cache_key,
+    _merge_tool_calls,
+    _tool_inputs,
+)
+from repo_mesh.llm import get_client
+from repo_mesh.skill_index import get_skill_index
+
+
+def batch_state_path_for(out_json: str) -> str:
+    out = Path(out_json)
+    return str(out.with_name(f"{out.stem}.batch.json"))
+
+
+def _custom_id(idx: int, chunk_idx: int, repo_id: str) -> str:
+    # Batch custom_ids must match ^[a-zA-Z0-9_-]{1,64}$
+    return f"r{idx}c{chunk_idx}-{re.sub(r'[^A-Za-z0-9_-]', '_', repo_id)}"[:64]
+
+
+def _save_state(path: str, state: dict) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    Path(tmp).write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _load_state(path: str) -> dict | None:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _wait_for_batch(
+    client, batch_id: str, poll_interval: float, max_poll_interval: float, sleep: Callable[[float], None]
+) -> None:
+    delay = poll_interval
+    while client.messages.batches.retrieve(batch_id).processing_status != "ended":
+        sleep(delay)
+        delay = min(delay * 1.5, max_poll_interval)
+
+
+def extract_batch(
+    repos: list[RepoRegistration],
+    state_path: str,
+    cache: EvidenceCache | None = None,
+    refresh: bool = False,
+    options: ExtractionOptions | None = None,
+    poll_interval: float = 10.0,
+    max_poll_interval: float = 300.0,
+    sleep: Callable[[float], None] | None = None,
+) -> dict[str, list[EvidenceItem] | Exception]:
+    """Extract evidence for many repos through one Message Batches job.
+
+    Cached repos are answered locally; every chunk of the rest becomes one
+    request in a single batch whose id and custom_id -> (repo, chunk) mapping
+    are written to state_path before polling. If state_path already names a
+    batch (a previous run crashed mid-poll) that batch is resumed instead of
+    resubmitted, and only repos it does not cover go into a new batch. Results
+    are merged and validated exactly as in extract_repo_evidence and keyed by
+    repo_id; a repo with any failed chunk is reported as an error.
+    """
+    options = options or ExtractionOptions()
+    index = get_skill_index()
+    results: dict[str, list[EvidenceItem] | Exception] = {}
+    pending: dict[str, dict] = {}
+    for idx, repo in enumerate(repos):
+        try:
+            if not Path(repo.local_path).exists():
+                raise FileNotFoundError(repo.local_path)
+            chunks = _collect_chunks(repo.local_path, options)
+        except Exception as exc:
+            results[repo.repo_id] = exc
+            continue
+        if not chunks:
+            results[repo.repo_id] = []
+            continue
+        key = _extraction_cache_key(repo.repo_id, repo.local_path, chunks, index, options)
+        if cache and not refresh:
+            cached = cache.get(key)
+            metrics.count("cache_hits" if cached is not None else "cache_misses")
+            if cached is not None:
+                results[repo.repo_id] = cached
+                continue
+        candidates = _candidate_skills(chunks, index, options)
+        pending[repo.repo_id] = {
+            "cache_key": key,
+            "candidates": candidates,
+            "chunks": [
+                {
+                    "custom_id": _custom_id(idx, j, repo.repo_id),
+                    "refs": list(chunk.refs),
+                    "params": _build_extraction_request(
+                        repo.repo_id, chunk.text, index, candidates, options.other_skills
+                    ),
+                }
+                for j, chunk in enumerate(chunks)
+            ],
+        }
+
+    client = get_client()
+    while pending:
+        state = _load_state(state_path)
+        if state is None:
+            batch = client.messages.batches.create(
+                requests=[
+                    {"custom_id": c["custom_id"], "params": c["params"]}
+                    for p in pending.values()
+                    for c in p["chunks"]
+                ]
+            )
+            state = {
+                "batch_id": batch.id,
+                "repos": {
+                    repo_id: {
+                        "cache_key": p["cache_key"],
+                        "candidates": p["candidates"],
+                        "chunks": {c["custom_id"]: c["refs"] for c in p["chunks"]},
+                    }
+                    for repo_id, p in pending.items()
+                },
+            }
+            _save_state(state_path, state)
+
+        _wait_for_batch(client, state["batch_id"], poll_interval, max_poll_interval, sleep or time.sleep)
+        owner = {cid: repo_id for repo_id, meta in state["repos"].items() for cid in meta["chunks"]}
+        calls: dict[str, dict[str, list[dict]]] = {}
+        failed: dict[str, str] = {}
+        for entry in client.messages.batches.results(state["batch_id"]):
+            repo_id = owner.get(entry.custom_id)
+            if repo_id is None or repo_id not in pending:
+                continue
+            if entry.result.type != "succeeded":
+                failed[repo_id] = entry.result.type
+                continue
+            calls.setdefault(repo_id, {})[entry.custom_id] = _tool_inputs(entry.result.message.content)
+
+        for repo_id, meta in state["repos"].items():
+            if repo_id not in pending:
+                continue
+            pending.pop(repo_id)
+            got = calls.get(repo_id, {})
+            if repo_id in failed:
+                results[repo_id] = RuntimeError(f"batch request {failed[repo_id]}")
+            elif set(got) != set(meta["chunks"]):
+                results[repo_id] = RuntimeError("batch returned no result")
+            else:
+                chunk_calls = [(_Chunk("", tuple(refs)), got[cid]) for cid, refs in meta["chunks"].items()]
+                items = _merge_tool_calls(
+                    repo_id, chunk_calls, index, meta["candidates"], options.other_skills
+                )
+                if cache:
+                    cache.put(meta["cache_key"], items)
+                results[repo_id] = items
+        Path(state_path).unlink(missing_ok=True)
+
+    return results
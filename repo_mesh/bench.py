@@ -0,0 +1,236 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import yaml
+
+from repo_mesh.cache import cache_key
+from repo_mesh.contracts import RepoProfile
+from repo_mesh.coordinator import run_once
+from repo_mesh.discussion import synthesize_profiles
+from repo_mesh.evidence import _collect_repo_text, _fallback_extract
+from repo_mesh.profile import build_repo_profile
+from repo_mesh.transport import TransportLimits, configure_transport
+
+RESULTS_VERSION = 1
+
+# Words drawn into generated files; the phrases hit the keyword classifier
+# and the skill matcher so fallback extraction does representative work.
+_VOCAB = (
+    "data user value build return import class def const function state props request "
+    "response config handler model train test deploy query index cache server client"
+).split()
+_PHRASES = [
+    "machine learning", "react component", "docker compose", "next.js app", "rest api",
+    "unit tests", "data pipeline", "typescript types", "ci/cd", "learn", "tutorial", "prototype",
+]
+_SOURCE_SUFFIXES = [".py", ".ts", ".tsx", ".js", ".md", ".txt", ".yaml"]
+
+
+@dataclass(frozen=True)
+class WorkspaceSpec:
+    repos: int = 8
+    files: int = 120                  # authored files per repo (before notebooks/blobs)
+    median_bytes: int = 2_000         # log-normal file size distribution
+    size_sigma: float = 1.0
+    notebook_ratio: float = 0.05
+    binary_ratio: float = 0.05
+    node_modules_files: int = 200     # per repo, under a nested node_modules tree
+    seed: int = 0
+
+
+def _text(rng: random.Random, size: int) -> str:
+    out: list[str] = []
+    n = 0
+    while n < size:
+        word = rng.choice(_PHRASES) if rng.random() < 0.03 else rng.choice(_VOCAB)
+        out.append(word)
+        n += len(word) + 1
+        if rng.random() < 0.1:
+            out.append("\n")
+    return " ".join(out)[:size]
+
+
+def _notebook(rng: random.Random, size: int) -> str:
+    cells = [
+        {"cell_type": "code" if i % 2 else "markdown", "metadata": {}, "source": _text(rng, size // 4).splitlines()}
+        for i in range(4)
+    ]
+    return json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5})
+
+
+def generate_workspace(root: str, spec: WorkspaceSpec) -> str:
+    """Write spec.repos synthetic repos under root and return the repos.yaml path.
+
+    Generation is deterministic for a given spec, so timings from different
+    machines or commits are measured against identical inputs.
+    """
+    rng = random.Random(spec.seed)
+    base = Path(root)
+    registrations = []
+    for r in range(spec.repos):
+        repo_id = f"repo{r:03d}"
+        repo = base / repo_id
+        (repo / "src").mkdir(parents=True, exist_ok=True)
+        (repo / "README.md").write_text(f"# {repo_id}\n{_text(rng, spec.median_bytes)}\n", encoding="utf-8")
+        (repo / "package.json").write_text(json.dumps({"name": repo_id, "dependencies": {"react": "^18"}}))
+        for f in range(spec.files):
+            size = max(16, int(rng.lognormvariate(0, spec.size_sigma) * spec.median_bytes))
+            folder = repo / "src" / f"pkg{f % 10}"
+            folder.mkdir(exist_ok=True)
+            roll = rng.random()
+            if roll < spec.binary_ratio:
+                (folder / f"blob{f}.bin").write_bytes(b"\0" + rng.randbytes(size))
+            elif roll < spec.binary_ratio + spec.notebook_ratio:
+                (folder / f"nb{f}.ipynb").write_text(_notebook(rng, size), encoding="utf-8")
+            else:
+                suffix = rng.choice(_SOURCE_SUFFIXES)
+                (folder / f"file{f}{suffix}").write_text(_text(rng, size), encoding="utf-8")
+        for f in range(spec.node_modules_files):
+            dep = repo / "node_modules" / f"dep{f % 20}" / "lib"
+            dep.mkdir(parents=True, exist_ok=True)
+            (dep / f"index{f}.js").write_text(_text(rng, 512), encoding="utf-8")
+        registrations.append({
+            "repo_id": repo_id,
+            "display_name": repo_id,
+            "github_full_name": f"bench/{repo_id}",
+            "local_path": str(repo),
+            "selected": True,
+            "read_only": True,
+        })
+    repos_yaml = base / "repos.yaml"
+    repos_yaml.write_text(yaml.safe_dump({"repos": registrations}), encoding="utf-8")
+    return str(repos_yaml)
+
+
+def _stub_send(params: dict, timeout: float) -> SimpleNamespace:
+    """Offline stand-in for the Messages API: fixed skills, no latency."""
+    calls = [
+        {"skill_name": name, "signal_type": "functionality", "summary": f"{name} in repo", "confidence": 0.8}
+        for name in ("Python", "JavaScript", "Machine learning")
+    ]
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="tool_use", name="record_skill_evidence", input=c) for c in calls],
+        usage=SimpleNamespace(input_tokens=0, output_tokens=0, cache_creation_input_tokens=0, cache_read_input_tokens=0),
+    )
+
+
+def _time(fn: Callable[[], object], repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {"runs_s": [round(r, 6) for r in runs], "min_s": round(min(runs), 6), "median_s": round(statistics.median(runs), 6)}
+
+
+def run_scenarios(repos_yaml: str, workdir: str, repeat: int = 3, max_workers: int = 4) -> dict[str, dict]:
+    registrations = yaml.safe_load(Path(repos_yaml).read_text(encoding="utf-8"))["repos"]
+    paths = [(r["repo_id"], r["local_path"]) for r in registrations]
+    evidence = [_fallback_extract(repo_id, path) for repo_id, path in paths]
+    # replicate so the in-memory stages run long enough to time reliably
+    evidence_many = evidence * max(1, 2_000 // max(1, len(evidence)))
+    base_profiles = [build_repo_profile(repo_id, ev) for (repo_id, _), ev in zip(paths, evidence)]
+    profiles = [
+        RepoProfile(f"{p.repo_id}-{i}", p.skills, p.intentions, p.interests, p.evidence_ids)
+        for i in range(max(1, 2_000 // max(1, len(base_profiles))))
+        for p in base_profiles
+    ]
+
+    def run_model() -> None:
+        previous = os.environ.get("ANTHROPIC_API_KEY")
+        os.environ["ANTHROPIC_API_KEY"] = "bench"
+        configure_transport(TransportLimits(0, 0, 0, max_in_flight=64), send=_stub_send)
+        try:
+            run_once(repos_yaml, str(Path(workdir) / "model.json"), max_workers=max_workers,
+                     use_cache=False, incremental=False)
+        finally:
+            configure_transport()
+            if previous is None:
+                os.environ.pop("ANTHROPIC_API_KEY", None)
+            else:
+                os.environ["ANTHROPIC_API_KEY"] = previous
+
+    def run_fallback() -> None:
+        previous = os.environ.pop("ANTHROPIC_API_KEY", None)
+        try:
+            run_once(repos_yaml, str(Path(workdir) / "fallback.json"), max_workers=max_workers,
+                     use_cache=False, incremental=False)
+        finally:
+            if previous is not None:
+                os.environ["ANTHROPIC_API_KEY"] = previous
+
+    scenarios: dict[str, Callable[[], object]] = {
+        "collect_repo_text": lambda: [_collect_repo_text(path) for _, path in paths],
+        "fallback_extract": lambda: [_fallback_extract(repo_id, path) for repo_id, path in paths],
+        "build_repo_profile": lambda: [build_repo_profile("r", ev) for ev in evidence_many],
+        "synthesize_profiles": lambda: synthesize_profiles(profiles),
+        "run_once_fallback": run_fallback,
+        "run_once_stub_model": run_model,
+    }
+    return {name: _time(fn, repeat) for name, fn in scenarios.items()}
+
+
+def compare(results: dict, baseline: dict, threshold: float = 1.2) -> dict[str, dict]:
+    """Per-scenario median ratio against a baseline results file; >threshold is a regression."""
+    out = {}
+    for name, row in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base["median_s"]:
+            continue
+        ratio = row["median_s"] / base["median_s"]
+        out[name] = {"baseline_median_s": base["median_s"], "ratio": round(ratio, 3), "regression": ratio > threshold}
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark repo_mesh on a synthetic workspace")
+    defaults = WorkspaceSpec()
+    parser.add_argument("--workdir", required=True, help="Directory for the generated workspace (reused if present)")
+    parser.add_argument("--out", default=None, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Median ratio counted as a regression")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=4)
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+
+    spec = WorkspaceSpec(**{field: getattr(args, field) for field in asdict(defaults)})
+    workspace = Path(args.workdir) / f"ws-{cache_key(json.dumps(asdict(spec), sort_keys=True))[:12]}"
+    repos_yaml = workspace / "repos.yaml"
+    if not repos_yaml.exists():
+        generate_workspace(str(workspace), spec)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "spec": asdict(spec),
+        "scenarios": run_scenarios(str(repos_yaml), str(workspace), args.repeat, args.max_workers),
+    }
+    regressed = False
+    if args.baseline:
+        results["comparison"] = compare(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+        regressed = any(row["regression"] for row in results["comparison"].values())
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from repo_mesh.contracts import EvidenceItem
+
+DEFAULT_CACHE_DIR = str(Path(__file__).parent / "output" / "cache")
+# Writes between full directory sweeps (expired entries, other processes' writes).
+SWEEP_EVERY = 500
+
+
+def cache_key(*parts: str) -> str:
+    """Content address for a cache entry; parts are hashed in order."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class EvidenceCache:
+    """On-disk store of extraction results keyed by content hash.
+
+    Entries older than max_age_seconds are dropped on read. Entry count and
+    size are tracked in memory, so a write only scans the directory when the
+    store exceeds max_entries or max_bytes (evicting the least recently used
+    entries) or every SWEEP_EVERY writes.
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_CACHE_DIR,
+        max_entries: int = 5000,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ) -> None:
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._count: int | None = None  # unknown until the first scan
+        self._bytes = 0
+        self._writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> list[EvidenceItem] | None:
+        """Stored items, or None on a miss; unreadable or malformed entries are removed."""
+        path = self._path(key)
+        try:
+            st = path.stat()
+            if time.time() - st.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                self._forget(st.st_size)
+                return None
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)  # refresh recency for LRU eviction
+        except (OSError, ValueError):
+            return None
+        try:
+            # repo_id and signal_type repeat across items; share one string each
+            for item in raw:
+                item["repo_id"] = sys.intern(item["repo_id"])
+                item["signal_type"] = sys.intern(item["signal_type"])
+            return [EvidenceItem(**item) for item in raw]
+        except (TypeError, KeyError, AttributeError):
+            # valid JSON of another shape, e.g. from an older schema
+            path.unlink(missing_ok=True)
+            self._forget(st.st_size)
+            return None
+
+    def put(self, key: str, items: list[EvidenceItem]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            old_size: int | None = path.stat().st_size
+        except OSError:
+            old_size = None
+        data = json.dumps([asdict(item) for item in items]).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._writes += 1
+            if self._count is None or self._writes % SWEEP_EVERY == 0:
+                self._evict_locked()
+                return
+            self._count += old_size is None
+            self._bytes += len(data) - (old_size or 0)
+            if self._count > self.max_entries or self._bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _forget(self, size: int) -> None:
+        with self._lock:
+            if self._count is not None:
+                self._count -= 1
+                self._bytes -= size
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Full scan: drop expired entries, then LRU ones until within limits; resyncs the tallies."""
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for mtime, size, path in entries:
+            expired = now - mtime > self.max_age_seconds
+            if not expired and count <= self.max_entries and total <= self.max_bytes:
+                continue
+            path.unlink(missing_ok=True)
+            count -= 1
+            total -= size
+        self._count, self._bytes = count, total
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.root.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+            self._count, self._bytes = 0, 0
@@ -1,14 +1,345 @@
 from __future__ import annotations
 import argparse
-from repo_mesh.coordinator import run_once
+import sys
+from pathlib import Path
 
+# Only argparse is imported up front: yaml, the extraction pipeline and the
+# SDK load inside the subcommands that use them, so --help and the config
+# commands start fast (see tests/repo_mesh/test_cli_startup.py).
+DEFAULT_POLICY_YAML = str(Path(__file__).parent / "config" / "policy.yaml")
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Run human-centered repo agent mesh once")
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--repos", required=True, help="Path to repos.yaml")
+    parser.add_argument("--out", required=True, help="Path to output JSON")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=4,
+        help="Number of repos to extract concurrently (default: 4)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the evidence cache")
+    parser.add_argument("--cache-dir", default=None, help="Evidence cache directory")
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="Split large repos into token-budgeted windows extracted in parallel and merged per skill",
+    )
+    parser.add_argument("--max-chunks", type=int, default=8, help="Per-repo ceiling on chunks in --chunked mode")
+    parser.add_argument("--chunk-tokens", type=int, default=6000, help="Approximate tokens per chunk")
+    parser.add_argument(
+        "--candidate-skills",
+        type=int,
+        default=0,
+        help="Send only the N taxonomy skills that best match each repo lexically (default: full taxonomy)",
+    )
+    parser.add_argument(
+        "--other-skills",
+        type=int,
+        default=5,
+        help="With --candidate-skills, how many skills outside the shortlist the model may still record",
+    )
+    parser.add_argument(
+        "--offline-extractor",
+        choices=["keywords", "lexical"],
+        default="keywords",
+        help="Extractor used when ANTHROPIC_API_KEY is not set",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream single-window model responses and build profiles as skills arrive",
+    )
+    parser.add_argument("--rpm", type=int, default=50, help="Model requests per minute (0: unlimited)")
+    parser.add_argument("--itpm", type=int, default=40_000, help="Model input tokens per minute (0: unlimited)")
+    parser.add_argument("--otpm", type=int, default=8_000, help="Model output tokens per minute (0: unlimited)")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Ceiling on concurrent model requests")
+    parser.add_argument("--request-timeout", type=float, default=120.0, help="Seconds per model request attempt")
+    _add_output_arguments(parser)
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--shared-threshold", type=int, default=2, help="Repos a skill or intention needs to count as shared"
+    )
+    parser.add_argument("--neighbors", type=int, default=0, help="Similar/complementary repos per repo (default 0: off)")
+    parser.add_argument("--similarity", choices=["jaccard", "cosine"], default="jaccard")
+    parser.add_argument(
+        "--compact", action="store_true", help="Write minified output with per-profile evidence counts instead of ids"
+    )
+
+
+def _shard(text: str) -> tuple[int, int]:
+    from repo_mesh.shard import parse_shard
+
+    return parse_shard(text)
+
+
+def _configure(args: argparse.Namespace) -> "ExtractionOptions":
+    """Install the transport limits from args and return the extraction options."""
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.transport import TransportLimits, configure_transport
+
+    configure_transport(
+        TransportLimits(
+            requests_per_minute=args.rpm,
+            input_tokens_per_minute=args.itpm,
+            output_tokens_per_minute=args.otpm,
+            max_in_flight=args.max_in_flight,
+            timeout=args.request_timeout,
+        )
+    )
+    return ExtractionOptions(
+        chunked=args.chunked,
+        max_chunks=args.max_chunks,
+        chunk_tokens=args.chunk_tokens,
+        candidate_skills=args.candidate_skills,
+        other_skills=args.other_skills,
+        fallback=args.offline_extractor,
+        stream=args.stream,
+    )
+
+
+def _consensus(args: argparse.Namespace) -> "ConsensusOptions":
+    from repo_mesh.contracts import ConsensusOptions
+
+    return ConsensusOptions(
+        shared_threshold=args.shared_threshold, neighbors=args.neighbors, similarity=args.similarity
+    )
+
+
+def _watch_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="repo_mesh watch", description="Keep the output JSON up to date as repos change"
+    )
+    _add_common_arguments(parser)
+    parser.add_argument("--debounce", type=float, default=1.0, help="Quiet seconds before re-profiling (default: 1)")
+    parser.add_argument("--max-delay", type=float, default=10.0, help="Upper bound on debounce during constant churn")
+    parser.add_argument("--backend", choices=["auto", "inotify", "poll"], default="auto", help="File change source")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between scans with --backend poll")
+    args = parser.parse_args(argv)
+    from repo_mesh.watch import watch
+
+    options = _configure(args)
+    try:
+        watch(
+            args.repos,
+            args.out,
+            debounce=args.debounce,
+            max_delay=args.max_delay,
+            backend=args.backend,
+            poll_interval=args.poll_interval,
+            max_workers=args.max_workers,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            options=options,
+            consensus=_consensus(args),
+            compact=args.compact,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def _repos_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="repo_mesh repos", description="List the selected repos")
+    parser.add_argument("--repos", required=True, help="Path to repos.yaml")
+    args = parser.parse_args(argv)
+    from repo_mesh.repo_loader import selected_registrations
+
+    for repo in selected_registrations(args.repos):
+        status = "ok" if Path(repo.local_path).exists() else "missing"
+        print(f"{repo.repo_id}\t{repo.github_full_name}\t{repo.local_path}\t{status}")
+    return 0
+
+
+def _validate_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="repo_mesh validate", description="Check repos.yaml and policy.yaml")
+    parser.add_argument("--repos", required=True, help="Path to repos.yaml")
+    parser.add_argument("--policy", default=DEFAULT_POLICY_YAML, help="Path to policy.yaml")
+    args = parser.parse_args(argv)
+    import yaml
+    from repo_mesh.contracts import AgentPolicy
+    from repo_mesh.repo_loader import selected_registrations
+
+    problems: list[str] = []
+    try:
+        repos = selected_registrations(args.repos)
+    except (OSError, TypeError, ValueError, yaml.YAMLError) as exc:
+        repos = []
+        problems.append(f"{args.repos}: {exc}")
+    problems += [
+        f"{repo.repo_id}: missing checkout {repo.local_path}" for repo in repos if not Path(repo.local_path).exists()
+    ]
+    try:
+        AgentPolicy(**(yaml.safe_load(Path(args.policy).read_text(encoding="utf-8")) or {}))
+    except (OSError, TypeError, yaml.YAMLError) as exc:
+        problems.append(f"{args.policy}: {exc}")
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print(f"ok: {len(repos)} selected repos")
+    return 1 if problems else 0
+
+
+def _provision_main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="repo_mesh provision", description="Clone or refresh shallow, sparse checkouts of the selected repos"
+    )
     parser.add_argument("--repos", required=True, help="Path to repos.yaml")
+    parser.add_argument("--mirror-dir", default=None, help="Directory of bare mirrors (<owner>/<name>.git) to clone from")
+    parser.add_argument("--max-workers", type=int, default=8, help="Concurrent git processes (default: 8)")
+    parser.add_argument("--depth", type=int, default=1, help="Commits of history to fetch (default: 1)")
+    parser.add_argument("--no-sparse", action="store_true", help="Check out every file, not just extracted types")
+    parser.add_argument("--no-fetch", action="store_true", help="Only clone missing repos; leave existing ones as is")
+    args = parser.parse_args(argv)
+    from repo_mesh.repo_loader import provision_repos
+
+    results = provision_repos(
+        args.repos,
+        mirror_dir=args.mirror_dir,
+        max_workers=args.max_workers,
+        depth=args.depth,
+        sparse=not args.no_sparse,
+        fetch=not args.no_fetch,
+    )
+    for result in results:
+        line = f"{result.action:8} {result.repo_id} -> {result.local_path}"
+        print(f"{line}: {result.error}" if result.error else line)
+    return 1 if any(result.error for result in results) else 0
+
+
+def _discuss_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="repo_mesh discuss", description="Run owner agents and the mediator under a token/time budget"
+    )
+    parser.add_argument("--repos", required=True, help="Path to repos.yaml")
+    parser.add_argument("--out", required=True, help="Path to discussion output JSON")
+    parser.add_argument("--policy", default=DEFAULT_POLICY_YAML, help="Path to policy.yaml")
+    parser.add_argument("--profile-json", default=None, help="A run's output JSON, given to owners as hints")
+    parser.add_argument("--max-workers", type=int, default=4, help="Concurrent owner agents")
+    parser.add_argument("--token-budget", type=int, default=60_000, help="Total tokens across all agent calls")
+    parser.add_argument("--deadline", type=float, default=300.0, help="Seconds after which no new call starts")
+    parser.add_argument("--follow-up-rounds", type=int, default=1, help="Rounds answering the mediator's questions")
+    parser.add_argument("--max-questions", type=int, default=3, help="Questions admitted per follow-up round")
+    args = parser.parse_args(argv)
+    import json
+    from repo_mesh.agents import load_policy, run_discussion
+    from repo_mesh.contracts import DiscussionOptions
+    from repo_mesh.coordinator import _write_json_atomic, profile_from_row
+    from repo_mesh.repo_loader import load_selected_repos
+
+    profiles = {}
+    if args.profile_json:
+        payload = json.loads(Path(args.profile_json).read_text(encoding="utf-8"))
+        profiles = {row["repo_id"]: profile_from_row(row) for row in payload.get("profiles", [])}
+    options = DiscussionOptions(
+        token_budget=args.token_budget,
+        deadline_s=args.deadline,
+        follow_up_rounds=args.follow_up_rounds,
+        max_questions=args.max_questions,
+    )
+    result = run_discussion(
+        load_selected_repos(args.repos), profiles, load_policy(args.policy), options, args.max_workers
+    )
+    _write_json_atomic(args.out, result)
+
+
+def _merge_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="repo_mesh merge", description="Combine the partial results of a --shard run into the final output"
+    )
+    parser.add_argument("partials", nargs="+", help="Partial JSON files, one per shard")
     parser.add_argument("--out", required=True, help="Path to output JSON")
-    args = parser.parse_args()
-    run_once(args.repos, args.out)
+    _add_output_arguments(parser)
+    args = parser.parse_args(argv)
+    from repo_mesh.coordinator import _write_json_atomic
+    from repo_mesh.shard import merge_partials
+
+    payload = merge_partials(args.partials, _consensus(args), args.compact)
+    _write_json_atomic(args.out, payload, args.compact)
+
+
+def _serve_main(argv: list[str]) -> None:
+    from repo_mesh.serve import DEFAULT_PROFILE_JSON, make_server
+
+    parser = argparse.ArgumentParser(
+        prog="repo_mesh serve", description="Serve paginated profile queries from the output JSON"
+    )
+    parser.add_argument("--profile-json", default=DEFAULT_PROFILE_JSON, help="Output JSON to serve (reloaded on change)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    server = make_server(args.profile_json, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["watch"]:
+        return _watch_main(argv[1:])
+    if argv[:1] == ["serve"]:
+        return _serve_main(argv[1:])
+    if argv[:1] == ["provision"]:
+        sys.exit(_provision_main(argv[1:]))
+    if argv[:1] == ["discuss"]:
+        return _discuss_main(argv[1:])
+    if argv[:1] == ["merge"]:
+        return _merge_main(argv[1:])
+    if argv[:1] == ["repos"]:
+        sys.exit(_repos_main(argv[1:]))
+    if argv[:1] == ["validate"]:
+        sys.exit(_validate_main(argv[1:]))
+
+    parser = argparse.ArgumentParser(
+        description="Run human-centered repo agent mesh once",
+        epilog="Other commands: watch, serve, merge, discuss, provision, repos, validate (each takes --help)",
+    )
+    _add_common_arguments(parser)
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached evidence and re-extract every repo")
+    parser.add_argument("--full", action="store_true", help="Re-profile every repo even if unchanged since the last run")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit model extractions as one Message Batches job (resumes an in-flight batch)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record span timings and counters into a \"metrics\" section of the output JSON",
+    )
+    parser.add_argument("--trace", default=None, help="Also write a Chrome trace (implies --profile)")
+    parser.add_argument(
+        "--shard",
+        type=_shard,
+        default=None,
+        metavar="I/N",
+        help="Profile only shard I of N (hash of repo_id) and write a partial result for `merge`",
+    )
+    args = parser.parse_args(argv)
+    from repo_mesh.coordinator import run_once
+
+    options = _configure(args)
+    run_once(
+        args.repos,
+        args.out,
+        max_workers=args.max_workers,
+        use_cache=not args.no_cache,
+        refresh=args.refresh,
+        cache_dir=args.cache_dir,
+        incremental=not args.full,
+        batch=args.batch,
+        options=options,
+        profile=args.profile,
+        trace_path=args.trace,
+        consensus=_consensus(args),
+        compact=args.compact,
+        shard=args.shard,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import re
+import sys
+from dataclasses import dataclass
+from repo_mesh.extractors import extract_text, registered_names
+from repo_mesh.walker import walk_files
+
+# Files always worth reading regardless of extension: they name the stack.
+MANIFEST_NAMES = frozenset({
+    "package.json", "pyproject.toml", "setup.py", "setup.cfg", "requirements.txt",
+    "environment.yml", "Pipfile", "Cargo.toml", "go.mod", "Gemfile", "pom.xml",
+    "build.gradle", "composer.json", "Dockerfile",
+})
+ENTRY_POINT_STEMS = frozenset({
+    "main", "app", "cli", "index", "server", "__main__", "manage", "page", "layout", "route",
+})
+GENERATED_NAMES = frozenset({
+    "package-lock.json", "pnpm-lock.yaml", "yarn.lock", "poetry.lock", "Cargo.lock", "uv.lock",
+})
+_TEST_PARTS = frozenset({"test", "tests", "__tests__", "spec", "specs", "fixtures", "__fixtures__", "e2e", "mocks"})
+_GENERATED_PARTS = frozenset({"generated", "__generated__", "migrations", "snapshots", "__snapshots__"})
+_SOURCE_SUFFIXES = frozenset({".py", ".ts", ".tsx", ".js", ".jsx"})
+
+# Rough BPE pre-tokenization: identifier runs, digit runs, single symbols.
+_PRETOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Local approximation of model tokens: one per symbol or digit run and
+    one per started six letters of each word (long identifiers split)."""
+    n = 0
+    for piece in _PRETOKEN_RE.findall(text):
+        n += 1 + (len(piece) - 1) // 6 if piece[0].isalpha() else 1
+    return n
+
+
+def score_path(rel_path: str) -> float:
+    """Signal score for a repo-relative posix path; higher is read first.
+
+    READMEs and dependency manifests rank first, then entry points, other docs
+    and source, then notebooks and config. Tests, fixtures, generated code and
+    CI config are down-weighted, and deeper files lose a little.
+    """
+    parts = rel_path.split("/")
+    name = parts[-1]
+    stem, _, suffix = name.rpartition(".")
+    stem, suffix = (stem, f".{suffix}") if stem else (name, "")
+    lowered = name.lower()
+    depth = len(parts) - 1
+
+    if lowered.startswith("readme"):
+        score = 100.0 if depth == 0 else 75.0
+    elif name in MANIFEST_NAMES:
+        score = 90.0 if depth == 0 else 70.0
+    elif stem in ENTRY_POINT_STEMS and suffix in _SOURCE_SUFFIXES:
+        score = 65.0
+    elif suffix == ".md":
+        score = 50.0
+    elif suffix in _SOURCE_SUFFIXES:
+        score = 45.0
+    elif suffix == ".ipynb":
+        score = 35.0
+    elif suffix in {".yaml", ".yml"}:
+        score = 20.0
+    else:
+        score = 15.0
+
+    dirs = {p.lower() for p in parts[:-1]}
+    if name in GENERATED_NAMES or dirs & _GENERATED_PARTS or ".min." in lowered or lowered.endswith(".d.ts"):
+        score *= 0.1
+    elif (
+        dirs & _TEST_PARTS
+        or lowered.startswith("test_")
+        or stem.endswith("_test")
+        or ".test." in lowered
+        or ".spec." in lowered
+    ):
+        score *= 0.3
+    if parts[0] in {".github", ".circleci", ".gitlab"}:
+        score *= 0.1
+    return score - 2.0 * depth
+
+
+@dataclass(frozen=True)
+class ContextFile:
+    path: str
+    rel_path: str
+    score: float
+    tokens: int
+
+
+@dataclass(frozen=True)
+class ContextWindow:
+    files: tuple[ContextFile, ...]
+    text: str
+
+    @property
+    def tokens(self) -> int:
+        return sum(f.tokens for f in self.files)
+
+
+def rank_repo_files(repo_path: str, extensions: set[str] | frozenset[str]) -> list[tuple[float, str, str]]:
+    """(score, path, rel_path) for every candidate file, best first, without reading contents."""
+    ranked = []
+    always = MANIFEST_NAMES | registered_names()
+    for entry, rel in walk_files(repo_path):
+        name = entry.name
+        dot = name.rfind(".")
+        if name not in always and (dot <= 0 or name[dot:] not in extensions):
+            continue
+        ranked.append((score_path(rel), entry.path, rel))
+    ranked.sort(key=lambda row: (-row[0], row[2]))
+    return ranked
+
+
+_MAX_PACK_MISSES = 8
+_MIN_FILL_TOKENS = 64
+
+
+def pack_context(
+    repo_path: str,
+    extensions: set[str] | frozenset[str],
+    max_chars_per_file: int,
+    window_tokens: int,
+    max_windows: int = 1,
+) -> list[ContextWindow]:
+    """Greedily pack the highest-ranked files into token-budgeted windows.
+
+    Files are read in rank order through their format's extractor (see
+    repo_mesh.extractors), else as a bounded prefix. A file that overflows the
+    current window starts the next one; once the last window is open, files
+    that do not fit are skipped and smaller ones tried instead, until the
+    window is nearly full or several candidates in a row have not fit.
+    """
+    windows: list[ContextWindow] = []
+    current: list[ContextFile] = []
+    snippets: list[str] = []
+    used = 0
+    misses = 0
+
+    def close() -> None:
+        windows.append(ContextWindow(tuple(current), "\n".join(snippets)))
+
+    for score, path, rel in rank_repo_files(repo_path, extensions):
+        text = extract_text(path, max_chars_per_file)
+        if text is None:
+            continue
+        snippet = f"=== {rel} ===\n{text}\n"
+        tokens = estimate_tokens(snippet)
+        if current and used + tokens > window_tokens:
+            if len(windows) + 1 >= max_windows:
+                misses += 1
+                if misses >= _MAX_PACK_MISSES or window_tokens - used < _MIN_FILL_TOKENS:
+                    break
+                continue
+            close()
+            current, snippets, used = [], [], 0
+        current.append(ContextFile(path, rel, score, tokens))
+        snippets.append(snippet)
+        used += tokens
+        misses = 0
+    if current:
+        close()
+    return windows
+
+
+if __name__ == "__main__":
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.evidence import _EXTENSIONS, _MAX_CHARS_PER_FILE
+
+    options = ExtractionOptions()
+    for i, window in enumerate(
+        pack_context(sys.argv[1], _EXTENSIONS, _MAX_CHARS_PER_FILE, options.context_tokens)
+    ):
+        print(f"window {i}: ~{window.tokens} tokens")
+        for f in window.files:
+            print(f"  {f.score:7.1f} {f.tokens:6d}  {f.rel_path}")
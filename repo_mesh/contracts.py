@@ -21,14 +21,15 @@ class AgentPolicy:
     max_shared_snippets_per_turn: int = 0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EvidenceItem:
     evidence_id: str
     repo_id: str
     signal_type: str
     summary: str
-    source_ref: str
+    source_ref: str      # one path, or a capped "; "-joined sample when aggregated
     weight: float = 1.0
+    occurrences: int = 1  # files/chunks aggregated into this item
 
 
 @dataclass(frozen=True)
@@ -40,6 +41,35 @@ class RepoProfile:
     evidence_ids: List[str] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class ExtractionOptions:
+    context_tokens: int = 4000  # single-window budget when not chunked
+    chunked: bool = False
+    max_chunks: int = 8         # per-repo ceiling on model calls in chunked mode
+    chunk_tokens: int = 6000
+    candidate_skills: int = 0   # >0: send only this many lexically ranked skills
+    other_skills: int = 5       # skills outside the candidates the model may still record
+    fallback: str = "keywords"  # offline extractor: "keywords" or "lexical"
+    stream: bool = False        # stream single-window responses, yielding skills as they complete
+
+
+@dataclass(frozen=True)
+class ConsensusOptions:
+    shared_threshold: int = 2   # repos a skill/intention needs to count as shared
+    neighbors: int = 0          # similar/complementary repos listed per repo; 0 (default) disables
+    similarity: str = "jaccard" # or "cosine"
+
+
+@dataclass(frozen=True)
+class DiscussionOptions:
+    token_budget: int = 60_000      # input + output tokens across every owner/mediator call
+    deadline_s: float = 300.0       # no call starts after this many seconds
+    follow_up_rounds: int = 1       # mediator next_questions rounds after the first pass
+    max_questions: int = 3          # per follow-up round, highest value first
+    owner_context_tokens: int = 3000
+    max_output_tokens: int = 1024   # per call
+
+
 @dataclass(frozen=True)
 class AgentRunContext:
     run_id: str
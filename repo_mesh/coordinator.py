@@ -1,24 +1,216 @@
 from __future__ import annotations
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from repo_mesh.discussion import synthesize_profiles
-from repo_mesh.evidence import extract_repo_evidence
-from repo_mesh.profile import build_repo_profile
-from repo_mesh.repo_loader import load_selected_repos
+from typing import Callable, TypeVar
+from repo_mesh import metrics
+from repo_mesh.cache import DEFAULT_CACHE_DIR, EvidenceCache
+from repo_mesh.contracts import (
+    ConsensusOptions,
+    EvidenceItem,
+    ExtractionOptions,
+    RepoProfile,
+    RepoRegistration,
+)
+from repo_mesh.discussion import ConsensusState, synthesize_profiles
+from repo_mesh.evidence import extractor_version, iter_repo_evidence
+from repo_mesh.manifest import RunManifest, load_manifest, manifest_path_for, output_ignore, repo_state, save_manifest
+from repo_mesh.profile import ProfileAccumulator, build_repo_profile
+from repo_mesh.repo_loader import require_checkouts, selected_registrations
 
+T = TypeVar("T")
+R = TypeVar("R")
 
-def run_once(repos_yaml: str, out_json: str) -> None:
-    repos = load_selected_repos(repos_yaml)
-    profiles = []
-    for repo in repos:
-        evidence = extract_repo_evidence(repo.repo_id, repo.local_path)
-        profiles.append(build_repo_profile(repo.repo_id, evidence))
 
-    consensus = synthesize_profiles(profiles)
-    payload = {
+def _map_guarded(fn: Callable[[T], R], items: list[T], max_workers: int) -> list[R | Exception]:
+    """Apply fn with at most max_workers in flight; results keep input order.
+
+    A failing item yields its exception in place of a result so one bad repo
+    (missing checkout, model error) never aborts the rest of the run.
+    """
+    def guarded(item: T) -> R | Exception:
+        try:
+            return fn(item)
+        except Exception as exc:
+            return exc
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [guarded(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(guarded, items))
+
+
+def _profile_repo(
+    repo: RepoRegistration,
+    cache: EvidenceCache | None,
+    refresh: bool,
+    usage: dict,
+    options: ExtractionOptions,
+) -> RepoProfile:
+    with metrics.repo_scope(repo.repo_id), metrics.span("repo"):
+        # the profile is built as evidence streams in, so it overlaps the model response
+        accumulator = ProfileAccumulator(repo.repo_id)
+        with metrics.span("evidence.extract"):
+            accumulator.extend(iter_repo_evidence(
+                repo.repo_id, repo.local_path, cache=cache, refresh=refresh, usage=usage, options=options
+            ))
+        with metrics.span("profile.build"):
+            return accumulator.build()
+
+
+def _profile_from_batch(repo_id: str, evidence: list[EvidenceItem] | Exception) -> RepoProfile | Exception:
+    if isinstance(evidence, Exception):
+        return evidence
+    with metrics.repo_scope(repo_id), metrics.span("profile.build"):
+        return build_repo_profile(repo_id, evidence)
+
+
+def _payload(
+    profiles: list[RepoProfile],
+    errors: list[dict],
+    consensus: ConsensusOptions | None = None,
+    compact: bool = False,
+    state: ConsensusState | None = None,
+) -> dict:
+    """Output document; compact replaces per-profile evidence_ids with evidence_count."""
+    with metrics.span("discussion.synthesize"):
+        consensus = synthesize_profiles(profiles, consensus, state)
+    rows = [p.__dict__ for p in profiles]
+    if compact:
+        rows = [
+            {**{k: v for k, v in row.items() if k != "evidence_ids"}, "evidence_count": len(row["evidence_ids"])}
+            for row in rows
+        ]
+    return {
         "repo_count": len(profiles),
-        "profiles": [p.__dict__ for p in profiles],
+        "profiles": rows,
         "consensus": consensus,
+        "errors": errors,
     }
-    Path(out_json).parent.mkdir(parents=True, exist_ok=True)
-    Path(out_json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def profile_from_row(row: dict) -> RepoProfile:
+    """A RepoProfile from an output row, compact (evidence_count, no ids) or not."""
+    return RepoProfile(**{k: v for k, v in row.items() if k != "evidence_count"})
+
+
+def _write_json_atomic(path: str, payload: dict, compact: bool = False) -> None:
+    """Write-to-temp then rename, so readers never see a half-written file."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    text = json.dumps(payload, separators=(",", ":")) if compact else json.dumps(payload, indent=2)
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def run_once(
+    repos_yaml: str,
+    out_json: str,
+    max_workers: int = 1,
+    use_cache: bool = True,
+    refresh: bool = False,
+    cache_dir: str | None = None,
+    incremental: bool = True,
+    batch: bool = False,
+    options: ExtractionOptions | None = None,
+    profile: bool = False,
+    trace_path: str | None = None,
+    consensus: ConsensusOptions | None = None,
+    compact: bool = False,
+    shard: tuple[int, int] | None = None,
+) -> None:
+    """Profile the selected repos and write the consensus payload to out_json.
+
+    With incremental=True, repos whose git HEAD (or stat manifest) is unchanged
+    since the last run reuse their stored profile instead of being re-walked.
+    With batch=True, model extraction for the remaining repos goes through one
+    Message Batches job (resumable via <out>.batch.json) instead of live calls.
+    With profile=True (or a trace_path), span timings and counters are added
+    under "metrics" and, if trace_path is set, written as a Chrome trace.
+    compact=True writes minified JSON without per-profile evidence_ids.
+    With shard=(i, N), only the repos hashed into shard i of N are profiled
+    and out_json receives a partial result for repo_mesh.shard.merge_partials.
+    """
+    recorder = metrics.enable() if profile or trace_path else None
+    try:
+        with metrics.span("repo_loader.load"):
+            repos = selected_registrations(repos_yaml)
+            positions = {repo.repo_id: idx for idx, repo in enumerate(repos)}
+            repo_total = len(repos)
+            if shard is not None:
+                from repo_mesh.shard import in_shard
+
+                # a node only needs checkouts for its own shard
+                repos = [repo for repo in repos if in_shard(repo.repo_id, shard)]
+            require_checkouts(repos)
+        cache = EvidenceCache(cache_dir or DEFAULT_CACHE_DIR) if use_cache else None
+        manifest_path = manifest_path_for(out_json)
+        options = options or ExtractionOptions()
+        extractor = extractor_version(options)
+        previous = load_manifest(manifest_path, extractor) if incremental and not refresh else RunManifest(extractor)
+        manifest = RunManifest(extractor)
+
+        with metrics.span("manifest.repo_state"):
+            ignore = output_ignore(out_json, cache_dir)
+            states = _map_guarded(lambda repo: repo_state(repo.local_path, ignore), repos, max_workers)
+        results: list[RepoProfile | Exception | None] = []
+        stale: list[int] = []
+        for idx, (repo, state) in enumerate(zip(repos, states)):
+            reused = None if isinstance(state, Exception) else previous.reusable_profile(repo, state)
+            results.append(reused)
+            if reused is None:
+                stale.append(idx)
+
+        usage: dict[str, dict] = {repos[idx].repo_id: {} for idx in stale}
+        metrics.count("repos_reused", len(repos) - len(stale))
+        if batch and not extractor.startswith("fallback"):
+            from repo_mesh.batch import batch_state_path_for, extract_batch
+
+            with metrics.span("evidence.batch"):
+                evidence = extract_batch(
+                    [repos[idx] for idx in stale], batch_state_path_for(out_json), cache, refresh, options
+                )
+            fresh = [
+                _profile_from_batch(repos[idx].repo_id, evidence[repos[idx].repo_id]) for idx in stale
+            ]
+        else:
+            fresh = _map_guarded(
+                lambda idx: _profile_repo(repos[idx], cache, refresh, usage[repos[idx].repo_id], options),
+                stale,
+                max_workers,
+            )
+        for idx, result in zip(stale, fresh):
+            results[idx] = result
+
+        profiles: list[RepoProfile] = []
+        errors: list[dict] = []
+        for repo, state, result in zip(repos, states, results):
+            if isinstance(result, Exception):
+                errors.append({"repo_id": repo.repo_id, "error": f"{type(result).__name__}: {result}"})
+                continue
+            profiles.append(result)
+            if not isinstance(state, Exception):
+                manifest.record(repo, state, result)
+
+        if shard is not None:
+            from repo_mesh.shard import partial_payload
+
+            payload = partial_payload(
+                shard, repo_total, {repo.repo_id: positions[repo.repo_id] for repo in repos}, profiles, errors
+            )
+        else:
+            payload = _payload(profiles, errors, consensus, compact)
+        model_usage = {repo_id: stats for repo_id, stats in usage.items() if stats}
+        if model_usage:
+            payload["usage"] = model_usage
+        if recorder is not None:
+            payload["metrics"] = recorder.report()
+        _write_json_atomic(out_json, payload, compact)
+        save_manifest(manifest_path, manifest)
+    finally:
+        if recorder is not None:
+            metrics.disable()
+            if trace_path:
+                recorder.write_chrome_trace(trace_path)
@@ -1,25 +1,88 @@
 from __future__ import annotations
 from collections import Counter
-from repo_mesh.contracts import RepoProfile
+from dataclasses import asdict, dataclass, field
+from repo_mesh.contracts import ConsensusOptions, RepoProfile
+from repo_mesh.similarity import IncidenceMatrix
 
 
-def synthesize_profiles(profiles: list[RepoProfile]) -> dict:
-    skill_counter: Counter[str] = Counter()
-    intention_counter: Counter[str] = Counter()
-    interest_map: dict[str, list[str]] = {}
+def repo_neighbors(profiles: list[RepoProfile], k: int = 5, metric: str = "jaccard") -> dict[str, dict]:
+    """Top-k most similar and most complementary repos per repo, over skills."""
+    matrix = IncidenceMatrix([p.repo_id for p in profiles], [p.skills for p in profiles])
+    out: dict[str, dict] = {}
+    for i, profile in enumerate(profiles):
+        similar, complementary = matrix.neighbors(i, k, metric)
+        out[profile.repo_id] = {
+            "similar": [asdict(n) for n in similar],
+            "complementary": [asdict(n) for n in complementary],
+        }
+    return out
 
-    for profile in profiles:
-        skill_counter.update(profile.skills)
-        intention_counter.update(profile.intentions)
+
+@dataclass
+class ConsensusState:
+    """Skill/intention counters and the interest map over some set of profiles.
+
+    States from disjoint sets of repos merge by addition, so shards can each
+    keep one and the final consensus does not depend on how repos were split.
+    """
+
+    skills: Counter[str] = field(default_factory=Counter)
+    intentions: Counter[str] = field(default_factory=Counter)
+    interests: dict[str, list[str]] = field(default_factory=dict)
+    repo_count: int = 0
+
+    @classmethod
+    def from_profiles(cls, profiles: list[RepoProfile]) -> "ConsensusState":
+        state = cls()
+        for profile in profiles:
+            state.add(profile)
+        return state
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "ConsensusState":
+        return cls(Counter(raw["skills"]), Counter(raw["intentions"]), dict(raw["interests"]), raw["repo_count"])
+
+    def add(self, profile: RepoProfile) -> None:
+        self.skills.update(profile.skills)
+        self.intentions.update(profile.intentions)
         for interest in profile.interests:
-            interest_map.setdefault(interest, []).append(profile.repo_id)
+            self.interests.setdefault(interest, []).append(profile.repo_id)
+        self.repo_count += 1
+
+    def merge(self, other: "ConsensusState") -> None:
+        self.skills.update(other.skills)
+        self.intentions.update(other.intentions)
+        for interest, repo_ids in other.interests.items():
+            self.interests.setdefault(interest, []).extend(repo_ids)
+        self.repo_count += other.repo_count
+
+    def to_dict(self) -> dict:
+        return {
+            "skills": dict(sorted(self.skills.items())),
+            "intentions": dict(sorted(self.intentions.items())),
+            "interests": {k: sorted(v) for k, v in sorted(self.interests.items())},
+            "repo_count": self.repo_count,
+        }
+
+
+def synthesize_profiles(
+    profiles: list[RepoProfile], options: ConsensusOptions | None = None, state: ConsensusState | None = None
+) -> dict:
+    """Consensus over profiles; state, if given, is their already merged ConsensusState."""
+    options = options or ConsensusOptions()
+    state = state or ConsensusState.from_profiles(profiles)
 
-    shared_skills = sorted([k for k, v in skill_counter.items() if v >= 2])
-    shared_intentions = sorted([k for k, v in intention_counter.items() if v >= 2])
+    threshold = options.shared_threshold
+    shared_skills = sorted([k for k, v in state.skills.items() if v >= threshold])
+    shared_intentions = sorted([k for k, v in state.intentions.items() if v >= threshold])
 
-    return {
+    consensus = {
         "shared_skills": shared_skills,
         "shared_intentions": shared_intentions,
-        "interest_map": {k: sorted(v) for k, v in interest_map.items()},
-        "repo_count": len(profiles),
+        # keyed in sorted order so the output does not depend on repo or shard order
+        "interest_map": {k: sorted(v) for k, v in sorted(state.interests.items())},
+        "repo_count": state.repo_count,
     }
+    if options.neighbors > 0:
+        consensus["neighbors"] = repo_neighbors(profiles, options.neighbors, options.similarity)
+    return consensus
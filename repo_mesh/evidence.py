@@ -1,13 +1,46 @@
 from __future__ import annotations
 import os
+import sys
 import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from repo_mesh.contracts import EvidenceItem
-from repo_mesh.skill_index import load_skill_index, Skill
+from typing import Iterator
+from repo_mesh import metrics
+from repo_mesh.cache import EvidenceCache, cache_key
+from repo_mesh.classifier import default_classifier
+from repo_mesh.context import estimate_tokens, pack_context
+from repo_mesh.contracts import EvidenceItem, ExtractionOptions
+from repo_mesh.extractors import EXTRACTORS_VERSION
+from repo_mesh.lexical import get_skill_matcher, term_counts
+from repo_mesh.llm import usage_stats
+from repo_mesh.skill_index import SkillIndex, get_skill_index
+from repo_mesh.transport import get_transport
+from repo_mesh.walker import RepoFile, iter_repo_files
+
+MODEL = "claude-haiku-4-5-20251001"
+# Shortest prefix MODEL will cache; a breakpoint on anything shorter is ignored.
+_MIN_CACHEABLE_TOKENS = 4096
+
+SYSTEM_PROMPT = (
+    "You are an expert at analyzing software repositories to infer the skills, intentions, and interests "
+    "of the developer. You will be given repository file contents and a list of 500 real-world skills. "
+    "For each skill you detect evidence of, call record_skill_evidence exactly once. "
+    "Only record skills with clear evidence. Do not hallucinate."
+)
 
 _EXTENSIONS = {".md", ".py", ".ts", ".tsx", ".js", ".txt", ".ipynb", ".yaml", ".yml"}
 _MAX_CHARS_PER_FILE = 3000
-_MAX_TOTAL_CHARS = 15000
+_FALLBACK_EXTENSIONS = {".md", ".py", ".ts", ".tsx", ".js", ".txt"}
+_FALLBACK_MAX_CHARS = 5000
+_CLASSIFY_BATCH = 64
+_MAX_SOURCE_REFS = 10
+_CHUNK_WORKERS = 4
+_FALLBACK_FORMAT = 2  # bump when fallback evidence changes shape, to invalidate stored profiles
+_LEXICAL_TOP_K = 15
+_LEXICAL_MIN_COVERAGE = 0.75
 
 TOOL_DEF = {
     "name": "record_skill_evidence",
@@ -40,133 +73,443 @@ TOOL_DEF = {
 
 def _classify_text(text: str) -> list[tuple[str, str]]:
     """Fallback keyword-based classifier used when ANTHROPIC_API_KEY is not set."""
-    lowered = text.lower()
-    out: list[tuple[str, str]] = []
-    if any(word in lowered for word in ["help", "improve", "support", "build"]):
-        out.append(("intention", "User appears focused on helping or improving outcomes"))
-    if any(word in lowered for word in ["def ", "class ", "function", "api", "pipeline"]):
-        out.append(("functionality", "Repository emphasizes implementation mechanics"))
-    if any(word in lowered for word in ["habit", "learning", "health", "productivity", "design"]):
-        out.append(("interest", "Repository signals recurring personal/professional interests"))
-    return out
+    classifier = default_classifier()
+    return [(signal, classifier.summaries[signal]) for signal, _ in classifier.ordered(classifier.count(text))]
 
 
 def _fallback_extract(repo_id: str, repo_path: str) -> list[EvidenceItem]:
-    """Old keyword-based fallback for when no API key is available (e.g., in tests)."""
-    root = Path(repo_path)
+    """Old keyword-based fallback for when no API key is available (e.g., in tests).
+
+    Files are classified in batches and aggregated per signal: one item per
+    (repo, signal) with the number of matching files, the summed keyword hit
+    count as weight and a capped sample of matching paths.
+    """
+    classifier = default_classifier()
+    occurrences: Counter[str] = Counter()
+    hits_by_signal: Counter[str] = Counter()
+    refs: dict[str, list[str]] = {}
+
+    def flush(batch: list[RepoFile]) -> None:
+        for repo_file, counts in zip(batch, classifier.classify_many([f.text for f in batch])):
+            for signal_type, hits in classifier.ordered(counts):
+                occurrences[signal_type] += 1
+                hits_by_signal[signal_type] += hits
+                sample = refs.setdefault(signal_type, [])
+                if len(sample) < _MAX_SOURCE_REFS:
+                    sample.append(repo_file.path)
+        batch.clear()
+
+    batch: list[RepoFile] = []
+    for repo_file in iter_repo_files(repo_path, _FALLBACK_EXTENSIONS, _FALLBACK_MAX_CHARS):
+        batch.append(repo_file)
+        if len(batch) >= _CLASSIFY_BATCH:
+            flush(batch)
+    flush(batch)
+
+    repo_id = sys.intern(repo_id)
+    return [
+        EvidenceItem(
+            evidence_id=f"{repo_id}:{signal_type}",
+            repo_id=repo_id,
+            signal_type=signal_type,
+            summary=classifier.summaries[signal_type],
+            source_ref="; ".join(refs[signal_type]),
+            weight=float(hits_by_signal[signal_type]),
+            occurrences=occurrences[signal_type],
+        )
+        for signal_type, _ in classifier.ordered(hits_by_signal)
+    ]
+
+
+def _lexical_extract(repo_id: str, repo_path: str) -> list[EvidenceItem]:
+    """Offline fallback naming taxonomy skills whose name/synonyms the repo text covers."""
+    counts = term_counts(
+        f.text for f in iter_repo_files(repo_path, _FALLBACK_EXTENSIONS, _FALLBACK_MAX_CHARS)
+    )
+    matches = get_skill_matcher(get_skill_index()).rank(counts, top_k=_LEXICAL_TOP_K)
+    top = matches[0].score if matches else 1.0
     items: list[EvidenceItem] = []
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix not in {".md", ".py", ".ts", ".tsx", ".js", ".txt"}:
+    for match in matches:
+        if match.coverage < _LEXICAL_MIN_COVERAGE:
             continue
-        text = path.read_text(encoding="utf-8", errors="ignore")[:5000]
-        for idx, (signal_type, summary) in enumerate(_classify_text(text)):
-            items.append(
-                EvidenceItem(
-                    evidence_id=f"{repo_id}:{path.name}:{idx}",
-                    repo_id=repo_id,
-                    signal_type=signal_type,
-                    summary=summary,
-                    source_ref=str(path),
-                    weight=1.0,
-                )
-            )
+        name = match.skill.name
+        items.append(EvidenceItem(
+            evidence_id=f"{repo_id}:{name.lower().replace(' ', '_')}",
+            repo_id=repo_id,
+            signal_type="functionality",
+            summary=f"[{name}] Lexical match against repository text",
+            source_ref=repo_path,
+            weight=round(match.score / top, 3),
+        ))
     return items
 
 
-def _collect_repo_text(repo_path: str) -> str:
-    root = Path(repo_path)
-    parts: list[str] = []
-    total = 0
-    for path in sorted(root.rglob("*")):
-        if not path.is_file():
-            continue
-        if path.suffix not in _EXTENSIONS:
-            continue
-        try:
-            text = path.read_text(encoding="utf-8", errors="ignore")[:_MAX_CHARS_PER_FILE]
-        except Exception:
-            continue
-        snippet = f"=== {path.relative_to(root)} ===\n{text}\n"
-        parts.append(snippet)
-        total += len(snippet)
-        if total >= _MAX_TOTAL_CHARS:
-            break
-    return "\n".join(parts)
+def _collect_repo_text(repo_path: str, token_budget: int | None = None) -> str:
+    """Highest-signal repo files packed into one window of about token_budget tokens."""
+    token_budget = token_budget or ExtractionOptions().context_tokens
+    windows = pack_context(repo_path, _EXTENSIONS, _MAX_CHARS_PER_FILE, token_budget)
+    return windows[0].text if windows else ""
 
 
-def extract_repo_evidence(repo_id: str, repo_path: str) -> list[EvidenceItem]:
-    root = Path(repo_path)
-    if not root.exists():
-        raise FileNotFoundError(repo_path)
+@dataclass(frozen=True)
+class _Chunk:
+    text: str
+    refs: tuple[str, ...]  # source refs credited for evidence found in this chunk
 
-    # Fallback to keyword matching if no API key is configured
-    if not os.getenv("ANTHROPIC_API_KEY"):
-        return _fallback_extract(repo_id, repo_path)
 
-    import anthropic
+def _collect_chunks(repo_path: str, options: ExtractionOptions) -> list[_Chunk]:
+    """Repo content as model-sized windows.
+
+    Files are ranked by signal and packed by estimated tokens (see
+    repo_mesh.context). Without chunking this is one window of
+    options.context_tokens credited to the repo path; with chunking it is up to
+    options.max_chunks windows of options.chunk_tokens, each credited to the
+    files it contains.
+    """
+    if not options.chunked:
+        text = _collect_repo_text(repo_path, options.context_tokens)
+        return [_Chunk(text, (repo_path,))] if text.strip() else []
+    windows = pack_context(
+        repo_path, _EXTENSIONS, _MAX_CHARS_PER_FILE, options.chunk_tokens, options.max_chunks
+    )
+    return [_Chunk(w.text, tuple(f.path for f in w.files)) for w in windows]
 
-    skills = load_skill_index()
-    skill_names = [s.name for s in skills]
-    skill_list_text = "\n".join(f"- {s.name} ({s.category}, {s.type})" for s in skills)
 
-    repo_text = _collect_repo_text(repo_path)
-    if not repo_text.strip():
-        return []
+def _prompt_fingerprint(index: SkillIndex) -> str:
+    """Hash of everything in a request except the repo itself: model, prompts, tools, taxonomy."""
+    return cache_key(index.version, json.dumps(_build_extraction_request("", "", index), sort_keys=True))
 
-    client = anthropic.Anthropic()
 
-    system = (
-        "You are an expert at analyzing software repositories to infer the skills, intentions, and interests "
-        "of the developer. You will be given repository file contents and a list of 500 real-world skills. "
-        "For each skill you detect evidence of, call record_skill_evidence exactly once. "
-        "Only record skills with clear evidence. Do not hallucinate."
+def _extraction_cache_key(
+    repo_id: str, repo_path: str, chunks: list[_Chunk], index: SkillIndex, options: ExtractionOptions
+) -> str:
+    return cache_key(
+        repo_id,
+        repo_path,
+        *(chunk.text for chunk in chunks),
+        json.dumps(asdict(options), sort_keys=True),
+        _prompt_fingerprint(index),
     )
 
-    user = f"""Repository: {repo_id}
 
-SKILL TAXONOMY (use exact names):
-{skill_list_text}
+def extractor_version(options: ExtractionOptions | None = None) -> str:
+    """Identifies what extract_repo_evidence would currently run (fallback vs model + prompt).
+
+    Model fingerprints cover every extraction option, including stream: a
+    streamed response keeps each skill's first tool call rather than its
+    highest-confidence one, so the two modes never share stored profiles.
+    """
+    options = options or ExtractionOptions()
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        version = f"fallback:{options.fallback}:{_FALLBACK_FORMAT}"
+        if options.fallback == "lexical":  # ranks against the taxonomy
+            version += f":{get_skill_index().version}"
+        return version
+    fingerprint = cache_key(
+        _prompt_fingerprint(get_skill_index()), json.dumps(asdict(options), sort_keys=True), str(EXTRACTORS_VERSION)
+    )
+    return f"model:{fingerprint[:16]}"
+
+
+def _tool_inputs(content: list) -> list[dict]:
+    return [
+        block.input
+        for block in content
+        if block.type == "tool_use" and block.name == "record_skill_evidence"
+    ]
+
+
+def _confidence(inp: dict) -> float:
+    try:
+        return float(inp.get("confidence", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _merge_tool_calls(
+    repo_id: str,
+    chunk_calls: list[tuple[_Chunk, list[dict]]],
+    index: SkillIndex,
+    candidates: list[str] | None = None,
+    other_skills: int = 0,
+) -> list[EvidenceItem]:
+    """Reduce record_skill_evidence calls from one or more chunks to one item per skill.
+
+    Skills not in the taxonomy are rejected. When the prompt offered only
+    candidate skills, at most other_skills skills outside that list are kept.
+    For a skill seen in several chunks, the highest-confidence call supplies
+    the signal type and summary, and the source refs of every chunk that
+    reported it are combined (capped).
+    """
+    allowed = set(candidates) if candidates is not None else None
+    others = 0
+    best: dict[str, dict] = {}
+    refs: dict[str, list[str]] = {}
+    seen: Counter[str] = Counter()
+    for chunk, tool_inputs in chunk_calls:
+        for inp in tool_inputs:
+            skill_meta = index.get(str(inp.get("skill_name", "")).strip())
+            if skill_meta is None:
+                continue  # reject hallucinated skills not in taxonomy
+            name = skill_meta.name
+            if allowed is not None and name not in allowed and name not in best:
+                if others >= other_skills:
+                    continue
+                others += 1
+            if name not in best:
+                best[name] = inp
+                refs[name] = []
+            seen[name] += 1
+            if _confidence(inp) > _confidence(best[name]):
+                best[name] = inp
+            for ref in chunk.refs:
+                if ref not in refs[name] and len(refs[name]) < _MAX_SOURCE_REFS:
+                    refs[name].append(ref)
+
+    items: list[EvidenceItem] = []
+    for name, inp in best.items():
+        items.append(EvidenceItem(
+            evidence_id=f"{repo_id}:{name.lower().replace(' ', '_')}",
+            repo_id=repo_id,
+            signal_type=inp.get("signal_type", "functionality"),
+            summary=f"[{name}] {inp.get('summary', '')}",
+            source_ref="; ".join(refs[name]),
+            weight=round(index.get(name).demand / 100, 3),
+            occurrences=seen[name],
+        ))
+    return items
+
 
-REPOSITORY CONTENT:
+def _taxonomy_block(index: SkillIndex) -> str:
+    skill_list_text = "\n".join(f"- {s.name} ({s.category}, {s.type})" for s in index)
+    return f"SKILL TAXONOMY (use exact names):\n{skill_list_text}"
+
+
+def _candidate_skills(chunks: list[_Chunk], index: SkillIndex, options: ExtractionOptions) -> list[str] | None:
+    """Top lexical matches for the repo text, or None to send the whole taxonomy."""
+    if options.candidate_skills <= 0:
+        return None
+    counts = term_counts(chunk.text for chunk in chunks)
+    ranked = [m.skill.name for m in get_skill_matcher(index).rank(counts, top_k=options.candidate_skills)]
+    return ranked or None  # nothing matched lexically: let the model see the whole taxonomy
+
+
+def _build_extraction_request(
+    repo_id: str,
+    repo_text: str,
+    index: SkillIndex,
+    candidates: list[str] | None = None,
+    other_skills: int = 0,
+) -> dict:
+    """Messages API arguments for one repo (or one chunk of it).
+
+    Tools, the system prompt and the taxonomy are identical for every repo and
+    come first; only the user message varies per repo. With candidates, the
+    per-repo shortlist replaces the full taxonomy and moves into the user
+    message. A cache breakpoint closes the shared prefix only when that prefix
+    is long enough for the model to cache (_MIN_CACHEABLE_TOKENS), so
+    requests after the first read it from the prompt cache.
+    """
+    if candidates is None:
+        system = [
+            {"type": "text", "text": SYSTEM_PROMPT},
+            {"type": "text", "text": _taxonomy_block(index)},
+        ]
+        shortlist = ""
+    else:
+        system = [{"type": "text", "text": SYSTEM_PROMPT}]
+        lines = "\n".join(
+            f"- {s.name} ({s.category}, {s.type})" for s in (index.get(name) for name in candidates)
+        )
+        shortlist = f"""CANDIDATE SKILLS (use exact names):
+{lines}
+
+You may also record up to {other_skills} other skills not listed above if the evidence is clear.
+
+"""
+
+    user = f"""Repository: {repo_id}
+
+{shortlist}REPOSITORY CONTENT:
 {repo_text}
 
 Analyze the repository and call record_skill_evidence for each skill you find clear evidence of."""
 
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=4096,
-        system=system,
-        tools=[TOOL_DEF],
-        messages=[{"role": "user", "content": user}],
-    )
+    if estimate_tokens(json.dumps([TOOL_DEF, system])) >= _MIN_CACHEABLE_TOKENS:
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+    return {
+        "model": MODEL,
+        "max_tokens": 4096,
+        "system": system,
+        "tools": [TOOL_DEF],
+        "messages": [{"role": "user", "content": user}],
+    }
 
-    items: list[EvidenceItem] = []
-    seen_skills: set[str] = set()
 
-    for block in response.content:
+def _sum_usage(usages: list[dict], started: float) -> dict:
+    total = {key: sum(u[key] for u in usages) for key in usages[0] if key != "latency_ms"}
+    total["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    total["chunks"] = len(usages)
+    return total
+
+
+def _stream_tool_calls(
+    repo_id: str,
+    events,
+    chunk: _Chunk,
+    index: SkillIndex,
+    candidates: list[str] | None = None,
+    other_skills: int = 0,
+) -> Iterator[EvidenceItem]:
+    """Evidence from streamed response events, one item per skill as its tool_use block completes.
+
+    Same validation and candidate cap as _merge_tool_calls, but an item is
+    yielded as soon as a skill is first seen, so the first call wins.
+    """
+    allowed = set(candidates) if candidates is not None else None
+    others = 0
+    seen: set[str] = set()
+    for event in events:
+        block = getattr(event, "content_block", None)
+        if event.type != "content_block_stop" or block is None:
+            continue
         if block.type != "tool_use" or block.name != "record_skill_evidence":
             continue
         inp = block.input
-        skill_name = inp.get("skill_name", "").strip()
-        if not skill_name or skill_name in seen_skills:
+        skill_meta = index.get(str(inp.get("skill_name", "")).strip())
+        if skill_meta is None or skill_meta.name in seen:
             continue
-        if skill_name not in skill_names:
-            continue  # reject hallucinated skills not in taxonomy
-        seen_skills.add(skill_name)
-
-        # find metadata for this skill
-        skill_meta = next((s for s in skills if s.name == skill_name), None)
-        weight = round((skill_meta.demand / 100) if skill_meta else 1.0, 3)
-
-        items.append(EvidenceItem(
-            evidence_id=f"{repo_id}:{skill_name.lower().replace(' ', '_')}",
+        name = skill_meta.name
+        if allowed is not None and name not in allowed:
+            if others >= other_skills:
+                continue
+            others += 1
+        seen.add(name)
+        yield EvidenceItem(
+            evidence_id=f"{repo_id}:{name.lower().replace(' ', '_')}",
             repo_id=repo_id,
             signal_type=inp.get("signal_type", "functionality"),
-            summary=f"[{skill_name}] {inp.get('summary', '')}",
-            source_ref=repo_path,
-            weight=weight,
-        ))
+            summary=f"[{name}] {inp.get('summary', '')}",
+            source_ref="; ".join(chunk.refs[:_MAX_SOURCE_REFS]),
+            weight=round(skill_meta.demand / 100, 3),
+        )
 
-    return items
+
+def iter_repo_evidence(
+    repo_id: str,
+    repo_path: str,
+    cache: EvidenceCache | None = None,
+    refresh: bool = False,
+    usage: dict | None = None,
+    options: ExtractionOptions | None = None,
+) -> Iterator[EvidenceItem]:
+    """Extract evidence for one repo, yielding items as they become available.
+
+    When a cache is given, model results are stored under a hash of the repo
+    text, extraction options, taxonomy version, model and prompt schema;
+    refresh ignores existing entries but still writes the new result. If usage
+    is given it is filled with the token usage and latency of the model calls.
+    In chunked mode the chunks are sent concurrently (map) and their calls
+    merged per skill (reduce). With options.stream a single-chunk request is
+    streamed and each skill is yielded as soon as its tool call completes.
+    Model calls go through the shared rate-limited transport, which retries
+    throttling and transient failures.
+    """
+    root = Path(repo_path)
+    if not root.exists():
+        raise FileNotFoundError(repo_path)
+
+    options = options or ExtractionOptions()
+
+    # Fallback to local matching if no API key is configured
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        with metrics.span("evidence.fallback"):
+            if options.fallback == "lexical":
+                items = _lexical_extract(repo_id, repo_path)
+            else:
+                items = _fallback_extract(repo_id, repo_path)
+        yield from items
+        return
+    index = get_skill_index()
+
+    with metrics.span("evidence.collect_context"):
+        chunks = _collect_chunks(repo_path, options)
+    if not chunks:
+        return
+
+    key = _extraction_cache_key(repo_id, repo_path, chunks, index, options) if cache else ""
+    if cache and not refresh:
+        cached = cache.get(key)
+        metrics.count("cache_hits" if cached is not None else "cache_misses")
+        if cached is not None:
+            yield from cached
+            return
+
+    transport = get_transport()
+    started = time.perf_counter()
+    candidates = _candidate_skills(chunks, index, options)
+
+    def request_for(chunk: _Chunk) -> dict:
+        request = _build_extraction_request(repo_id, chunk.text, index, candidates, options.other_skills)
+        metrics.count("chars_sent", len(request["messages"][0]["content"]))
+        return request
+
+    def record(response, call_started: float) -> dict:
+        stats = usage_stats(response, call_started)
+        metrics.count("input_tokens", stats["input_tokens"])
+        metrics.count("output_tokens", stats["output_tokens"])
+        metrics.count("cache_read_input_tokens", stats["cache_read_input_tokens"])
+        metrics.count("cache_creation_input_tokens", stats["cache_creation_input_tokens"])
+        return stats
+
+    def call(chunk: _Chunk) -> tuple[list[dict], dict]:
+        call_started = time.perf_counter()
+        with metrics.repo_scope(repo_id), metrics.span("evidence.model_call"):
+            response = transport.create(request_for(chunk))
+            stats = record(response, call_started)
+        return _tool_inputs(response.content), stats
+
+    if options.stream and len(chunks) == 1:
+        final: list = []
+
+        def events():
+            for event in transport.stream(request_for(chunks[0])):
+                if event.type == "message":
+                    final.append(event)
+                yield event
+
+        items: list[EvidenceItem] = []
+        with metrics.span("evidence.model_call"):
+            for item in _stream_tool_calls(repo_id, events(), chunks[0], index, candidates, options.other_skills):
+                items.append(item)
+                yield item
+            stats = record(final[-1] if final else None, started)
+        if usage is not None:
+            usage.update(_sum_usage([stats], started))
+    else:
+        if len(chunks) == 1:
+            results = [call(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(_CHUNK_WORKERS, len(chunks))) as pool:
+                results = list(pool.map(call, chunks))
+        if usage is not None:
+            usage.update(_sum_usage([stats for _, stats in results], started))
+
+        chunk_calls = [(chunk, inputs) for chunk, (inputs, _) in zip(chunks, results)]
+        items = _merge_tool_calls(repo_id, chunk_calls, index, candidates, options.other_skills)
+        yield from items
+
+    if cache:
+        cache.put(key, items)
+
+
+def extract_repo_evidence(
+    repo_id: str,
+    repo_path: str,
+    cache: EvidenceCache | None = None,
+    refresh: bool = False,
+    usage: dict | None = None,
+    options: ExtractionOptions | None = None,
+) -> list[EvidenceItem]:
+    """Extract evidence for one repo (see iter_repo_evidence)."""
+    return list(iter_repo_evidence(repo_id, repo_path, cache, refresh, usage, options))
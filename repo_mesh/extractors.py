@@ -0,0 +1,305 @@
+from __future__ import annotations
+import json
+import os
+import re
+from typing import Callable, Iterator
+from repo_mesh import metrics
+from repo_mesh.walker import SNIFF_BYTES, read_prefix
+
+# Per-format text extraction for context packing. An extractor maps a path
+# and a character budget to the text worth sending (None: skip the file), and
+# is registered by exact file name or by suffix. Bump EXTRACTORS_VERSION when
+# an extractor's output changes so stored model results are not reused.
+EXTRACTORS_VERSION = 1
+
+Extractor = Callable[[str, int], "str | None"]
+_BY_NAME: dict[str, Extractor] = {}
+_BY_SUFFIX: dict[str, Extractor] = {}
+
+_BLOCK = 64 * 1024
+_MAX_MANIFEST_BYTES = 1024 * 1024
+
+
+def register(*keys: str) -> Callable[[Extractor], Extractor]:
+    """Register an extractor for file names ("package.json") or suffixes (".ipynb")."""
+    def wrap(fn: Extractor) -> Extractor:
+        for key in keys:
+            (_BY_SUFFIX if key.startswith(".") else _BY_NAME)[key] = fn
+        return fn
+    return wrap
+
+
+def registered_names() -> frozenset[str]:
+    """Exact file names with a dedicated extractor (e.g. for sparse checkouts)."""
+    return frozenset(_BY_NAME)
+
+
+def extract_text(path: str, max_chars: int) -> str | None:
+    """Text for one file: its format's extractor, else a bounded raw prefix."""
+    name = os.path.basename(path)
+    extractor = _BY_NAME.get(name) or _BY_SUFFIX.get(os.path.splitext(name)[1])
+    if extractor is None:
+        return read_prefix(path, max_chars)
+    return extractor(path, max_chars)
+
+
+# --- notebooks ---------------------------------------------------------------
+
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+_TO_STRUCTURAL = re.compile(r'[^"{}\[\]]*')
+_SCALAR = re.compile(r'[^,}\]\s]*')
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+
+class _JsonStream:
+    """Pull reader over a JSON text file, one block at a time.
+
+    Values the caller does not want (notebook outputs, base64 images) are
+    skipped without being decoded or held, so memory stays near one block
+    however large the file is.
+    """
+
+    def __init__(self, fh) -> None:
+        self._fh = fh
+        self._buf = ""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self._fh.read(_BLOCK)
+        if not chunk:
+            return False
+        metrics.count("bytes_read", len(chunk))
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("unexpected end of JSON")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in JSON")
+        self._pos += 1
+
+    def string(self, keep: bool = True) -> str:
+        self.expect('"')
+        pieces: list[str] = []
+        while True:
+            end = _STRING_BODY.match(self._buf, self._pos).end()
+            if end < len(self._buf) and self._buf[end] == '"':
+                if keep:
+                    pieces.append(self._buf[self._pos:end])
+                self._pos = end + 1
+                return json.loads(f'"{"".join(pieces)}"', strict=False) if keep else ""
+            # the block ended inside the string; a trailing lone backslash waits for the next block
+            if keep:
+                pieces.append(self._buf[self._pos:end])
+            self._pos = end
+            if not self._fill():
+                raise ValueError("unterminated JSON string")
+
+    def skip(self) -> None:
+        """Skip one value of any type."""
+        char = self.peek()
+        if char == '"':
+            self.string(keep=False)
+            return
+        if char not in "{[":
+            while True:
+                end = _SCALAR.match(self._buf, self._pos).end()
+                self._pos = end
+                if end < len(self._buf) or not self._fill():
+                    return
+        depth = 0
+        while True:
+            self._pos = _TO_STRUCTURAL.match(self._buf, self._pos).end()
+            if self._pos >= len(self._buf):
+                if not self._fill():
+                    raise ValueError("unexpected end of JSON")
+                continue
+            char = self._buf[self._pos]
+            if char == '"':
+                self.string(keep=False)
+                continue
+            self._pos += 1
+            depth += 1 if char in "{[" else -1
+            if depth == 0:
+                return
+
+    def members(self) -> Iterator[str]:
+        """Keys of an object; the caller consumes each value before the next key."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.string()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def items(self) -> Iterator[None]:
+        """Positions on each array element; the caller consumes it."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _cell_source(stream: _JsonStream) -> str:
+    if stream.peek() == '"':
+        return stream.string()
+    lines = []
+    for _ in stream.items():
+        lines.append(stream.string())
+    return "".join(lines)
+
+
+def iter_notebook_cells(path: str) -> Iterator[tuple[str, str]]:
+    """(cell_type, source) for the code and markdown cells of an .ipynb, streamed; outputs are skipped."""
+    with open(path, encoding="utf-8", errors="ignore") as fh:
+        stream = _JsonStream(fh)
+        for key in stream.members():
+            if key != "cells":
+                stream.skip()
+                continue
+            for _ in stream.items():
+                cell_type, source = "", ""
+                for cell_key in stream.members():
+                    if cell_key == "cell_type":
+                        cell_type = stream.string()
+                    elif cell_key == "source":
+                        source = _cell_source(stream)
+                    else:
+                        stream.skip()
+                if cell_type in ("code", "markdown") and source.strip():
+                    yield cell_type, source
+            return
+
+
+@register(".ipynb")
+def notebook_text(path: str, max_chars: int) -> str | None:
+    """Cell sources in percent format, stopping once max_chars are collected."""
+    parts: list[str] = []
+    size = 0
+    try:
+        for cell_type, source in iter_notebook_cells(path):
+            marker = "# %% [markdown]" if cell_type == "markdown" else "# %%"
+            parts.append(f"{marker}\n{source.rstrip()}\n")
+            size += len(parts[-1])
+            if size >= max_chars:
+                break
+    except (OSError, ValueError):
+        if not parts:
+            return None  # not a readable notebook
+    return "".join(parts)[:max_chars] or None
+
+
+# --- dependency manifests ----------------------------------------------------
+
+def _load_manifest(path: str, parse: Callable[[str], object]) -> object | None:
+    try:
+        if os.path.getsize(path) > _MAX_MANIFEST_BYTES:
+            return None
+        with open(path, "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+    metrics.count("bytes_read", len(raw))
+    if b"\0" in raw[:SNIFF_BYTES]:
+        return None
+    try:
+        return parse(raw.decode("utf-8", errors="ignore"))
+    except ValueError:
+        return None
+
+
+def _manifest_text(path: str, kind: str, fields: dict[str, list[str]], max_chars: int) -> str | None:
+    """The recognised fields as labelled lines; the bounded raw prefix if none are present."""
+    lines = [f"{kind} manifest"]
+    for label, names in fields.items():
+        names = list(dict.fromkeys(n for n in names if n))
+        if names:
+            lines.append(f"{label}: {', '.join(names)}")
+    return "\n".join(lines)[:max_chars] if len(lines) > 1 else read_prefix(path, max_chars)
+
+
+def _keys(value: object) -> list[str]:
+    return [str(k) for k in value] if isinstance(value, dict) else []
+
+
+@register("package.json", "composer.json")
+def json_manifest_text(path: str, max_chars: int) -> str | None:
+    """Package name, description and dependency names from an npm/Composer manifest."""
+    data = _load_manifest(path, json.loads)
+    if not isinstance(data, dict):
+        return read_prefix(path, max_chars)
+    description = data.get("description")
+    return _manifest_text(path, os.path.basename(path), {
+        "name": [str(data.get("name") or "")],
+        "description": [description] if isinstance(description, str) else [],
+        "dependencies": _keys(data.get("dependencies")) + _keys(data.get("require")),
+        "dev dependencies": _keys(data.get("devDependencies")) + _keys(data.get("require-dev")),
+        "peer dependencies": _keys(data.get("peerDependencies")),
+    }, max_chars)
+
+
+_PACKAGE_SPEC = re.compile(r"\s*([A-Za-z0-9_.\-]+)")
+
+
+def _package_name(spec: str) -> str:
+    """"conda-forge::numpy=1.26" / "requests>=2" -> the bare package name."""
+    match = _PACKAGE_SPEC.match(spec.split("::")[-1])
+    return match.group(1) if match else ""
+
+
+def _yaml(text: str) -> object:
+    import yaml
+
+    try:
+        return yaml.safe_load(text)
+    except yaml.YAMLError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+@register("environment.yml", "environment.yaml")
+def conda_environment_text(path: str, max_chars: int) -> str | None:
+    """Conda and pip package names from an environment file."""
+    data = _load_manifest(path, _yaml)
+    if not isinstance(data, dict):
+        return read_prefix(path, max_chars)
+    conda: list[str] = []
+    pip: list[str] = []
+    for dep in data.get("dependencies") or []:
+        if isinstance(dep, str):
+            conda.append(_package_name(dep))
+        elif isinstance(dep, dict):
+            pip += [_package_name(str(spec)) for spec in dep.get("pip") or []]
+    return _manifest_text(path, "conda environment", {"dependencies": conda, "pip dependencies": pip}, max_chars)
+
+
+@register("docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml")
+def compose_text(path: str, max_chars: int) -> str | None:
+    """Service names and images from a Compose file."""
+    data = _load_manifest(path, _yaml)
+    services = data.get("services") if isinstance(data, dict) else None
+    if not isinstance(services, dict):
+        return read_prefix(path, max_chars)
+    images = [str(s.get("image", "")).split(":")[0] for s in services.values() if isinstance(s, dict)]
+    return _manifest_text(path, "docker compose", {"services": _keys(services), "images": images}, max_chars)
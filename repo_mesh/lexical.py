@@ -0,0 +1,120 @@
+from __future__ import annotations
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Iterable
+from repo_mesh.skill_index import Skill, SkillIndex
+
+# Words plus compounds such as node.js, ci/cd, a/b, c++ and c#.
+_TERM_RE = re.compile(r"[a-z0-9]+(?:[./][a-z0-9]+)*[+#]*")
+
+_NAME_WEIGHT = 1.0
+_PHRASE_WEIGHT = 1.5    # adjacent name words, e.g. "machine learning"
+_SYNONYM_WEIGHT = 1.0
+_CATEGORY_WEIGHT = 0.3
+
+
+def terms(text: str) -> list[str]:
+    """Lowercased terms; compounds are emitted whole and as their parts."""
+    out: list[str] = []
+    for term in _TERM_RE.findall(text.lower()):
+        out.append(term)
+        if "." in term or "/" in term:
+            out.extend(p for p in re.split(r"[./]", term) if len(p) > 1)
+    return out
+
+
+def term_counts(texts: Iterable[str]) -> Counter[str]:
+    """Unigram and adjacent-bigram counts over texts, the 'query' side of matching."""
+    counts: Counter[str] = Counter()
+    for text in texts:
+        words = terms(text)
+        counts.update(words)
+        counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    skill: Skill
+    score: float
+    coverage: float  # share of the skill's name/synonym idf mass present in the text
+
+
+class SkillMatcher:
+    """BM25-style ranking of taxonomy skills against repository text.
+
+    Each skill is a short weighted document (name words, name phrase,
+    synonyms, category). The repo text is the query: its term frequencies are
+    saturated with k1, skill documents are length-normalised with b, and terms
+    rare across the taxonomy score higher via idf. Postings are plain dicts,
+    so ranking touches only the skills sharing a term with the repo.
+    """
+
+    def __init__(self, index: SkillIndex, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        # per skill: term -> (weight, counts toward coverage, counts toward coverage mass)
+        docs: list[dict[str, tuple[float, bool, bool]]] = []
+        for skill in index:
+            doc: dict[str, tuple[float, bool, bool]] = {}
+            for t in terms(skill.category):
+                doc[t] = (_CATEGORY_WEIGHT, False, False)
+            for alias, target in index.synonym_map.items():
+                if target is skill:
+                    for t in terms(alias):
+                        doc[t] = (_SYNONYM_WEIGHT, True, False)
+            name_terms = terms(skill.name)
+            for t in name_terms:
+                doc[t] = (_NAME_WEIGHT, True, True)
+            for a, b_ in zip(name_terms, name_terms[1:]):
+                doc[f"{a} {b_}"] = (_PHRASE_WEIGHT, True, True)
+            docs.append(doc)
+
+        n = len(docs) or 1
+        df: Counter[str] = Counter(t for doc in docs for t in doc)
+        avg_len = sum(len(doc) for doc in docs) / n
+        self._skills = list(index)
+        self._postings: dict[str, list[tuple[int, float, bool]]] = defaultdict(list)
+        self._mass = [0.0] * len(docs)
+        for i, doc in enumerate(docs):
+            norm = 1 - b + b * len(doc) / avg_len
+            for t, (weight, covers, in_mass) in doc.items():
+                idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+                term_score = weight * idf / norm
+                self._postings[t].append((i, term_score, covers))
+                if in_mass:
+                    self._mass[i] += term_score
+
+    def rank(self, counts: Counter[str], top_k: int = 50) -> list[SkillMatch]:
+        scores: dict[int, float] = defaultdict(float)
+        covered: dict[int, float] = defaultdict(float)
+        k1 = self.k1
+        for t, tf in counts.items():
+            postings = self._postings.get(t)
+            if not postings:
+                continue
+            saturation = tf * (k1 + 1) / (tf + k1)
+            for i, term_score, covers in postings:
+                scores[i] += term_score * saturation
+                if covers:
+                    covered[i] += term_score
+        ranked = sorted(scores, key=lambda i: (-scores[i], self._skills[i].name))[:top_k]
+        return [
+            SkillMatch(self._skills[i], scores[i], min(1.0, covered[i] / self._mass[i]) if self._mass[i] else 0.0)
+            for i in ranked
+        ]
+
+
+_MATCHERS: dict[str, SkillMatcher] = {}
+_MATCHERS_LOCK = threading.Lock()
+
+
+def get_skill_matcher(index: SkillIndex) -> SkillMatcher:
+    """Matcher for this taxonomy version, built once per process."""
+    with _MATCHERS_LOCK:
+        matcher = _MATCHERS.get(index.version)
+        if matcher is None:
+            matcher = _MATCHERS[index.version] = SkillMatcher(index)
+        return matcher
@@ -0,0 +1,33 @@
+from __future__ import annotations
+import threading
+import time
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client():
+    """Process-wide Anthropic client.
+
+    The SDK client owns an httpx connection pool, so sharing one instance lets
+    every repo (and every worker thread) reuse warm TLS connections.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            import anthropic
+
+            _CLIENT = anthropic.Anthropic()
+        return _CLIENT
+
+
+def usage_stats(response, started: float) -> dict:
+    """Token usage and latency for one Messages API response."""
+    usage = getattr(response, "usage", None)
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
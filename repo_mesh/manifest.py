@@ -0,0 +1,201 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+from repo_mesh.cache import DEFAULT_CACHE_DIR
+from repo_mesh.contracts import RepoProfile, RepoRegistration
+from repo_mesh.walker import walk_files
+
+MANIFEST_VERSION = 1
+
+Ignore = Callable[[str], bool]  # absolute path -> True if it is not repo content
+
+
+def _resolve_git_dir(root: Path) -> Path | None:
+    git = root / ".git"
+    if git.is_dir():
+        return git
+    if git.is_file():  # worktrees and submodules point elsewhere
+        text = git.read_text(encoding="utf-8").strip()
+        if text.startswith("gitdir:"):
+            return (root / text[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def git_head(repo_path: str) -> str | None:
+    """Resolve HEAD to a commit sha by reading .git directly (no subprocess)."""
+    git_dir = _resolve_git_dir(Path(repo_path))
+    if git_dir is None:
+        return None
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+    ref = head[len("ref:"):].strip()
+    for base in (git_dir, _common_dir(git_dir)):
+        try:
+            return (base / ref).read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+        try:
+            lines = (base / "packed-refs").read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            sha, _, name = line.partition(" ")
+            if name == ref:
+                return sha
+    return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    try:
+        return (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    except OSError:
+        return git_dir
+
+
+def output_ignore(out_json: str, cache_dir: str | None = None) -> Ignore:
+    """Our own writes (output, manifest, temp files, cache) and git internals, wherever they live.
+
+    An output or cache inside a repo would otherwise change that repo's state
+    on every write and get it re-profiled over and over.
+    """
+    out = Path(out_json).resolve()
+    own_files = {str(out), str(Path(manifest_path_for(str(out))))}
+    tmp_prefix = f".{out.name}."
+    cache_prefix = str(Path(cache_dir or DEFAULT_CACHE_DIR).resolve()) + os.sep
+    git_part = f"{os.sep}.git{os.sep}"
+
+    def ignore(path: str) -> bool:
+        path = os.path.abspath(path)
+        if path in own_files or path.startswith(cache_prefix) or path + os.sep == cache_prefix:
+            return True
+        if git_part in path or os.path.basename(path) == ".git":
+            return True
+        return os.path.dirname(path) == str(out.parent) and os.path.basename(path).startswith(tmp_prefix)
+
+    return ignore
+
+
+def _stat_digest(repo_path: str, ignore: Ignore | None = None) -> str:
+    """Hash of (relative path, size, mtime) for every file the walker would visit."""
+    rows: list[str] = []
+    for entry, rel in walk_files(repo_path):
+        if ignore is not None and ignore(entry.path):
+            continue
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        rows.append(f"{rel}\t{st.st_size}\t{st.st_mtime_ns}")
+    return hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()
+
+
+def _worktree_changes(repo_path: str, ignore: Ignore | None = None) -> str | None:
+    """Digest of uncommitted changes ("" for a clean tree), or None if git cannot tell.
+
+    `git status` compares the worktree against the index's cached stat data
+    in C; only the paths it reports are stat'ed here, so repeated edits to an
+    already-dirty file still change the digest. Untracked files are listed
+    one by one so ignore can drop our own outputs. GIT_OPTIONAL_LOCKS=0 keeps it
+    from rewriting the index of a read-only checkout.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path, "status", "--porcelain=v1", "-z", "--untracked-files=all"],
+            capture_output=True, check=False, env={**os.environ, "GIT_OPTIONAL_LOCKS": "0"},
+        )
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    h = hashlib.sha256()
+    changed = False
+    records = iter(result.stdout.split(b"\0"))
+    for record in records:
+        if len(record) < 4:
+            continue
+        if b"R" in record[:2] or b"C" in record[:2]:
+            next(records, None)  # a rename/copy entry is followed by its source path
+        path = os.path.join(repo_path, os.fsdecode(record[3:]))
+        if ignore is not None and ignore(path):
+            continue
+        changed = True
+        h.update(record + b"\0")
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            h.update(f"{st.st_size}\t{st.st_mtime_ns}\n".encode("utf-8"))
+        except OSError:
+            h.update(b"-\n")
+    return h.hexdigest() if changed else ""
+
+
+def repo_state(repo_path: str, ignore: Ignore | None = None) -> str:
+    """Cheap fingerprint of a checkout.
+
+    For git checkouts: HEAD, plus a digest of `git status` when the tree is
+    dirty (uncommitted or untracked files). Otherwise, or if git cannot read
+    the repo, a stat manifest of every file the walker would visit. Paths
+    matching ignore (see output_ignore) do not count.
+    """
+    head = git_head(repo_path)
+    if head:
+        changes = _worktree_changes(repo_path, ignore)
+        if changes == "":
+            return f"git:{head}"
+        if changes is not None:
+            return f"git:{head}:{changes[:16]}"
+    return f"stat:{_stat_digest(repo_path, ignore)}"
+
+
+@dataclass
+class RunManifest:
+    """Per-repo state and profile from the previous run, keyed by repo_id.
+
+    Profiles are only reusable when the extractor fingerprint (mode, model,
+    prompt, taxonomy) and the repo's local_path and state all match.
+    """
+
+    extractor: str
+    repos: dict[str, dict] = field(default_factory=dict)
+
+    def reusable_profile(self, repo: RepoRegistration, state: str) -> RepoProfile | None:
+        entry = self.repos.get(repo.repo_id)
+        if not entry or entry["local_path"] != repo.local_path or entry["state"] != state:
+            return None
+        return RepoProfile(**entry["profile"])
+
+    def record(self, repo: RepoRegistration, state: str, profile: RepoProfile) -> None:
+        self.repos[repo.repo_id] = {
+            "local_path": repo.local_path,
+            "state": state,
+            "profile": asdict(profile),
+        }
+
+
+def load_manifest(path: str, extractor: str) -> RunManifest:
+    try:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return RunManifest(extractor)
+    if raw.get("version") != MANIFEST_VERSION or raw.get("extractor") != extractor:
+        return RunManifest(extractor)
+    return RunManifest(extractor, raw.get("repos", {}))
+
+
+def save_manifest(path: str, manifest: RunManifest) -> None:
+    payload = {"version": MANIFEST_VERSION, "extractor": manifest.extractor, "repos": manifest.repos}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def manifest_path_for(out_json: str) -> str:
+    out = Path(out_json)
+    return str(out.with_name(f"{out.stem}.manifest.json"))
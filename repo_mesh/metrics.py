@@ -0,0 +1,144 @@
+from __future__ import annotations
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator
+
+# Module-level switch: every hook checks this one global and returns at once
+# when profiling is off, so instrumented hot paths cost one call and a compare.
+_RECORDER: "Recorder | None" = None
+_NULL_SPAN = contextlib.nullcontext()
+_SCOPE = threading.local()
+
+
+class Recorder:
+    """Collects span timings and counters for one run, attributed per repo.
+
+    The current repo is tracked per thread (see repo_scope), so counters from
+    the walker or cache land on the repo whose worker thread produced them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.counters: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.events: list[dict] = []
+        self.repo_latency_ms: dict[str, float] = {}
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def add(self, name: str, value: float, repo: str) -> None:
+        with self._lock:
+            self.counters[repo][name] += value
+
+    def record_span(self, name: str, start_us: float, end_us: float, repo: str) -> None:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round(start_us, 1),
+            "dur": round(end_us - start_us, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if repo:
+            event["args"] = {"repo": repo}
+        with self._lock:
+            self.events.append(event)
+            if name == "repo":
+                self.repo_latency_ms[repo] = round((end_us - start_us) / 1000, 1)
+
+    def report(self) -> dict:
+        """The "metrics" section of the output JSON."""
+        with self._lock:
+            spans: dict[str, dict] = {}
+            for event in self.events:
+                row = spans.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+                ms = event["dur"] / 1000
+                row["count"] += 1
+                row["total_ms"] += ms
+                row["max_ms"] = max(row["max_ms"], ms)
+            totals: dict[str, float] = defaultdict(float)
+            repos: dict[str, dict] = {}
+            for repo, counters in self.counters.items():
+                for name, value in counters.items():
+                    totals[name] += value
+                if repo:
+                    repos[repo] = dict(sorted(counters.items()))
+            for repo, latency in self.repo_latency_ms.items():
+                repos.setdefault(repo, {})["latency_ms"] = latency
+        return {
+            "wall_ms": round(self._now_us() / 1000, 1),
+            "spans": {
+                name: {**row, "total_ms": round(row["total_ms"], 1), "max_ms": round(row["max_ms"], 1)}
+                for name, row in sorted(spans.items())
+            },
+            "counters": dict(sorted(totals.items())),
+            "repos": dict(sorted(repos.items())),
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["ts"])
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+
+
+def enable() -> Recorder:
+    global _RECORDER
+    _RECORDER = Recorder()
+    return _RECORDER
+
+
+def disable() -> None:
+    global _RECORDER
+    _RECORDER = None
+
+
+def current_repo() -> str:
+    return getattr(_SCOPE, "repo", "")
+
+
+@contextlib.contextmanager
+def _repo_scope(repo_id: str) -> Iterator[None]:
+    previous = current_repo()
+    _SCOPE.repo = repo_id
+    try:
+        yield
+    finally:
+        _SCOPE.repo = previous
+
+
+def repo_scope(repo_id: str):
+    """Attribute counters and spans on this thread to repo_id."""
+    if _RECORDER is None:
+        return _NULL_SPAN
+    return _repo_scope(repo_id)
+
+
+@contextlib.contextmanager
+def _span(recorder: Recorder, name: str) -> Iterator[None]:
+    start = recorder._now_us()
+    try:
+        yield
+    finally:
+        recorder.record_span(name, start, recorder._now_us(), current_repo())
+
+
+def span(name: str):
+    """Time a block; a shared no-op context manager when profiling is off."""
+    recorder = _RECORDER
+    if recorder is None:
+        return _NULL_SPAN
+    return _span(recorder, name)
+
+
+def count(name: str, value: float = 1) -> None:
+    recorder = _RECORDER
+    if recorder is not None:
+        recorder.add(name, value, current_repo())
@@ -1,34 +1,52 @@
 from __future__ import annotations
 import re
+from typing import Iterable
 from repo_mesh.contracts import EvidenceItem, RepoProfile
 
+_SKILL_NAME_RE = re.compile(r"\[(.+?)\]")
+
+# signal_type -> RepoProfile list it feeds
+_SIGNAL_FIELDS = {"functionality": "skills", "intention": "intentions", "interest": "interests"}
+
 
 def _extract_skill_name(summary: str) -> str:
     """Extract [Skill Name] from summary, or return summary as-is."""
-    m = re.match(r"\[(.+?)\]", summary)
+    m = _SKILL_NAME_RE.match(summary)
     return m.group(1) if m else summary
 
 
-def build_repo_profile(repo_id: str, evidence: list[EvidenceItem]) -> RepoProfile:
-    skills: list[str] = []
-    intentions: list[str] = []
-    interests: list[str] = []
-    evidence_ids: list[str] = []
-
-    for item in evidence:
-        evidence_ids.append(item.evidence_id)
-        name = _extract_skill_name(item.summary)
-        if item.signal_type == "functionality":
-            skills.append(name)
-        elif item.signal_type == "intention":
-            intentions.append(name)
-        elif item.signal_type == "interest":
-            interests.append(name)
-
-    return RepoProfile(
-        repo_id=repo_id,
-        skills=sorted(set(skills)),
-        intentions=sorted(set(intentions)),
-        interests=sorted(set(interests)),
-        evidence_ids=sorted(set(evidence_ids)),
-    )
+class ProfileAccumulator:
+    """Builds a RepoProfile incrementally as evidence arrives.
+
+    Only the deduplicated names and ids are held, so memory tracks the number
+    of distinct signals rather than the number of evidence items consumed.
+    """
+
+    def __init__(self, repo_id: str) -> None:
+        self.repo_id = repo_id
+        self._values: dict[str, set[str]] = {name: set() for name in _SIGNAL_FIELDS.values()}
+        self._evidence_ids: set[str] = set()
+
+    def add(self, item: EvidenceItem) -> None:
+        self._evidence_ids.add(item.evidence_id)
+        field_name = _SIGNAL_FIELDS.get(item.signal_type)
+        if field_name is not None:
+            self._values[field_name].add(_extract_skill_name(item.summary))
+
+    def extend(self, evidence: Iterable[EvidenceItem]) -> "ProfileAccumulator":
+        for item in evidence:
+            self.add(item)
+        return self
+
+    def build(self) -> RepoProfile:
+        return RepoProfile(
+            repo_id=self.repo_id,
+            skills=sorted(self._values["skills"]),
+            intentions=sorted(self._values["intentions"]),
+            interests=sorted(self._values["interests"]),
+            evidence_ids=sorted(self._evidence_ids),
+        )
+
+
+def build_repo_profile(repo_id: str, evidence: Iterable[EvidenceItem]) -> RepoProfile:
+    return ProfileAccumulator(repo_id).extend(evidence).build()
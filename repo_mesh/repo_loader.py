@@ -1,25 +1,42 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+import base64
 import os
 import subprocess
+import threading
 import yaml
 from repo_mesh.contracts import RepoRegistration
 
+GITHUB_URL = "https://github.com/{full_name}.git"
+# Marks checkouts created by provision_repos; only those are ever updated in place.
+_PROVISIONED_KEY = "repo-mesh.provisioned"
+
+_AUTH_OK = False
+_AUTH_LOCK = threading.Lock()
+
 
 def assert_github_auth_present() -> None:
-    if os.getenv("GITHUB_TOKEN"):
+    """Raise unless GITHUB_TOKEN is set or `gh auth status` succeeds (checked once per process)."""
+    global _AUTH_OK
+    if os.getenv("GITHUB_TOKEN") or _AUTH_OK:
         return
-    result = subprocess.run(
-        ["gh", "auth", "status"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    if result.returncode != 0:
-        raise RuntimeError("GitHub auth missing. Set GITHUB_TOKEN or run: gh auth login")
+    with _AUTH_LOCK:
+        if _AUTH_OK:
+            return
+        result = subprocess.run(
+            ["gh", "auth", "status"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise RuntimeError("GitHub auth missing. Set GITHUB_TOKEN or run: gh auth login")
+        _AUTH_OK = True
 
 
-def load_selected_repos(repos_yaml: str) -> list[RepoRegistration]:
+def selected_registrations(repos_yaml: str) -> list[RepoRegistration]:
     payload = yaml.safe_load(Path(repos_yaml).read_text(encoding="utf-8"))
     selected: list[RepoRegistration] = []
     for raw in payload.get("repos", []):
@@ -28,7 +45,129 @@ def load_selected_repos(repos_yaml: str) -> list[RepoRegistration]:
         repo = RepoRegistration(**raw)
         if not repo.read_only:
             raise ValueError(f"Repo {repo.repo_id} must be read_only=True")
-        if not Path(repo.local_path).exists():
-            raise FileNotFoundError(f"Missing local repo checkout: {repo.local_path}")
         selected.append(repo)
     return selected
+
+
+def require_checkouts(repos: list[RepoRegistration]) -> list[RepoRegistration]:
+    for repo in repos:
+        if not Path(repo.local_path).exists():
+            raise FileNotFoundError(
+                f"Missing local repo checkout: {repo.local_path} (run `python -m repo_mesh.cli provision`)"
+            )
+    return repos
+
+
+def load_selected_repos(repos_yaml: str) -> list[RepoRegistration]:
+    return require_checkouts(selected_registrations(repos_yaml))
+
+
+@dataclass(frozen=True)
+class ProvisionResult:
+    repo_id: str
+    local_path: str
+    action: str              # "cloned", "fetched", "present" (not ours, left alone) or "failed"
+    error: str | None = None
+
+
+def sparse_patterns() -> list[str]:
+    """Non-cone sparse-checkout patterns: every file evidence extraction reads, plus .gitignore."""
+    from repo_mesh.context import MANIFEST_NAMES
+    from repo_mesh.evidence import _EXTENSIONS, _FALLBACK_EXTENSIONS
+    from repo_mesh.extractors import registered_names
+
+    return [
+        "/.gitignore",
+        "**/.gitignore",
+        *sorted(f"*{ext}" for ext in _EXTENSIONS | _FALLBACK_EXTENSIONS),
+        *sorted(MANIFEST_NAMES | registered_names()),
+    ]
+
+
+def remote_url(repo: RepoRegistration, mirror_dir: str | None = None) -> str:
+    """A bare mirror at <mirror_dir>/<owner>/<name>.git when present, else GitHub."""
+    if mirror_dir:
+        mirror = Path(mirror_dir, f"{repo.github_full_name}.git").resolve()
+        if mirror.is_dir():
+            return mirror.as_uri()
+    return GITHUB_URL.format(full_name=repo.github_full_name)
+
+
+def _git_env() -> dict[str, str]:
+    """Environment for git; a GITHUB_TOKEN is passed as an auth header via config env, never argv."""
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    token = os.getenv("GITHUB_TOKEN")
+    if token:
+        basic = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+        count = int(env.get("GIT_CONFIG_COUNT", "0") or 0)
+        env["GIT_CONFIG_COUNT"] = str(count + 1)
+        env[f"GIT_CONFIG_KEY_{count}"] = "http.https://github.com/.extraheader"
+        env[f"GIT_CONFIG_VALUE_{count}"] = f"AUTHORIZATION: basic {basic}"
+    return env
+
+
+def _git(*args: str, env: dict[str, str] | None = None, stdin: str | None = None) -> str:
+    result = subprocess.run(["git", *args], env=env, input=stdin, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def _provision_one(
+    repo: RepoRegistration, url: str, depth: int, sparse: bool, fetch: bool, env: dict[str, str]
+) -> ProvisionResult:
+    path = Path(repo.local_path)
+    try:
+        if path.exists():
+            owned = subprocess.run(
+                ["git", "-C", str(path), "config", "--get", _PROVISIONED_KEY],
+                capture_output=True, text=True, check=False,
+            ).stdout.strip() == "true"
+            if not owned or not fetch:
+                return ProvisionResult(repo.repo_id, str(path), "present")
+            _git("-C", str(path), "fetch", "--quiet", f"--depth={depth}", "origin", "HEAD", env=env)
+            _git("-C", str(path), "reset", "--quiet", "--hard", "FETCH_HEAD", env=env)
+            return ProvisionResult(repo.repo_id, str(path), "fetched")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _git(
+            "clone", "--quiet", f"--depth={depth}", "--filter=blob:none", "--no-checkout", url, str(path), env=env
+        )
+        _git("-C", str(path), "config", _PROVISIONED_KEY, "true")
+        if sparse:
+            _git("-C", str(path), "sparse-checkout", "set", "--no-cone", "--stdin",
+                 stdin="\n".join(sparse_patterns()) + "\n", env=env)
+        _git("-C", str(path), "checkout", "--quiet", env=env)
+        return ProvisionResult(repo.repo_id, str(path), "cloned")
+    except (OSError, RuntimeError) as exc:
+        return ProvisionResult(repo.repo_id, str(path), "failed", str(exc))
+
+
+def provision_repos(
+    repos_yaml: str,
+    mirror_dir: str | None = None,
+    max_workers: int = 8,
+    depth: int = 1,
+    sparse: bool = True,
+    fetch: bool = True,
+) -> list[ProvisionResult]:
+    """Clone missing checkouts of the selected repos, and refresh the ones we cloned before, in parallel.
+
+    Clones are shallow (depth commits, blobs fetched on demand) and, with
+    sparse, only check out the file types evidence extraction reads. Repos
+    are taken from a local bare mirror when one exists, otherwise from
+    GitHub (auth is checked once). Checkouts this function did not create
+    are never modified. Failures are reported per repo, in input order.
+    """
+    repos = selected_registrations(repos_yaml)
+    urls = [remote_url(repo, mirror_dir) for repo in repos]
+    if any(
+        url.startswith("https://github.com/") and (fetch or not Path(repo.local_path).exists())
+        for repo, url in zip(repos, urls)
+    ):
+        assert_github_auth_present()
+    env = _git_env()
+    if not repos:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(repos)))) as pool:
+        return list(pool.map(lambda args: _provision_one(*args, depth, sparse, fetch, env), zip(repos, urls)))
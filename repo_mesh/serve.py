@@ -0,0 +1,176 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_PROFILE_JSON = str(Path(__file__).parent / "output" / "latest_profile.json")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# URL segment -> RepoProfile field; "signal types" as evidence names them.
+SIGNAL_FIELDS = {"functionality": "skills", "intention": "intentions", "interest": "interests"}
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    """One immutable load of the output file plus its inverted indexes."""
+
+    version: str
+    payload: dict
+    by_repo: dict[str, dict] = field(default_factory=dict)
+    # signal field -> casefolded value -> (display value, repo_ids)
+    by_value: dict[str, dict[str, tuple[str, list[str]]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "ProfileSnapshot":
+        payload = json.loads(raw)
+        by_repo = {p["repo_id"]: p for p in payload.get("profiles", [])}
+        by_value: dict[str, dict[str, tuple[str, list[str]]]] = {f: {} for f in SIGNAL_FIELDS.values()}
+        for repo_id, profile in by_repo.items():
+            for field_name, index in by_value.items():
+                for value in profile.get(field_name, []):
+                    index.setdefault(value.casefold(), (value, []))[1].append(repo_id)
+        return cls(hashlib.sha256(raw).hexdigest()[:16], payload, by_repo, by_value)
+
+
+class ProfileStore:
+    """Serves the latest snapshot of a profile file, reloading when it changes.
+
+    The file is stat'ed at most every check_interval seconds; a changed
+    (inode, size, mtime) triggers a reload. Writers replace the file
+    atomically, so a reload never sees a partial file, and readers keep
+    using the previous snapshot until the new one is swapped in.
+    """
+
+    def __init__(self, path: str, check_interval: float = 0.5) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat: tuple[int, int, int] | None = None
+        self._checked = 0.0
+        self._snapshot: ProfileSnapshot | None = None
+
+    def snapshot(self) -> ProfileSnapshot | None:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval and self._snapshot is not None:
+            return self._snapshot
+        with self._lock:
+            self._checked = now
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._snapshot, self._stat = None, None
+                return None
+            key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if key != self._stat:
+                try:
+                    self._snapshot = ProfileSnapshot.from_bytes(Path(self.path).read_bytes())
+                    self._stat = key
+                except (OSError, ValueError):
+                    pass  # keep serving the previous snapshot
+            return self._snapshot
+
+
+def _page(items: list, query: dict[str, list[str]]) -> dict:
+    try:
+        offset = max(0, int(query.get("offset", ["0"])[0]))
+        limit = min(MAX_LIMIT, max(1, int(query.get("limit", [str(DEFAULT_LIMIT)])[0])))
+    except ValueError:
+        offset, limit = 0, DEFAULT_LIMIT
+    end = offset + limit
+    return {
+        "items": items[offset:end],
+        "total": len(items),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": end if end < len(items) else None,
+    }
+
+
+def route(snapshot: ProfileSnapshot, path: str, query: dict[str, list[str]]) -> tuple[int, object]:
+    """Resolve one GET against a snapshot; returns (status, JSON body)."""
+    parts = [unquote(p) for p in path.strip("/").split("/") if p]
+    if parts == ["consensus"]:
+        return 200, snapshot.payload.get("consensus", {})
+    if parts == ["errors"]:
+        return 200, snapshot.payload.get("errors", [])
+    if parts == ["repos"]:
+        rows = [
+            {"repo_id": repo_id, **{f: len(p.get(f, [])) for f in SIGNAL_FIELDS.values()}}
+            for repo_id, p in snapshot.by_repo.items()
+        ]
+        return 200, _page(rows, query)
+    if len(parts) == 2 and parts[0] == "repos":
+        profile = snapshot.by_repo.get(parts[1])
+        if profile is None:
+            return 404, {"error": f"unknown repo: {parts[1]}"}
+        if query.get("evidence", ["0"])[0] in ("1", "true"):
+            return 200, profile
+        return 200, {k: v for k, v in profile.items() if k != "evidence_ids"}
+    if len(parts) in (2, 3) and parts[0] == "signals":
+        field_name = SIGNAL_FIELDS.get(parts[1])
+        if field_name is None:
+            return 404, {"error": f"unknown signal type: {parts[1]}"}
+        index = snapshot.by_value[field_name]
+        if len(parts) == 2:
+            rows = sorted(
+                ({"value": value, "repo_count": len(repo_ids)} for value, repo_ids in index.values()),
+                key=lambda row: (-row["repo_count"], row["value"]),
+            )
+            return 200, _page(rows, query)
+        hit = index.get(parts[2].casefold())
+        return 200, {"value": hit[0] if hit else parts[2], **_page(hit[1] if hit else [], query)}
+    # shorthands for the common lookups
+    if len(parts) == 2 and parts[0] in ("skills", "interests", "intentions"):
+        signal = {"skills": "functionality", "interests": "interest", "intentions": "intention"}[parts[0]]
+        return route(snapshot, f"/signals/{signal}/{parts[1]}", query)
+    return 404, {"error": "not found"}
+
+
+def make_handler(store: ProfileStore) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "repo-mesh"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, body: bytes, etag: str | None = None) -> None:
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            if url.path == "/health":
+                return self._send(200, b'{"ok": true}')
+            snapshot = store.snapshot()
+            if snapshot is None:
+                return self._send(503, b'{"error": "no profile output yet"}')
+            # a response only changes when the data or the request does
+            etag = '"%s-%s"' % (snapshot.version, hashlib.sha256(self.path.encode("utf-8")).hexdigest()[:12])
+            if_none_match = self.headers.get("If-None-Match", "")
+            if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+                return self._send(304, b"", etag)
+            status, body = route(snapshot, url.path, parse_qs(url.query))
+            self._send(status, json.dumps(body).encode("utf-8"), etag if status == 200 else None)
+
+    return Handler
+
+
+def make_server(profile_json: str, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(ProfileStore(profile_json)))
+    server.daemon_threads = True
+    return server
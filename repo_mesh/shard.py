@@ -0,0 +1,97 @@
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from repo_mesh.contracts import ConsensusOptions, RepoProfile
+from repo_mesh.discussion import ConsensusState
+
+PARTIAL_VERSION = 1
+
+Shard = tuple[int, int]  # (index, count), index 1-based as in "--shard 2/4"
+
+
+def parse_shard(text: str) -> Shard:
+    """Parse "i/N" with 1 <= i <= N."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {text!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def in_shard(repo_id: str, shard: Shard) -> bool:
+    """Deterministic hash partition of repo ids; stable across machines and Python runs."""
+    index, count = shard
+    digest = hashlib.sha256(repo_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count == index - 1
+
+
+def partial_payload(
+    shard: Shard,
+    repo_total: int,
+    positions: dict[str, int],
+    profiles: list[RepoProfile],
+    errors: list[dict],
+) -> dict:
+    """One shard's results: full profiles plus mergeable consensus state.
+
+    positions maps each of the shard's repo ids to its index in the selected
+    repo list, so merge can restore single-run order.
+    """
+    return {
+        "partial_version": PARTIAL_VERSION,
+        "shard": list(shard),
+        "repo_total": repo_total,
+        "positions": positions,
+        "profiles": [p.__dict__ for p in profiles],
+        "errors": errors,
+        "consensus_state": ConsensusState.from_profiles(profiles).to_dict(),
+    }
+
+
+def merge_partials(paths: list[str], consensus: ConsensusOptions | None = None, compact: bool = False) -> dict:
+    """Combine the partial files of every shard into the payload a single run_once would write.
+
+    Every shard 1..N of one split must be given exactly once. Profiles and
+    errors are put back in repos.yaml order and consensus counters are
+    summed, so the result is byte-identical to a single-node run (per-node
+    usage and metrics sections excepted).
+    """
+    from repo_mesh.coordinator import _payload
+
+    parts = [json.loads(Path(path).read_text(encoding="utf-8")) for path in paths]
+    if not parts:
+        raise ValueError("no partial files to merge")
+    for path, part in zip(paths, parts):
+        if part.get("partial_version") != PARTIAL_VERSION:
+            raise ValueError(f"{path} is not a version {PARTIAL_VERSION} partial result")
+    count = parts[0]["shard"][1]
+    if any(part["shard"][1] != count or part["repo_total"] != parts[0]["repo_total"] for part in parts):
+        raise ValueError("partials come from different shard splits or repo lists")
+    shards = sorted(part["shard"][0] for part in parts)
+    if shards != list(range(1, count + 1)):
+        raise ValueError(f"need shards 1..{count} exactly once, got {shards}")
+
+    positions: dict[str, int] = {}
+    rows: list[dict] = []
+    errors: list[dict] = []
+    usage: dict[str, dict] = {}
+    state = ConsensusState()
+    for part in parts:
+        positions.update(part["positions"])
+        rows.extend(part["profiles"])
+        errors.extend(part["errors"])
+        usage.update(part.get("usage", {}))
+        state.merge(ConsensusState.from_dict(part["consensus_state"]))
+
+    def order(repo_id: str) -> int:
+        return positions[repo_id]
+
+    profiles = [RepoProfile(**row) for row in sorted(rows, key=lambda row: order(row["repo_id"]))]
+    errors.sort(key=lambda error: order(error["repo_id"]))
+    payload = _payload(profiles, errors, consensus, compact, state)
+    if usage:
+        payload["usage"] = {repo_id: usage[repo_id] for repo_id in sorted(usage, key=order)}
+    return payload
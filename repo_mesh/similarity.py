@@ -0,0 +1,142 @@
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import Sequence
+
+# Repo x skill incidence is held column-wise: one Python int per skill whose
+# bit j is set when repo j has that skill. All set operations over the repo
+# axis are then single big-int ops running in C, with n/8 bytes per skill.
+
+
+@dataclass(frozen=True)
+class Neighbor:
+    repo_id: str
+    score: float
+    shared: int      # skills in common
+    new_skills: int  # skills the neighbor has that this repo lacks
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class IncidenceMatrix:
+    """Bitset repo x skill incidence with bit-sliced intersection counting.
+
+    For one repo, the intersection sizes with every other repo are computed
+    at once by adding that repo's skill columns into a bit-sliced counter
+    (plane b holds bit b of every repo's count). Threshold masks such as
+    "shares >= t skills" are then a few big-int ops, so top-k search only
+    decodes the handful of repos that can still make the cut.
+    """
+
+    def __init__(self, repo_ids: Sequence[str], skill_sets: Sequence[Sequence[str]]) -> None:
+        self.repo_ids = list(repo_ids)
+        self.sizes = [len(set(skills)) for skills in skill_sets]
+        self.rows: list[list[int]] = []
+        self.skills: list[str] = []
+        skill_index: dict[str, int] = {}
+        columns: list[int] = []
+        for j, skills in enumerate(skill_sets):
+            row = []
+            for skill in set(skills):
+                s = skill_index.get(skill)
+                if s is None:
+                    s = skill_index[skill] = len(self.skills)
+                    self.skills.append(skill)
+                    columns.append(0)
+                columns[s] |= 1 << j
+                row.append(s)
+            self.rows.append(row)
+        self.columns = columns
+        self._all = (1 << len(self.repo_ids)) - 1
+        self.size_masks: dict[int, int] = {}
+        for j, size in enumerate(self.sizes):
+            self.size_masks[size] = self.size_masks.get(size, 0) | 1 << j
+
+    def _planes(self, i: int) -> list[int]:
+        planes: list[int] = []
+        for s in self.rows[i]:
+            carry = self.columns[s]
+            for b in range(len(planes)):
+                planes[b], carry = planes[b] ^ carry, planes[b] & carry
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def _at_least(self, planes: list[int], t: int) -> int:
+        """Mask of repos whose bit-sliced count is >= t."""
+        if t <= 0:
+            return self._all
+        if t.bit_length() > len(planes):
+            return 0
+        gt, eq = 0, self._all
+        for b in range(len(planes) - 1, -1, -1):
+            if (t >> b) & 1:
+                eq &= planes[b]
+            else:
+                gt |= eq & planes[b]
+                eq &= ~planes[b]
+        return gt | eq
+
+    def _shared(self, i: int, j: int) -> int:
+        return sum(1 for s in self.rows[i] if self.columns[s] >> j & 1)
+
+    def _score(self, metric: str, shared: int, a: int, b: int) -> float:
+        if not shared:
+            return 0.0
+        if metric == "cosine":
+            return shared / math.sqrt(a * b)
+        return shared / (a + b - shared)
+
+    def neighbors(self, i: int, k: int, metric: str = "jaccard") -> tuple[list[Neighbor], list[Neighbor]]:
+        """(most similar, most complementary) repos for repo i, k of each.
+
+        Similar ranks by Jaccard or cosine over skills. Complementary ranks
+        repos that share at least one skill by how many skills they add,
+        ties going to the more similar repo; remaining ties go to input order.
+        Both scores depend only on (shared, size), so each (shared, size)
+        group is one mask and only the winning bits are ever decoded.
+        """
+        a = self.sizes[i]
+        if not a or k <= 0:
+            return [], []
+        planes = self._planes(i)
+        not_me = self._all & ~(1 << i)
+        at_least = [self._at_least(planes, t) for t in range(a + 2)]
+        groups = []  # (shared, size, mask)
+        for t in range(1, a + 1):
+            exactly = at_least[t] & ~at_least[t + 1] & not_me
+            if not exactly:
+                continue
+            for size, size_mask in self.size_masks.items():
+                if size >= t and exactly & size_mask:
+                    groups.append((t, size, exactly & size_mask))
+
+        def top(key) -> list[Neighbor]:
+            scored = sorted(((key(t, size), mask) for t, size, mask in groups), key=lambda g: g[0], reverse=True)
+            out: list[Neighbor] = []
+            idx = 0
+            while idx < len(scored):
+                rank, mask = scored[idx]
+                idx += 1
+                while idx < len(scored) and scored[idx][0] == rank:  # equal scores: merge, then input order
+                    mask |= scored[idx][1]
+                    idx += 1
+                for j in _bits(mask):
+                    shared = self._shared(i, j)
+                    score = round(self._score(metric, shared, a, self.sizes[j]), 4)
+                    out.append(Neighbor(self.repo_ids[j], score, shared, self.sizes[j] - shared))
+                    if len(out) == k:
+                        return out
+            return out
+
+        return (
+            top(lambda t, size: self._score(metric, t, a, size)),
+            top(lambda t, size: (size - t, self._score(metric, t, a, size))),
+        )
@@ -1,8 +1,15 @@
 from __future__ import annotations
+import bisect
 import csv
+import hashlib
+import os
+import threading
 from pathlib import Path
 from dataclasses import dataclass
 
+DEFAULT_BY_CATEGORY_DIR = str(Path(__file__).parent.parent / "research_v2" / "output" / "by_category")
+DEFAULT_SYNONYMS_YAML = str(Path(__file__).parent.parent / "research_v2" / "config" / "synonyms.yaml")
+
 
 @dataclass(frozen=True)
 class Skill:
@@ -14,26 +21,146 @@ class Skill:
     future_proof: float
 
 
-def load_skill_index(by_category_dir: str | None = None) -> list[Skill]:
-    """Load all skills from by_category CSV files."""
-    if by_category_dir is None:
-        # resolve relative to this file: repo_mesh/../research_v2/output/by_category
-        by_category_dir = str(Path(__file__).parent.parent / "research_v2" / "output" / "by_category")
-
+def _parse_csvs(by_category_dir: str) -> list[Skill]:
     skills: list[Skill] = []
     seen: set[str] = set()
     for csv_path in sorted(Path(by_category_dir).glob("*.csv")):
-        for row in csv.DictReader(csv_path.open(encoding="utf-8")):
-            name = row["skill"].strip()
-            if name.lower() in seen:
-                continue
-            seen.add(name.lower())
-            skills.append(Skill(
-                name=name,
-                category=row["category"].strip(),
-                type=row["type"].strip(),
-                demand=float(row["demand"]),
-                scarcity=float(row["scarcity"]),
-                future_proof=float(row["future_proof"]),
-            ))
+        with csv_path.open(encoding="utf-8") as fh:
+            for row in csv.DictReader(fh):
+                name = row["skill"].strip()
+                if name.lower() in seen:
+                    continue
+                seen.add(name.lower())
+                skills.append(Skill(
+                    name=name,
+                    category=row["category"].strip(),
+                    type=row["type"].strip(),
+                    demand=float(row["demand"]),
+                    scarcity=float(row["scarcity"]),
+                    future_proof=float(row["future_proof"]),
+                ))
     return skills
+
+
+def _load_synonyms(synonyms_yaml: str) -> dict[str, str]:
+    try:
+        text = Path(synonyms_yaml).read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    import yaml
+
+    return {str(k): str(v) for k, v in (yaml.safe_load(text) or {}).items()}
+
+
+def load_skill_index(by_category_dir: str | None = None) -> list[Skill]:
+    """Load all skills from by_category CSV files."""
+    return list(get_skill_index(by_category_dir).skills)
+
+
+def taxonomy_version(skills: list[Skill]) -> str:
+    """Stable hash of the taxonomy contents, used to key cached extractions."""
+    h = hashlib.sha256()
+    for s in skills:
+        h.update(f"{s.name}\t{s.category}\t{s.type}\t{s.demand}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class SkillIndex:
+    """Dict-backed view over the taxonomy.
+
+    get() resolves an exact name, then a case-insensitive match, then a
+    synonym from research_v2/config/synonyms.yaml whose canonical form is in
+    the taxonomy. Prefix search runs over the sorted case-folded names.
+    """
+
+    def __init__(
+        self, skills: list[Skill], synonyms: dict[str, str] | None = None, version: str | None = None
+    ) -> None:
+        self.skills = skills
+        self.version = version or taxonomy_version(skills)
+        self._exact = {s.name: s for s in skills}
+        self._folded: dict[str, Skill] = {}
+        for s in skills:
+            self._folded.setdefault(s.name.casefold(), s)
+        self._synonyms: dict[str, Skill] = {}
+        for alias, canonical in (synonyms or {}).items():
+            target = self._folded.get(canonical.casefold())
+            if target is not None:
+                self._synonyms.setdefault(alias.casefold(), target)
+        self._prefix_keys = sorted(self._folded)
+
+    @property
+    def synonym_map(self) -> dict[str, Skill]:
+        """Case-folded alias -> taxonomy skill, for aliases that resolve."""
+        return self._synonyms
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def __iter__(self):
+        return iter(self.skills)
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def get(self, name: str) -> Skill | None:
+        skill = self._exact.get(name)
+        if skill is not None:
+            return skill
+        folded = name.strip().casefold()
+        return self._folded.get(folded) or self._synonyms.get(folded)
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> list[Skill]:
+        folded = prefix.casefold()
+        start = bisect.bisect_left(self._prefix_keys, folded)
+        out: list[Skill] = []
+        for key in self._prefix_keys[start:]:
+            if not key.startswith(folded) or len(out) >= limit:
+                break
+            out.append(self._folded[key])
+        return out
+
+
+def _source_signature(by_category_dir: str, synonyms_yaml: str) -> tuple:
+    sig = []
+    try:
+        with os.scandir(by_category_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".csv"):
+                    st = entry.stat()
+                    sig.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    try:
+        st = os.stat(synonyms_yaml)
+        sig.append(("synonyms", st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return tuple(sorted(sig))
+
+
+_INDEX_CACHE: dict[tuple[str, str], tuple[tuple, SkillIndex]] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_skill_index(by_category_dir: str | None = None, synonyms_yaml: str | None = None) -> SkillIndex:
+    """Process-wide SkillIndex, rebuilt only when the source files' mtimes change.
+
+    A fresh compiled snapshot (see repo_mesh.skill_snapshot) is preferred over
+    parsing the CSVs.
+    """
+    by_category_dir = by_category_dir or DEFAULT_BY_CATEGORY_DIR
+    synonyms_yaml = synonyms_yaml or DEFAULT_SYNONYMS_YAML
+    key = (by_category_dir, synonyms_yaml)
+    signature = _source_signature(by_category_dir, synonyms_yaml)
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        from repo_mesh.skill_snapshot import default_snapshot_path, load_snapshot
+
+        index = load_snapshot(default_snapshot_path(by_category_dir), by_category_dir, synonyms_yaml)
+        if index is None:
+            index = SkillIndex(_parse_csvs(by_category_dir), _load_synonyms(synonyms_yaml))
+        _INDEX_CACHE[key] = (signature, index)
+        return index
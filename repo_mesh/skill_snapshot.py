@@ -0,0 +1,166 @@
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from repo_mesh.skill_index import (
+    DEFAULT_BY_CATEGORY_DIR,
+    DEFAULT_SYNONYMS_YAML,
+    Skill,
+    SkillIndex,
+    _load_synonyms,
+    _parse_csvs,
+    _source_signature,
+)
+
+MAGIC = b"RMSKSNAP"
+FORMAT_VERSION = 1
+SNAPSHOT_NAME = "skill_taxonomy.snapshot"
+
+# magic, format version, skill count, string count, synonym count,
+# signature length, taxonomy version (16 hex chars), source digest (sha256)
+_HEADER = struct.Struct("<8sIIIII16s32s")
+
+
+def default_snapshot_path(by_category_dir: str | None = None) -> str:
+    return str(Path(by_category_dir or DEFAULT_BY_CATEGORY_DIR).parent / SNAPSHOT_NAME)
+
+
+def _source_digest(by_category_dir: str, synonyms_yaml: str) -> bytes:
+    """sha256 over the raw bytes of every source file, in signature order."""
+    h = hashlib.sha256()
+    for csv_path in sorted(Path(by_category_dir).glob("*.csv")):
+        h.update(csv_path.name.encode("utf-8") + b"\0")
+        h.update(csv_path.read_bytes())
+    try:
+        h.update(b"synonyms\0" + Path(synonyms_yaml).read_bytes())
+    except OSError:
+        pass
+    return h.digest()
+
+
+def build_snapshot(
+    by_category_dir: str | None = None,
+    synonyms_yaml: str | None = None,
+    out_path: str | None = None,
+) -> str:
+    """Compile the by_category CSVs (and synonyms) into one snapshot file.
+
+    Layout after the header: the source signature as JSON, a u32 offset table
+    and UTF-8 blob for the interned string table, u32 (name, category, type)
+    string ids per skill, u32 (alias, skill) synonym pairs, then demand,
+    scarcity and future_proof as packed little-endian f64 arrays.
+    """
+    by_category_dir = by_category_dir or DEFAULT_BY_CATEGORY_DIR
+    synonyms_yaml = synonyms_yaml or DEFAULT_SYNONYMS_YAML
+    out_path = out_path or default_snapshot_path(by_category_dir)
+
+    skills = _parse_csvs(by_category_dir)
+    index = SkillIndex(skills, _load_synonyms(synonyms_yaml))
+
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    refs = [i for s in skills for i in (intern(s.name), intern(s.category), intern(s.type))]
+    skill_ids = {s.name: i for i, s in enumerate(skills)}
+    synonym_pairs = [
+        i for alias, skill in sorted(index.synonym_map.items()) for i in (intern(alias), skill_ids[skill.name])
+    ]
+
+    blob = bytearray()
+    offsets = [0]
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    signature = json.dumps(_source_signature(by_category_dir, synonyms_yaml)).encode("utf-8")
+    parts = [
+        _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(skills),
+            len(strings),
+            len(synonym_pairs) // 2,
+            len(signature),
+            index.version.encode("ascii"),
+            _source_digest(by_category_dir, synonyms_yaml),
+        ),
+        signature,
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        bytes(blob),
+        struct.pack(f"<{len(refs)}I", *refs),
+        struct.pack(f"<{len(synonym_pairs)}I", *synonym_pairs),
+        struct.pack(f"<{len(skills)}d", *(s.demand for s in skills)),
+        struct.pack(f"<{len(skills)}d", *(s.scarcity for s in skills)),
+        struct.pack(f"<{len(skills)}d", *(s.future_proof for s in skills)),
+    ]
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    Path(tmp).write_bytes(b"".join(parts))
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def load_snapshot(
+    path: str,
+    by_category_dir: str | None = None,
+    synonyms_yaml: str | None = None,
+) -> SkillIndex | None:
+    """Load a SkillIndex from a snapshot, or None if it is missing, corrupt or stale.
+
+    The snapshot is fresh when the recorded file signature (names, sizes,
+    mtimes) still matches; if only mtimes moved (e.g. a fresh checkout) the
+    source bytes are re-hashed and compared with the stored digest.
+    """
+    by_category_dir = by_category_dir or DEFAULT_BY_CATEGORY_DIR
+    synonyms_yaml = synonyms_yaml or DEFAULT_SYNONYMS_YAML
+    try:
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _read_snapshot(buf, by_category_dir, synonyms_yaml)
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def _read_snapshot(buf: mmap.mmap, by_category_dir: str, synonyms_yaml: str) -> SkillIndex | None:
+    magic, fmt, count, n_strings, n_synonyms, sig_len, version, digest = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        return None
+    offset = _HEADER.size
+    signature = json.loads(buf[offset:offset + sig_len])
+    offset += sig_len
+    current = _source_signature(by_category_dir, synonyms_yaml)
+    if [list(row) for row in current] != signature and _source_digest(by_category_dir, synonyms_yaml) != digest:
+        return None
+
+    offsets = struct.unpack_from(f"<{n_strings + 1}I", buf, offset)
+    offset += 4 * (n_strings + 1)
+    blob = buf[offset:offset + offsets[-1]]
+    strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+    offset += offsets[-1]
+    refs = struct.unpack_from(f"<{3 * count}I", buf, offset)
+    offset += 12 * count
+    pairs = struct.unpack_from(f"<{2 * n_synonyms}I", buf, offset)
+    offset += 8 * n_synonyms
+    demand = struct.unpack_from(f"<{count}d", buf, offset)
+    scarcity = struct.unpack_from(f"<{count}d", buf, offset + 8 * count)
+    future_proof = struct.unpack_from(f"<{count}d", buf, offset + 16 * count)
+
+    skills = [
+        Skill(strings[refs[3 * i]], strings[refs[3 * i + 1]], strings[refs[3 * i + 2]],
+              demand[i], scarcity[i], future_proof[i])
+        for i in range(count)
+    ]
+    synonyms = {strings[pairs[2 * i]]: skills[pairs[2 * i + 1]].name for i in range(n_synonyms)}
+    return SkillIndex(skills, synonyms, version=version.decode("ascii"))
+
+
+if __name__ == "__main__":
+    print(build_snapshot())
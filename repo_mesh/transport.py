@@ -0,0 +1,288 @@
+from __future__ import annotations
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable, Iterator, Mapping
+from repo_mesh import metrics
+from repo_mesh.context import estimate_tokens
+from repo_mesh.llm import get_client
+
+# Throttling (429), overload (529), timeouts/conflicts and transient 5xx.
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+@dataclass(frozen=True)
+class TransportLimits:
+    requests_per_minute: int = 50
+    input_tokens_per_minute: int = 40_000
+    output_tokens_per_minute: int = 8_000
+    max_in_flight: int = 8
+    timeout: float = 120.0        # seconds per attempt
+    max_retries: int = 6
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+
+
+class TransportError(Exception):
+    """A failed model call; status is None for timeouts and connection errors."""
+
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRY_STATUSES
+
+    @classmethod
+    def from_response(cls, status: int, headers: Mapping[str, str], message: str = "") -> "TransportError":
+        return cls(message or f"HTTP {status}", status, parse_retry_after(headers))
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait from retry-after-ms / retry-after (delta seconds or HTTP date)."""
+    lowered = {k.lower(): v for k, v in headers.items()}
+    try:
+        if "retry-after-ms" in lowered:
+            return max(0.0, float(lowered["retry-after-ms"]) / 1000)
+        value = lowered.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe per-minute budget handed out by reservation.
+
+    reserve() always takes the amount, possibly driving the level negative,
+    and returns how long the caller must wait before using it, so concurrent
+    callers queue up behind each other instead of all waking at once. A
+    per_minute of 0 means unlimited.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        if not self.rate:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.level -= amount
+            return -self.level / self.rate if self.level < 0 else 0.0
+
+    def settle(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) usage learned after the fact."""
+        if not self.rate:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self.level = min(self.capacity, self.level - delta)
+
+
+def estimate_request_tokens(params: dict) -> int:
+    return estimate_tokens(
+        json.dumps([params.get("system"), params.get("tools"), params.get("messages")], ensure_ascii=False)
+    )
+
+
+def _sdk_send(params: dict, timeout: float) -> Any:
+    """messages.create through the shared SDK client, with SDK errors translated."""
+    import anthropic
+
+    client = get_client().with_options(max_retries=0)  # retries are ours
+    try:
+        return client.messages.create(**params, timeout=timeout)
+    except getattr(anthropic, "APIStatusError", ()) as exc:
+        raise TransportError.from_response(exc.status_code, exc.response.headers, str(exc)) from exc
+    except getattr(anthropic, "APIConnectionError", ()) as exc:  # includes APITimeoutError
+        raise TransportError(str(exc)) from exc
+
+
+def _sdk_stream(params: dict, timeout: float) -> Iterator[Any]:
+    """Stream events from the shared SDK client, ending with the final Message."""
+    import anthropic
+
+    client = get_client().with_options(max_retries=0)
+    try:
+        with client.messages.stream(**params, timeout=timeout) as stream:
+            yield from stream
+            yield stream.get_final_message()
+    except getattr(anthropic, "APIStatusError", ()) as exc:
+        raise TransportError.from_response(exc.status_code, exc.response.headers, str(exc)) from exc
+    except getattr(anthropic, "APIConnectionError", ()) as exc:
+        raise TransportError(str(exc)) from exc
+
+
+class Transport:
+    """Rate-limited, retrying gateway for Messages API calls.
+
+    Each attempt reserves one request and an estimate of its input tokens
+    from shared per-minute buckets, then waits for a slot under the in-flight
+    cap. Actual input/output usage is settled against the buckets afterwards.
+    Retryable failures back off with full jitter, or for exactly retry-after
+    when the server sends it, in which case no caller sends until it passes.
+    """
+
+    def __init__(
+        self,
+        limits: TransportLimits | None = None,
+        send: Callable[[dict, float], Any] | None = None,
+        stream_send: Callable[[dict, float], Iterable[Any]] | None = None,
+        sleep: Callable[[float], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.limits = limits or TransportLimits()
+        self._send = send or _sdk_send
+        self._stream_send = stream_send or _sdk_stream
+        self._sleep = sleep
+        self._rng = rng
+        self._clock = clock
+        self._resume_at = 0.0
+        self._requests = TokenBucket(self.limits.requests_per_minute, clock)
+        self._input = TokenBucket(self.limits.input_tokens_per_minute, clock)
+        self._output = TokenBucket(self.limits.output_tokens_per_minute, clock)
+        self._slots = threading.BoundedSemaphore(self.limits.max_in_flight)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled_s": 0.0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += value
+        metrics.count(f"transport_{key}", value)
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.limits.backoff_max, self.limits.backoff_base * 2 ** attempt)
+        return self._rng() * cap
+
+    def _wait_for_budget(self, estimate: int, sleep: Callable[[float], None]) -> None:
+        wait = max(self._requests.reserve(1), self._input.reserve(estimate), self._output.reserve(0))
+        if wait > 0:
+            self._count("throttled_s", wait)
+            sleep(wait)
+        self._count("requests")
+
+    def _hold_for_retry_after(self, sleep: Callable[[float], None]) -> None:
+        hold = self._resume_at - self._clock()
+        if hold > 0:
+            self._count("throttled_s", hold)
+            sleep(hold)
+
+    def _retry_delay(self, exc: TransportError, attempt: int, estimate: int) -> float:
+        """Seconds to wait before retrying, or re-raise exc when it is final."""
+        self._input.settle(-estimate)
+        if not exc.retryable or attempt >= self.limits.max_retries:
+            raise exc
+        self._count("retries")
+        if exc.retry_after is None:
+            return self._backoff(attempt)
+        with self._lock:
+            self._resume_at = max(self._resume_at, self._clock() + exc.retry_after)
+        return exc.retry_after
+
+    def _settle(self, response: Any, estimate: int) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            uncached = (getattr(usage, "input_tokens", 0) or 0) + (
+                getattr(usage, "cache_creation_input_tokens", 0) or 0
+            )
+            self._input.settle(uncached - estimate)
+            self._output.settle(getattr(usage, "output_tokens", 0) or 0)
+
+    def create(self, params: dict) -> Any:
+        sleep = self._sleep or time.sleep
+        estimate = estimate_request_tokens(params)
+        attempt = 0
+        while True:
+            self._wait_for_budget(estimate, sleep)
+            try:
+                with self._slots:
+                    self._hold_for_retry_after(sleep)
+                    response = self._send(params, self.limits.timeout)
+            except TransportError as exc:
+                sleep(self._retry_delay(exc, attempt, estimate))
+                attempt += 1
+                continue
+            self._settle(response, estimate)
+            return response
+
+    def stream(self, params: dict) -> Iterator[Any]:
+        """Stream response events under the same limits as create().
+
+        The last event is the final Message (its usage is settled against the
+        buckets). A failure is retried only if no event has been yielded yet.
+        """
+        sleep = self._sleep or time.sleep
+        estimate = estimate_request_tokens(params)
+        attempt = 0
+        while True:
+            self._wait_for_budget(estimate, sleep)
+            started = False
+            try:
+                with self._slots:
+                    self._hold_for_retry_after(sleep)
+                    for event in self._stream_send(params, self.limits.timeout):
+                        started = True
+                        if getattr(event, "type", None) == "message":
+                            self._settle(event, estimate)
+                        yield event
+                return
+            except TransportError as exc:
+                if started:
+                    raise
+                sleep(self._retry_delay(exc, attempt, estimate))
+                attempt += 1
+
+    async def acreate(self, params: dict) -> Any:
+        """create() for asyncio callers; limits are shared with threaded callers."""
+        import asyncio
+
+        return await asyncio.to_thread(self.create, params)
+
+
+_TRANSPORT: Transport | None = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Process-wide transport, so every worker draws on the same rate limits."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        if _TRANSPORT is None:
+            _TRANSPORT = Transport()
+        return _TRANSPORT
+
+
+def configure_transport(
+    limits: TransportLimits | None = None, send: Callable[[dict, float], Any] | None = None
+) -> Transport:
+    """Replace the process-wide transport (new limits, or a stand-in send)."""
+    global _TRANSPORT
+    with _TRANSPORT_LOCK:
+        _TRANSPORT = Transport(limits, send=send)
+        return _TRANSPORT
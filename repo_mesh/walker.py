@@ -0,0 +1,183 @@
+from __future__ import annotations
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterator
+from repo_mesh import metrics
+
+# Directories that never carry authored signal: VCS metadata, dependency
+# trees, virtualenvs, caches and build output.
+DENY_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules", "bower_components", "vendor",
+    ".next", ".nuxt", ".turbo", ".vercel", ".svelte-kit",
+    ".venv", "venv", "env", "__pycache__", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".tox", ".nox", ".ipynb_checkpoints", "site-packages",
+    "dist", "build", "coverage", ".cache", "target",
+})
+
+SNIFF_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class RepoFile:
+    path: str       # root-joined path, as previously produced by Path.rglob
+    rel_path: str   # posix path relative to the repo root
+    text: str       # bounded prefix of the file contents
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore glob into a regex over posix relative paths."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class _IgnoreRule:
+    base: str           # directory (posix, relative to root) holding the .gitignore
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+    def matches(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.anchored:
+            if self.base:
+                if not rel_path.startswith(self.base + "/"):
+                    return False
+                rel_path = rel_path[len(self.base) + 1:]
+            return self.regex.fullmatch(rel_path) is not None
+        return self.regex.fullmatch(name) is not None
+
+
+def parse_gitignore(text: str, base: str = "") -> list[_IgnoreRule]:
+    rules: list[_IgnoreRule] = []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        rules.append(_IgnoreRule(base, re.compile(_translate(line)), negate, dir_only, anchored))
+    return rules
+
+
+def _is_ignored(rules: list[_IgnoreRule], rel_path: str, name: str, is_dir: bool) -> bool:
+    ignored = False
+    for rule in rules:
+        if rule.matches(rel_path, name, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _read_gitignore(dir_path: str, base: str) -> list[_IgnoreRule]:
+    try:
+        with open(os.path.join(dir_path, ".gitignore"), encoding="utf-8", errors="ignore") as fh:
+            return parse_gitignore(fh.read(), base)
+    except OSError:
+        return []
+
+
+def walk_files(root: str, extensions: set[str] | frozenset[str] | None = None) -> Iterator[tuple[os.DirEntry, str]]:
+    """Yield (entry, rel_path) for files under root in sorted depth-first order.
+
+    Denied directories and anything matched by .gitignore files (root and
+    nested) are pruned without being descended into. The walk is lazy, so a
+    caller that stops iterating stops the directory traversal too.
+    """
+    def walk(dir_path: str, rel_dir: str, rules: list[_IgnoreRule]) -> Iterator[tuple[os.DirEntry, str]]:
+        rules = rules + _read_gitignore(dir_path, rel_dir)
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in DENY_DIRS or _is_ignored(rules, rel, entry.name, True):
+                    metrics.count("dirs_pruned")
+                    continue
+                yield from walk(entry.path, rel, rules)
+            elif is_file:
+                if extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                    metrics.count("files_skipped")
+                    continue
+                if _is_ignored(rules, rel, entry.name, False):
+                    metrics.count("files_skipped")
+                    continue
+                metrics.count("files_scanned")
+                yield entry, rel
+
+    yield from walk(os.path.normpath(root), "", [])
+
+
+def read_prefix(path: str, max_chars: int) -> str | None:
+    """Read at most max_chars characters; None for unreadable or binary files."""
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read(max_chars * 4)  # worst-case UTF-8 width
+    except OSError:
+        return None
+    metrics.count("bytes_read", len(raw))
+    if b"\0" in raw[:SNIFF_BYTES]:
+        metrics.count("files_binary")
+        return None
+    return raw.decode("utf-8", errors="ignore")[:max_chars]
+
+
+def iter_repo_files(root: str, extensions: set[str] | frozenset[str], max_chars: int) -> Iterator[RepoFile]:
+    """Yield text files under root with only their first max_chars characters read."""
+    for entry, rel in walk_files(root, extensions):
+        text = read_prefix(entry.path, max_chars)
+        if text is None:
+            continue
+        yield RepoFile(path=entry.path, rel_path=rel, text=text)
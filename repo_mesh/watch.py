@@ -0,0 +1,249 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from repo_mesh.cache import DEFAULT_CACHE_DIR, EvidenceCache
+from repo_mesh.contracts import ConsensusOptions, ExtractionOptions, RepoRegistration
+from repo_mesh.coordinator import _map_guarded, _payload, _profile_repo, _write_json_atomic, profile_from_row, run_once
+from repo_mesh.evidence import extractor_version
+from repo_mesh.manifest import Ignore, load_manifest, manifest_path_for, output_ignore, repo_state, save_manifest
+from repo_mesh.repo_loader import load_selected_repos
+from repo_mesh.walker import DENY_DIRS, walk_files
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Recursive inotify watch over each repo's directories, via libc (Linux only).
+
+    Denied directories (node_modules, .git, ...) are not watched. Directories
+    created later are added as their IN_CREATE events arrive. On queue
+    overflow every repo is reported changed.
+    """
+
+    def __init__(self, roots: dict[str, str], ignore: Ignore) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._ignore = ignore
+        self._roots = roots
+        self._wds: dict[int, tuple[str, str]] = {}  # wd -> (repo_id, directory)
+        for repo_id, root in roots.items():
+            self._add_tree(repo_id, root)
+
+    def _add_tree(self, repo_id: str, top: str) -> None:
+        for dir_path, dir_names, _ in os.walk(top):
+            dir_names[:] = [
+                d for d in dir_names
+                if d not in DENY_DIRS and not self._ignore(os.path.join(dir_path, d))
+                and not os.path.islink(os.path.join(dir_path, d))
+            ]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _WATCH_MASK)
+            if wd >= 0:
+                self._wds[wd] = (repo_id, dir_path)
+
+    def wait(self, timeout: float) -> set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return set(self._roots)
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            watched = self._wds.get(wd)
+            if watched is None:
+                continue
+            repo_id, dir_path = watched
+            path = os.path.join(dir_path, os.fsdecode(name)) if name else dir_path
+            if self._ignore(path) or os.fsdecode(name) in DENY_DIRS:
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(repo_id, path)
+            changed.add(repo_id)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable fallback: re-stat each repo's walkable files every interval seconds."""
+
+    def __init__(self, roots: dict[str, str], ignore: Ignore, interval: float = 2.0) -> None:
+        self._roots = roots
+        self._ignore = ignore
+        self._interval = interval
+        self._digests = {repo_id: self._digest(root) for repo_id, root in roots.items()}
+        self._next_scan = time.monotonic() + interval
+
+    def _digest(self, root: str) -> str:
+        h = hashlib.sha256()
+        for entry, rel in walk_files(root):
+            if self._ignore(entry.path):
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            h.update(f"{rel}\t{st.st_size}\t{st.st_mtime_ns}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def wait(self, timeout: float) -> set[str]:
+        delay = self._next_scan - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            if time.monotonic() < self._next_scan:
+                return set()
+        self._next_scan = time.monotonic() + self._interval
+        changed = set()
+        for repo_id, root in self._roots.items():
+            digest = self._digest(root)
+            if digest != self._digests[repo_id]:
+                self._digests[repo_id] = digest
+                changed.add(repo_id)
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(roots: dict[str, str], ignore: Ignore, backend: str = "auto", poll_interval: float = 2.0):
+    """inotify where available ("auto" falls back to polling), or the named backend."""
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError):
+            if backend == "inotify":
+                raise
+    return PollingWatcher(roots, ignore, poll_interval)
+
+
+def watch(
+    repos_yaml: str,
+    out_json: str,
+    debounce: float = 1.0,
+    max_delay: float = 10.0,
+    backend: str = "auto",
+    poll_interval: float = 2.0,
+    max_workers: int = 4,
+    use_cache: bool = True,
+    cache_dir: str | None = None,
+    options: ExtractionOptions | None = None,
+    stop: threading.Event | None = None,
+    on_update: Callable[[set[str]], None] | None = None,
+    consensus: ConsensusOptions | None = None,
+    compact: bool = False,
+) -> None:
+    """Keep out_json current as the selected repos change on disk.
+
+    Starts with an incremental run_once, then waits for file events. A burst
+    of changes is debounced until debounce seconds pass without new events
+    (or max_delay since the first one); only the repos touched in the burst
+    are re-profiled before the consensus is rebuilt and out_json is replaced
+    atomically. Runs until stop is set.
+    """
+    options = options or ExtractionOptions()
+    stop = stop or threading.Event()
+    run_once(
+        repos_yaml,
+        out_json,
+        max_workers=max_workers,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+        options=options,
+        consensus=consensus,
+        compact=compact,
+    )
+
+    repos: dict[str, RepoRegistration] = {r.repo_id: r for r in load_selected_repos(repos_yaml)}
+    payload = json.loads(Path(out_json).read_text(encoding="utf-8"))
+    # evidence_ids are absent from compact output; the stored manifest still has them
+    manifest = load_manifest(manifest_path_for(out_json), extractor_version(options))
+    stored = {repo_id: entry["profile"] for repo_id, entry in manifest.repos.items()}
+    profiles = {p["repo_id"]: profile_from_row(stored.get(p["repo_id"], p)) for p in payload["profiles"]}
+    errors = {e["repo_id"]: e for e in payload["errors"]}
+    cache = EvidenceCache(cache_dir or DEFAULT_CACHE_DIR) if use_cache else None
+    manifest_path = manifest_path_for(out_json)
+    ignore = output_ignore(out_json, cache_dir)
+
+    def refresh(changed: set[str]) -> None:
+        targets = [repos[repo_id] for repo_id in repos if repo_id in changed]
+        results = _map_guarded(lambda repo: _profile_repo(repo, cache, False, {}, options), targets, max_workers)
+        manifest = load_manifest(manifest_path, extractor_version(options))
+        for repo, result in zip(targets, results):
+            if isinstance(result, Exception):
+                profiles.pop(repo.repo_id, None)
+                errors[repo.repo_id] = {"repo_id": repo.repo_id, "error": f"{type(result).__name__}: {result}"}
+                continue
+            profiles[repo.repo_id] = result
+            errors.pop(repo.repo_id, None)
+            try:
+                manifest.record(repo, repo_state(repo.local_path, ignore), result)
+            except OSError:
+                pass
+        ordered = [profiles[repo_id] for repo_id in repos if repo_id in profiles]
+        _write_json_atomic(
+            out_json, _payload(ordered, [errors[r] for r in repos if r in errors], consensus, compact), compact
+        )
+        save_manifest(manifest_path, manifest)
+        if on_update:
+            on_update(changed)
+
+    watcher = open_watcher(
+        {repo_id: repo.local_path for repo_id, repo in repos.items()},
+        ignore,
+        backend,
+        poll_interval,
+    )
+    pending: set[str] = set()
+    first = last = 0.0
+    try:
+        while not stop.is_set():
+            timeout = 0.5 if not pending else max(0.0, min(last + debounce, first + max_delay) - time.monotonic())
+            changed = watcher.wait(min(timeout, 0.5))
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first = now
+                pending |= changed
+                last = now
+            if pending and (now - last >= debounce or now - first >= max_delay):
+                batch, pending = pending, set()
+                refresh(batch)
+    finally:
+        watcher.close()
@@ -1,21 +1,24 @@
 from __future__ import annotations
+import argparse
 from pathlib import Path
 import shutil
-import pandas as pd
 
-from research_v2.pipeline.stage_a1_category_discovery import run as a1
-from research_v2.pipeline.stage_a2_category_triage import run as a2
-from research_v2.pipeline.stage_b1_subdomains import run as b1
-from research_v2.pipeline.stage_b2_skill_mining import run as b2
-from research_v2.pipeline.stage_c1_normalize import run as c1
-from research_v2.pipeline.stage_c2_score import run as c2
-from research_v2.pipeline.stage_c3_rank import run as c3
-from research_v2.pipeline.stage_c4_quality_gate import run as c4
+# Stages (and pandas) are imported inside run_all, so `--help` and importing
+# this module stay cheap; see tests/research_v2/test_startup.py.
 
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 
 
 def run_all(base_dir: str = "research_v2", out_dir: str = "research_v2/output") -> None:
+    from research_v2.pipeline.stage_a1_category_discovery import run as a1
+    from research_v2.pipeline.stage_a2_category_triage import run as a2
+    from research_v2.pipeline.stage_b1_subdomains import run as b1
+    from research_v2.pipeline.stage_b2_skill_mining import run as b2
+    from research_v2.pipeline.stage_c1_normalize import run as c1
+    from research_v2.pipeline.stage_c2_score import run as c2
+    from research_v2.pipeline.stage_c3_rank import run as c3
+    from research_v2.pipeline.stage_c4_quality_gate import run as c4
+
     base = Path(base_dir)
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
@@ -50,6 +53,8 @@ def run_all(base_dir: str = "research_v2", out_dir: str = "research_v2/output")
 
 
 def _split_by_category(src_csv: Path, out_dir: Path) -> None:
+    import pandas as pd
+
     df = pd.read_csv(src_csv)
     cat_dir = Path(out_dir) / "by_category"
     cat_dir.mkdir(exist_ok=True)
@@ -58,5 +63,13 @@ def _split_by_category(src_csv: Path, out_dir: Path) -> None:
         group.to_csv(cat_dir / f"{slug}_skills.csv", index=False)
 
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the research_v2 skill ranking pipeline (stages A1-C4)")
+    parser.add_argument("--base-dir", default="research_v2", help="Directory holding config/ (default: research_v2)")
+    parser.add_argument("--out-dir", default="research_v2/output", help="Where stage CSVs are written")
+    args = parser.parse_args(argv)
+    run_all(args.base_dir, args.out_dir)
+
+
 if __name__ == "__main__":
-    run_all()
+    main()
@@ -0,0 +1,146 @@
+import sys
+import types
+from types import SimpleNamespace
+import pytest
+import yaml
+
+
+class FakeMessages:
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        tool_inputs = self.responder(kwargs)
+        return SimpleNamespace(
+            content=[
+                SimpleNamespace(type="tool_use", name="record_skill_evidence", input=inp)
+                for inp in tool_inputs
+            ],
+            usage=SimpleNamespace(
+                input_tokens=100,
+                output_tokens=20,
+                cache_creation_input_tokens=0 if len(self.calls) > 1 else 900,
+                cache_read_input_tokens=900 if len(self.calls) > 1 else 0,
+            ),
+        )
+
+    def stream(self, **kwargs):
+        """Yields a content_block_stop per tool call; get_final_message() is the full Message."""
+        message = self.create(**kwargs)
+        message.type = "message"
+        events = [SimpleNamespace(type="content_block_stop", content_block=block) for block in message.content]
+        return _FakeStream(events, message)
+
+
+class _FakeStream:
+    def __init__(self, events, message):
+        self.events = events
+        self.message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def get_final_message(self):
+        return self.message
+
+
+class FakeBatches:
+    """In-memory stand-in for client.messages.batches."""
+
+    def __init__(self, responder, polls_until_done=2):
+        self.responder = responder
+        self.polls_until_done = polls_until_done
+        self.jobs = {}
+        self.retrieves = 0
+
+    def create(self, requests):
+        batch_id = f"msgbatch_{len(self.jobs) + 1}"
+        self.jobs[batch_id] = {"requests": requests, "polls": 0}
+        return SimpleNamespace(id=batch_id)
+
+    def retrieve(self, batch_id):
+        self.retrieves += 1
+        job = self.jobs[batch_id]
+        job["polls"] += 1
+        ended = job["polls"] > self.polls_until_done
+        return SimpleNamespace(id=batch_id, processing_status="ended" if ended else "in_progress")
+
+    def results(self, batch_id):
+        for req in self.jobs[batch_id]["requests"]:
+            content = [
+                SimpleNamespace(type="tool_use", name="record_skill_evidence", input=inp)
+                for inp in self.responder(req["params"])
+            ]
+            yield SimpleNamespace(
+                custom_id=req["custom_id"],
+                result=SimpleNamespace(type="succeeded", message=SimpleNamespace(content=content)),
+            )
+
+
+@pytest.fixture
+def fake_anthropic(monkeypatch):
+    """Install a fake `anthropic` module whose client records calls.
+
+    Set `fake_anthropic.responder` to a callable(kwargs) -> list of tool inputs.
+    """
+    from repo_mesh import llm, transport
+
+    module = types.ModuleType("anthropic")
+    module.responder = lambda kwargs: [
+        {"skill_name": "Machine learning", "signal_type": "functionality", "summary": "Trains models", "confidence": 0.9}
+    ]
+    module.messages = FakeMessages(lambda kwargs: module.responder(kwargs))
+    module.messages.batches = FakeBatches(lambda kwargs: module.responder(kwargs))
+    module.clients_created = 0
+
+    def make_client(*args, **kwargs):
+        module.clients_created += 1
+        client = SimpleNamespace(messages=module.messages)
+        client.with_options = lambda **options: client
+        return client
+
+    module.Anthropic = make_client
+    monkeypatch.setitem(sys.modules, "anthropic", module)
+    monkeypatch.setattr(llm, "_CLIENT", None)
+    monkeypatch.setattr(transport, "_TRANSPORT", None)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    return module
+
+
+@pytest.fixture
+def repos_yaml(tmp_path):
+    """Factory writing repo checkouts under tmp_path and a repos.yaml selecting them, in order.
+
+    repos_yaml({"a": {"README.md": "text"}, "b": {}}) returns the repos.yaml path;
+    bytes contents are written as binary files.
+    """
+
+    def write(repos):
+        rows = []
+        for repo_id, files in repos.items():
+            root = tmp_path / repo_id
+            root.mkdir(parents=True, exist_ok=True)
+            for rel_path, content in files.items():
+                target = root / rel_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if isinstance(content, bytes):
+                    target.write_bytes(content)
+                else:
+                    target.write_text(content, encoding="utf-8")
+            rows.append({
+                "repo_id": repo_id, "display_name": repo_id, "github_full_name": f"org/{repo_id}",
+                "local_path": str(root), "selected": True, "read_only": True,
+            })
+        path = tmp_path / "repos.yaml"
+        path.write_text(yaml.safe_dump({"repos": rows}), encoding="utf-8")
+        return path
+
+    return write
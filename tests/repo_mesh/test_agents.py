@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from repo_mesh.agents import TokenBudgetScheduler, _cost, _owner_request, _questions, derived_findings, run_discussion
+from repo_mesh.contracts import AgentPolicy, DiscussionOptions
+from repo_mesh.repo_loader import selected_registrations
+from repo_mesh.transport import TransportLimits, configure_transport
+
+SECRET = "sk-do-not-share-0123456789"
+
+
+class FakeAgents:
+    """Stand-in send: owners return fixed labels plus fields that must not be shared; the mediator asks one question once."""
+
+    def __init__(self, questions=None):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.owner_calls = []
+        self.mediator_messages = []
+        self.questions = questions if questions is not None else [
+            {"question": "Is repo-a's React work shared with repo-b?", "repos": ["repo-a", "repo-b"]},
+        ]
+
+    def send(self, params, timeout):
+        user = params["messages"][0]["content"]
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if "mediator agent" in params["system"][0]["text"]:
+                self.mediator_messages.append(user)
+                reply = {
+                    "shared_skills": ["react"],
+                    "shared_intentions": ["ship a web app"],
+                    "interest_map": {"frontend": ["repo-a", "repo-b", "repo-c"]},
+                    "conflicts": [{"topic": "framework", "repos": ["repo-a", "repo-b"], "reason": "..."}],
+                    "next_questions": self.questions if len(self.mediator_messages) == 1 else [],
+                }
+            else:
+                time.sleep(0.05)
+                repo_id = user.split("\n", 1)[0].removeprefix("REPO_ID: ")
+                self.owner_calls.append(repo_id)
+                reply = {
+                    "skills": ["react", f"skill-{repo_id}"],
+                    "intentions": ["ship a web app"],
+                    "interests": ["frontend"],
+                    "snippet": SECRET,
+                    "evidence_refs": ["src/app.js"],
+                }
+            text = json.dumps(reply)
+            usage = SimpleNamespace(
+                input_tokens=len(user) // 4, output_tokens=len(text) // 4,
+                cache_creation_input_tokens=0, cache_read_input_tokens=0,
+            )
+            return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=usage)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def fake_agents():
+    fake = FakeAgents()
+    configure_transport(TransportLimits(0, 0, 0, max_in_flight=8), send=fake.send)
+    yield fake
+    configure_transport()
+
+
+def _repos(repos_yaml, names=("repo-a", "repo-b", "repo-c")):
+    return selected_registrations(repos_yaml({name: {"config.py": f"API_KEY = '{SECRET}'\n"} for name in names}))
+
+
+def test_owners_run_concurrently_and_mediator_sees_only_derived_labels(repos_yaml, fake_agents):
+    result = run_discussion(_repos(repos_yaml), options=DiscussionOptions(follow_up_rounds=0))
+
+    assert sorted(fake_agents.owner_calls) == ["repo-a", "repo-b", "repo-c"]
+    assert fake_agents.max_in_flight > 1
+    [message] = fake_agents.mediator_messages
+    assert SECRET not in message and "snippet" not in message and "evidence_refs" not in message
+    assert "skill-repo-c" in message
+    assert [row["repo_id"] for row in result["findings"]] == ["repo-a", "repo-b", "repo-c"]
+    assert result["errors"] == [] and result["budget"]["calls"] == 4
+
+
+def test_follow_up_asks_only_the_repos_a_question_names(repos_yaml, fake_agents):
+    result = run_discussion(_repos(repos_yaml), options=DiscussionOptions(follow_up_rounds=2))
+
+    assert sorted(fake_agents.owner_calls[3:]) == ["repo-a", "repo-b"]
+    assert result["rounds"][1] == {
+        "round": 1,
+        "questions": ["Is repo-a's React work shared with repo-b?"],
+        "owners": ["repo-a", "repo-b"],
+    }
+    assert len(fake_agents.mediator_messages) == 2
+    assert result["budget"]["tokens_used"] <= result["budget"]["token_budget"]
+
+
+def test_follow_up_is_cancelled_when_it_would_exceed_the_budget(repos_yaml, fake_agents):
+    repos = _repos(repos_yaml)
+    options = DiscussionOptions()
+    # just enough to reserve all three owner calls at once; what is left after them cannot cover a follow-up
+    budget = 3 * _cost(_owner_request(repos[0], None, AgentPolicy(), options)) + 100
+    result = run_discussion(repos, options=DiscussionOptions(token_budget=budget, follow_up_rounds=1))
+
+    assert len(fake_agents.owner_calls) == 3
+    assert len(result["rounds"]) == 1
+    assert result["cancelled"] == [
+        {"kind": "question", "reason": "budget", "question": "Is repo-a's React work shared with repo-b?"}
+    ]
+
+
+def test_scheduler_refuses_calls_past_budget_or_deadline():
+    now = [0.0]
+    scheduler = TokenBudgetScheduler(100, 10.0, clock=lambda: now[0])
+    assert scheduler.reserve(80) is None
+    assert scheduler.reserve(30) == "budget"
+    scheduler.settle(80, 50)
+    assert scheduler.remaining() == 50
+    now[0] = 11.0
+    assert scheduler.reserve(10) == "deadline"
+
+
+def test_bare_string_questions_route_to_whole_repo_ids_only():
+    mediation = {"next_questions": ["What is the caching strategy?", "Does web share code with repo-a?"]}
+    questions = _questions(mediation, {"a", "web", "repo-a"})
+    assert [(q.text, q.repos) for q in questions] == [("Does web share code with repo-a?", ("repo-a", "web"))]
+
+
+def test_derived_findings_drop_code_and_free_text():
+    findings = {"r": {"skills": ["python", "def f():\n    return 1", "x" * 500], "interests": "ml", "notes": SECRET}}
+    assert derived_findings(findings, AgentPolicy()) == [
+        {"repo_id": "r", "skills": ["python"], "intentions": [], "interests": []}
+    ]
+
+
+def test_write_access_is_refused():
+    with pytest.raises(ValueError):
+        run_discussion([], policy=AgentPolicy(repo_access_mode="read_write"))
@@ -0,0 +1,59 @@
+import json
+import pytest
+
+
+class Crash(Exception):
+    pass
+
+
+def _repos(repos_yaml, names):
+    from repo_mesh.repo_loader import selected_registrations
+
+    return selected_registrations(repos_yaml({name: {"README.md": f"{name}: JavaScript UI"} for name in names}))
+
+
+def test_extract_batch_maps_results_by_custom_id_and_resumes_after_crash(tmp_path, fake_anthropic, repos_yaml):
+    from repo_mesh.batch import extract_batch
+
+    fake_anthropic.responder = lambda params: [
+        {"skill_name": "javascript", "signal_type": "functionality", "summary": "UI code", "confidence": 0.8},
+        {"skill_name": "Not A Real Skill", "signal_type": "interest", "summary": "x", "confidence": 0.8},
+    ]
+    repos = _repos(repos_yaml, ["web/app", "api"])
+    state_path = tmp_path / "out.batch.json"
+
+    def crash(delay):
+        raise Crash()
+
+    with pytest.raises(Crash):
+        extract_batch(repos, str(state_path), sleep=crash)
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert state["batch_id"] == "msgbatch_1"
+    assert sorted(state["repos"]) == ["api", "web/app"]
+
+    delays = []
+    results = extract_batch(repos, str(state_path), poll_interval=1.0, sleep=delays.append)
+
+    batches = fake_anthropic.messages.batches
+    assert list(batches.jobs) == ["msgbatch_1"]  # resumed, not resubmitted
+    assert delays == [1.0]
+    assert not state_path.exists()
+    for repo in repos:
+        [item] = results[repo.repo_id]
+        assert item.repo_id == repo.repo_id
+        assert item.summary.startswith("[JavaScript]")
+
+
+def test_run_once_batch_mode_builds_profiles_from_batch_results(tmp_path, fake_anthropic, monkeypatch, repos_yaml):
+    from repo_mesh import batch, coordinator
+
+    monkeypatch.setattr(batch.time, "sleep", lambda delay: None)
+    repos_file = repos_yaml({name: {"README.md": f"{name}: JavaScript UI"} for name in ["a", "b"]})
+    out_json = tmp_path / "out" / "profile.json"
+
+    coordinator.run_once(str(repos_file), str(out_json), use_cache=False, batch=True)
+
+    payload = json.loads(out_json.read_text(encoding="utf-8"))
+    assert fake_anthropic.messages.calls == []
+    assert [p["skills"] for p in payload["profiles"]] == [["Machine learning"], ["Machine learning"]]
+    assert payload["consensus"]["shared_skills"] == ["Machine learning"]
@@ -0,0 +1,23 @@
+import json
+
+
+def test_bench_runs_offline_on_a_tiny_workspace_and_compares(tmp_path, monkeypatch):
+    from repo_mesh import bench
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    out = tmp_path / "results.json"
+    argv = ["--workdir", str(tmp_path), "--repos", "2", "--files", "12", "--node-modules-files", "5",
+            "--repeat", "1", "--out", str(out)]
+    assert bench.main(argv) == 0
+
+    results = json.loads(out.read_text())
+    assert set(results["scenarios"]) == {
+        "collect_repo_text", "fallback_extract", "build_repo_profile",
+        "synthesize_profiles", "run_once_fallback", "run_once_stub_model",
+    }
+    model_run = json.loads(next(tmp_path.glob("ws-*/model.json")).read_text())
+    assert model_run["errors"] == [] and "Python" in model_run["profiles"][0]["skills"]
+
+    baseline = {"scenarios": {name: {"median_s": row["median_s"] / 10} for name, row in results["scenarios"].items()}}
+    comparison = bench.compare(results, baseline)
+    assert all(row["regression"] for row in comparison.values())
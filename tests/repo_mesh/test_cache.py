@@ -0,0 +1,72 @@
+import os
+import time
+from repo_mesh.contracts import EvidenceItem
+
+
+def test_evidence_cache_round_trip_and_eviction(tmp_path):
+    from repo_mesh.cache import EvidenceCache, cache_key
+
+    cache = EvidenceCache(str(tmp_path), max_entries=2)
+    item = EvidenceItem("a:ml", "a", "functionality", "[Machine learning] x", "/a", 0.93)
+    keys = [cache_key("repo", str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, [item])
+        # distinct mtimes so LRU order is well defined
+        os.utime(cache._path(key), (time.time() - 10 + i, time.time() - 10 + i))
+
+    cache.put(keys[2], [item])
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == [item]
+
+
+def test_evidence_cache_only_scans_when_a_limit_is_crossed(tmp_path, monkeypatch):
+    from repo_mesh.cache import EvidenceCache, cache_key
+
+    cache = EvidenceCache(str(tmp_path), max_entries=5)
+    item = EvidenceItem("a:ml", "a", "functionality", "[Machine learning] x", "/a", 0.93)
+    scans = []
+    real_evict = cache._evict_locked
+    monkeypatch.setattr(cache, "_evict_locked", lambda: scans.append(1) or real_evict())
+
+    for i in range(5):
+        cache.put(cache_key("repo", str(i)), [item])
+    cache.put(cache_key("repo", "0"), [item])  # overwrite: count unchanged
+    assert len(scans) == 1  # the first write, to learn the current size
+    cache.put(cache_key("repo", "5"), [item])
+    assert len(scans) == 2
+    assert len(list(tmp_path.glob("*/*.json"))) == 5
+
+
+def test_malformed_cache_entries_are_misses_and_removed(tmp_path):
+    from repo_mesh.cache import EvidenceCache, cache_key
+
+    cache = EvidenceCache(str(tmp_path))
+    shapes = ['{"items": []}', '[{"repo_id": "a"}]', '[{"repo_id": "a", "signal_type": "x", "old_field": 1}]', "[1]"]
+    for i, text in enumerate(shapes):
+        key = cache_key("malformed", str(i))
+        cache._path(key).parent.mkdir(parents=True, exist_ok=True)
+        cache._path(key).write_text(text, encoding="utf-8")
+        assert cache.get(key) is None
+        assert not cache._path(key).exists()
+
+
+def test_extract_repo_evidence_reuses_cached_model_result(tmp_path, fake_anthropic):
+    from repo_mesh.cache import EvidenceCache
+    from repo_mesh.evidence import extract_repo_evidence
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "train.py").write_text("import sklearn\n", encoding="utf-8")
+    cache = EvidenceCache(str(tmp_path / "cache"))
+
+    first = extract_repo_evidence("repo", str(repo), cache=cache)
+    second = extract_repo_evidence("repo", str(repo), cache=cache)
+    assert first == second
+    assert len(fake_anthropic.messages.calls) == 1
+
+    extract_repo_evidence("repo", str(repo), cache=cache, refresh=True)
+    assert len(fake_anthropic.messages.calls) == 2
+
+    (repo / "train.py").write_text("import torch\n", encoding="utf-8")
+    extract_repo_evidence("repo", str(repo), cache=cache)
+    assert len(fake_anthropic.messages.calls) == 3
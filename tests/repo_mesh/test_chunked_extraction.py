@@ -0,0 +1,29 @@
+def test_chunked_extraction_maps_windows_and_merges_per_skill(tmp_path, fake_anthropic):
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.evidence import extract_repo_evidence
+
+    for i in range(6):
+        (tmp_path / f"mod{i}.py").write_text(f"# module {i}\n" + "x = 1\n" * 150, encoding="utf-8")
+
+    def responder(params):
+        content = params["messages"][0]["content"]
+        calls = [{"skill_name": "Machine learning", "signal_type": "functionality",
+                  "summary": "seen in mod0" if "mod0.py" in content else "seen elsewhere",
+                  "confidence": 0.9 if "mod0.py" in content else 0.4}]
+        if "mod2.py" in content:
+            calls.append({"skill_name": "JavaScript", "signal_type": "interest", "summary": "js", "confidence": 0.5})
+        return calls
+
+    fake_anthropic.responder = responder
+    usage = {}
+    options = ExtractionOptions(chunked=True, max_chunks=4, chunk_tokens=250)
+    items = extract_repo_evidence("repo", str(tmp_path), usage=usage, options=options)
+
+    assert len(fake_anthropic.messages.calls) == 4  # capped by max_chunks
+    assert usage["chunks"] == 4
+    by_skill = {item.summary.split("]")[0][1:]: item for item in items}
+    assert set(by_skill) == {"Machine learning", "JavaScript"}
+    assert by_skill["Machine learning"].summary == "[Machine learning] seen in mod0"
+    ml_refs = by_skill["Machine learning"].source_ref.split("; ")
+    assert len(ml_refs) == 4 and ml_refs[0].endswith("mod0.py")
+    assert by_skill["JavaScript"].source_ref.endswith("mod2.py")
@@ -0,0 +1,25 @@
+def test_classifier_counts_hits_per_signal_in_batches():
+    from repo_mesh.classifier import KeywordClassifier
+
+    classifier = KeywordClassifier(
+        {"interest": ["health", "habit"], "functionality": ["api", "apis", "def "]},
+        {"interest": "i", "functionality": "f"},
+    )
+    counts = classifier.classify_many([
+        "Health HABIT tracker with a REST APIs layer",
+        "def a(): pass\ndef b(): pass",
+        "",
+    ])
+
+    assert counts[0] == {"interest": 2, "functionality": 1}
+    assert counts[1] == {"functionality": 2}
+    assert counts[2] == {}
+    assert classifier.ordered(counts[0]) == [("interest", 2), ("functionality", 1)]
+
+
+def test_default_classifier_matches_legacy_keyword_signals():
+    from repo_mesh.evidence import _classify_text
+
+    signals = [s for s, _ in _classify_text("We build APIs to support learning")]
+    assert signals == ["intention", "functionality", "interest"]
+    assert _classify_text("nothing relevant here") == []
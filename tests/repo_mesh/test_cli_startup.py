@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+# Cumulative import time of repo_mesh.cli, in microseconds (about 15 ms locally).
+IMPORT_BUDGET_US = 50_000
+HEAVY = ("yaml", "anthropic", "pandas", "asyncio", "repo_mesh.evidence", "repo_mesh.coordinator")
+
+
+def _importtime(*args: str) -> dict[str, int]:
+    """Module -> cumulative microseconds, parsed from `python -X importtime` stderr."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_cli_import_stays_within_budget_and_skips_heavy_dependencies():
+    runs = [_importtime("-c", "import repo_mesh.cli") for _ in range(3)]
+    assert min(run["repo_mesh.cli"] for run in runs) < IMPORT_BUDGET_US
+    assert not [name for name in runs[0] if name in HEAVY or name.split(".")[0] in HEAVY]
+
+
+def test_subcommand_help_does_not_load_the_pipeline():
+    for argv in (["--help"], ["watch", "--help"], ["repos", "--help"], ["provision", "--help"]):
+        loaded = _importtime("-m", "repo_mesh.cli", *argv)
+        assert not [name for name in loaded if name in HEAVY or name.split(".")[0] in HEAVY], argv
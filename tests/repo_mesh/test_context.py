@@ -0,0 +1,48 @@
+def test_rank_puts_readme_and_manifests_before_source_tests_and_ci(tmp_path):
+    from repo_mesh.context import rank_repo_files
+
+    files = {
+        ".github/workflows/ci.yml": "on: push",
+        "tests/test_app.py": "def test_x(): pass",
+        "pnpm-lock.yaml": "lockfileVersion: 9",
+        "src/utils.py": "def helper(): pass",
+        "src/main.py": "print('hi')",
+        "package.json": '{"dependencies": {"next": "15"}}',
+        "README.md": "# App",
+        "docs/guide.md": "Guide",
+    }
+    for rel, text in files.items():
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(text, encoding="utf-8")
+
+    ranked = [rel for _, _, rel in rank_repo_files(str(tmp_path), {".md", ".py", ".yml", ".yaml"})]
+
+    assert ranked[:3] == ["README.md", "package.json", "src/main.py"]
+    assert ranked.index("src/utils.py") < ranked.index("tests/test_app.py")
+    assert ranked[-2:] == ["pnpm-lock.yaml", ".github/workflows/ci.yml"]
+
+
+def test_collect_repo_text_packs_by_token_budget_and_stops_reading(tmp_path, monkeypatch):
+    from repo_mesh import context, evidence
+    from repo_mesh.context import estimate_tokens
+
+    (tmp_path / "README.md").write_text("# Project\nA habit tracker.", encoding="utf-8")
+    for i in range(50):
+        (tmp_path / f"f{i:02d}.md").write_text("word " * 1000, encoding="utf-8")
+    reads = []
+    real_read = context.extract_text
+    monkeypatch.setattr(context, "extract_text", lambda path, n: reads.append(path) or real_read(path, n))
+
+    text = evidence._collect_repo_text(str(tmp_path), token_budget=2000)
+
+    assert text.startswith("=== README.md ===")
+    assert estimate_tokens(text) <= 2000
+    assert len(reads) < 20
+
+
+def test_estimate_tokens_counts_symbols_and_splits_long_words():
+    from repo_mesh.context import estimate_tokens
+
+    assert estimate_tokens("def plan_day(tasks):") == 8
+    assert estimate_tokens("internationalization") == 4
+    assert estimate_tokens("") == 0
@@ -0,0 +1,38 @@
+import json
+import threading
+import time
+from repo_mesh.contracts import EvidenceItem
+
+
+def test_run_once_concurrent_keeps_order_and_isolates_failures(tmp_path, monkeypatch, repos_yaml):
+    from repo_mesh import coordinator
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_extract(repo_id, repo_path, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        try:
+            # later repos finish first so ordering is not an accident of timing
+            time.sleep(0.05 if repo_id == "r0" else 0.01)
+            if repo_id == "r2":
+                raise RuntimeError("model unavailable")
+            return [EvidenceItem(f"{repo_id}:0", repo_id, "functionality", f"[{repo_id} skill]", repo_path)]
+        finally:
+            with lock:
+                in_flight -= 1
+
+    monkeypatch.setattr(coordinator, "iter_repo_evidence", fake_extract)
+    repos_file = repos_yaml({repo_id: {} for repo_id in ["r0", "r1", "r2", "r3"]})
+    out_json = tmp_path / "profile.json"
+
+    coordinator.run_once(str(repos_file), str(out_json), max_workers=3)
+
+    payload = json.loads(out_json.read_text(encoding="utf-8"))
+    assert [p["repo_id"] for p in payload["profiles"]] == ["r0", "r1", "r3"]
+    assert payload["errors"] == [{"repo_id": "r2", "error": "RuntimeError: model unavailable"}]
+    assert 1 < peak <= 3
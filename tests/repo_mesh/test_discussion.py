@@ -26,3 +26,24 @@ def test_synthesize_profiles_builds_consensus_and_conflicts():
     assert "shared_intentions" in result
     assert "interest_map" in result
     assert "pipeline design" in result["shared_skills"]
+
+
+def test_synthesize_profiles_threshold_and_neighbors():
+    from repo_mesh.contracts import ConsensusOptions
+    from repo_mesh.discussion import synthesize_profiles
+
+    profiles = [
+        RepoProfile(repo_id="a", skills=["Python", "SQL", "Docker"]),
+        RepoProfile(repo_id="b", skills=["Python", "SQL"]),
+        RepoProfile(repo_id="c", skills=["Python", "React", "TypeScript", "CSS"]),
+        RepoProfile(repo_id="d", skills=["Rust"]),
+    ]
+    result = synthesize_profiles(profiles, ConsensusOptions(shared_threshold=3, neighbors=2))
+    assert result["shared_skills"] == ["Python"]
+
+    a = result["neighbors"]["a"]
+    assert [n["repo_id"] for n in a["similar"]] == ["b", "c"]
+    assert a["similar"][0] == {"repo_id": "b", "score": 0.6667, "shared": 2, "new_skills": 0}
+    assert [n["repo_id"] for n in a["complementary"]] == ["c", "b"]  # c adds 3 skills a lacks
+    assert result["neighbors"]["d"] == {"similar": [], "complementary": []}
+    assert "neighbors" not in synthesize_profiles(profiles)  # off by default
@@ -20,3 +20,35 @@ def test_extract_evidence_captures_intent_function_interest(tmp_path):
     assert "intention" in types
     assert "functionality" in types
     assert "interest" in types
+
+
+def test_fallback_evidence_is_aggregated_per_signal(tmp_path, monkeypatch):
+    from repo_mesh.evidence import _MAX_SOURCE_REFS, extract_repo_evidence
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+    for i in range(40):
+        (tmp_path / f"note{i}.md").write_text("This app helps users learn and build habits.\n", encoding="utf-8")
+
+    items = extract_repo_evidence("repo-a", str(tmp_path))
+    assert len(items) == len({item.signal_type for item in items}) <= 3
+    for item in items:
+        assert item.evidence_id == f"repo-a:{item.signal_type}"
+        assert item.occurrences == 40
+        assert item.weight >= 40
+        assert len(item.source_ref.split("; ")) == _MAX_SOURCE_REFS
+
+
+def test_compact_output_counts_evidence_instead_of_listing_ids(tmp_path, monkeypatch, repos_yaml):
+    import json
+    from repo_mesh.coordinator import run_once
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    repos_file = repos_yaml({"a": {"README.md": "This app helps users learn."}})
+    out = tmp_path / "out.json"
+    run_once(str(repos_file), str(out), use_cache=False, compact=True)
+    text = out.read_text()
+    assert "\n" not in text
+    profile = json.loads(text)["profiles"][0]
+    assert "evidence_ids" not in profile
+    assert profile["evidence_count"] > 0
@@ -0,0 +1,72 @@
+import json
+
+
+def _notebook(tmp_path, image_bytes=200_000):
+    cells = [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Churn model\n", "Quote \"here\", café \\ done"]},
+        {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {"tags": ["[x]"]},
+            "outputs": [{"output_type": "display_data", "data": {"image/png": "iVBOR" + "A" * image_bytes}}],
+            "source": "import pandas as pd\nfrom sklearn.ensemble import RandomForestClassifier",
+        },
+        {"cell_type": "raw", "metadata": {}, "source": "ignored raw cell"},
+        {"cell_type": "code", "metadata": {}, "outputs": [], "source": []},
+    ]
+    path = tmp_path / "analysis.ipynb"
+    path.write_text(json.dumps({"metadata": {"kernelspec": {"name": "python3"}}, "cells": cells, "nbformat": 4}, indent=1))
+    return path, cells
+
+
+def test_notebook_extractor_streams_cell_sources_and_drops_outputs(tmp_path, monkeypatch):
+    from repo_mesh import extractors
+
+    path, cells = _notebook(tmp_path)
+    expected = [("markdown", "".join(cells[0]["source"])), ("code", cells[1]["source"])]
+    for block in (7, 64, 4096):  # block edges land inside strings, escapes and keys
+        monkeypatch.setattr(extractors, "_BLOCK", block)
+        assert list(extractors.iter_notebook_cells(str(path))) == expected
+
+    text = extractors.extract_text(str(path), 3000)
+    assert text.startswith("# %% [markdown]\n# Churn model\nQuote \"here\", café \\ done\n# %%\nimport pandas")
+    assert "AAAA" not in text and "ignored raw cell" not in text
+    assert extractors.extract_text(str(path), 20) == "# %% [markdown]\n# Ch"
+    (tmp_path / "broken.ipynb").write_text("{not json", encoding="utf-8")
+    assert extractors.extract_text(str(tmp_path / "broken.ipynb"), 100) is None
+
+
+def test_manifest_extractors_list_dependency_names(tmp_path):
+    from repo_mesh.context import pack_context
+    from repo_mesh.extractors import extract_text
+
+    (tmp_path / "package.json").write_text(json.dumps({
+        "name": "web", "description": "Dashboard", "scripts": {"build": "next build"},
+        "dependencies": {"next": "14", "react": "^18"}, "devDependencies": {"typescript": "^5"},
+    }))
+    (tmp_path / "environment.yml").write_text(
+        "name: ds\ndependencies:\n  - python=3.11\n  - conda-forge::numpy>=1.26\n  - pip:\n    - torch==2.2\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "compose.yaml").write_text("services:\n  db:\n    image: postgres:16\n  api:\n    build: .\n")
+
+    assert extract_text(str(tmp_path / "package.json"), 1000) == (
+        "package.json manifest\nname: web\ndescription: Dashboard\n"
+        "dependencies: next, react\ndev dependencies: typescript"
+    )
+    assert extract_text(str(tmp_path / "environment.yml"), 1000) == (
+        "conda environment manifest\ndependencies: python, numpy\npip dependencies: torch"
+    )
+    window = pack_context(str(tmp_path), {".md"}, 1000, 4000)[0]
+    assert {f.rel_path for f in window.files} == {"package.json", "environment.yml", "compose.yaml"}
+    assert "services: db, api\nimages: postgres" in window.text
+
+
+def test_manifest_without_recognised_fields_keeps_its_raw_text(tmp_path):
+    from repo_mesh.extractors import extract_text
+
+    (tmp_path / "package.json").write_text('{"private": true, "workspaces": ["apps/*"]}')
+    (tmp_path / "environment.yml").write_text("channels:\n  - conda-forge\n", encoding="utf-8")
+
+    assert extract_text(str(tmp_path / "package.json"), 1000) == '{"private": true, "workspaces": ["apps/*"]}'
+    assert extract_text(str(tmp_path / "environment.yml"), 1000) == "channels:\n  - conda-forge\n"
@@ -0,0 +1,88 @@
+from repo_mesh.lexical import SkillMatcher, term_counts, terms
+from repo_mesh.skill_index import Skill, SkillIndex
+
+
+def _index():
+    skills = [
+        Skill("Machine learning", "AI", "hard", 90, 50, 80),
+        Skill("JavaScript", "Web", "hard", 80, 20, 60),
+        Skill("Node.js", "Web", "hard", 70, 30, 60),
+        Skill("Public speaking", "Communication", "soft", 50, 40, 50),
+    ]
+    return SkillIndex(skills, {"ml": "Machine learning"})
+
+
+def test_terms_keep_compounds_and_parts():
+    assert terms("Built on Node.js and CI/CD") == ["built", "on", "node.js", "node", "js", "and", "ci/cd", "ci", "cd"]
+
+
+def test_matcher_ranks_only_skills_sharing_terms():
+    matcher = SkillMatcher(_index())
+    counts = term_counts(["A machine learning pipeline. ml utils.", "server written for node.js"])
+    ranked = matcher.rank(counts, top_k=3)
+    names = [m.skill.name for m in ranked]
+    assert set(names[:2]) == {"Machine learning", "Node.js"}
+    assert "Public speaking" not in names
+    assert all(m.coverage == 1.0 for m in ranked[:2])
+
+
+def test_candidate_shortlist_goes_to_user_message_and_caps_others(tmp_path, fake_anthropic):
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.evidence import extract_repo_evidence
+
+    (tmp_path / "README.md").write_text("Machine learning notebooks written in Python.", encoding="utf-8")
+    fake_anthropic.responder = lambda params: [
+        {"skill_name": name, "signal_type": "functionality", "summary": name, "confidence": 0.8}
+        for name in ("Machine learning", "Python", "JavaScript", "React")
+    ]
+    options = ExtractionOptions(candidate_skills=5, other_skills=1)
+    items = extract_repo_evidence("repo", str(tmp_path), options=options)
+
+    params = fake_anthropic.messages.calls[0]
+    assert len(params["system"]) == 1 and "SKILL TAXONOMY" not in params["system"][0]["text"]
+    user = params["messages"][0]["content"]
+    assert "CANDIDATE SKILLS" in user and "- Machine learning" in user and "- Python" in user
+    names = [item.summary.split("]")[0][1:] for item in items]
+    assert "Machine learning" in names and "Python" in names
+    assert len(names) == 3  # one skill outside the shortlist allowed
+
+
+def test_candidate_mode_sends_whole_taxonomy_when_nothing_matches(tmp_path, fake_anthropic):
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.evidence import extract_repo_evidence
+
+    (tmp_path / "README.md").write_text("Qwxz vbnm plok.", encoding="utf-8")
+    fake_anthropic.responder = lambda params: [
+        {"skill_name": name, "signal_type": "functionality", "summary": name, "confidence": 0.8}
+        for name in ("Machine learning", "Python")
+    ]
+    items = extract_repo_evidence("repo", str(tmp_path), options=ExtractionOptions(candidate_skills=5, other_skills=0))
+
+    params = fake_anthropic.messages.calls[0]
+    assert any("SKILL TAXONOMY" in block["text"] for block in params["system"])
+    assert "CANDIDATE SKILLS" not in params["messages"][0]["content"]
+    assert len(items) == 2  # not capped by other_skills
+
+
+def test_taxonomy_change_invalidates_lexical_manifest_entries(tmp_path, monkeypatch):
+    from repo_mesh import evidence
+    from repo_mesh.contracts import ExtractionOptions, RepoProfile, RepoRegistration
+    from repo_mesh.manifest import RunManifest, load_manifest, save_manifest
+    from repo_mesh.skill_index import Skill, SkillIndex
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    options = ExtractionOptions(fallback="lexical")
+    monkeypatch.setattr(evidence, "get_skill_index", _index)
+    old = evidence.extractor_version(options)
+    keywords = evidence.extractor_version(ExtractionOptions())
+    repo = RepoRegistration("a", "a", "org/a", str(tmp_path))
+    manifest = RunManifest(old)
+    manifest.record(repo, "stat:x", RepoProfile("a", skills=["Machine learning"]))
+    save_manifest(str(tmp_path / "m.json"), manifest)
+
+    grown = SkillIndex([*_index().skills, Skill("Rust", "Systems", "hard", 60, 20, 40)])
+    monkeypatch.setattr(evidence, "get_skill_index", lambda: grown)
+    new = evidence.extractor_version(options)
+    assert new != old
+    assert load_manifest(str(tmp_path / "m.json"), new).reusable_profile(repo, "stat:x") is None
+    assert evidence.extractor_version(ExtractionOptions()) == keywords  # keyword matching ignores the taxonomy
@@ -0,0 +1,72 @@
+def test_extraction_reuses_client_and_puts_taxonomy_in_cached_prefix(tmp_path, fake_anthropic, monkeypatch):
+    from repo_mesh import evidence
+    from repo_mesh.evidence import extract_repo_evidence
+
+    monkeypatch.setattr(evidence, "_MIN_CACHEABLE_TOKENS", 0)  # the checked-in taxonomy is shorter than the minimum
+
+    usages = []
+    for name in ["a", "b"]:
+        repo = tmp_path / name
+        repo.mkdir()
+        (repo / "train.py").write_text(f"# {name}\nimport sklearn\n", encoding="utf-8")
+        usage = {}
+        extract_repo_evidence(name, str(repo), usage=usage)
+        usages.append(usage)
+
+    assert fake_anthropic.clients_created == 1
+    first, second = fake_anthropic.messages.calls
+    assert first["system"] == second["system"]
+    assert first["tools"] == second["tools"]
+    assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "SKILL TAXONOMY" in first["system"][-1]["text"]
+    assert "SKILL TAXONOMY" not in first["messages"][0]["content"]
+    assert usages[0]["cache_creation_input_tokens"] == 900
+    assert usages[1]["cache_read_input_tokens"] == 900
+    assert usages[1]["latency_ms"] >= 0
+
+
+def test_cache_breakpoint_only_on_a_cacheable_shared_prefix(monkeypatch):
+    from repo_mesh import evidence
+    from repo_mesh.skill_index import get_skill_index
+
+    index = get_skill_index()
+    candidates = [skill.name for skill in index][:3]
+
+    def breakpoints(params):
+        return [i for i, block in enumerate(params["system"]) if "cache_control" in block]
+
+    # candidates mode: only the short system prompt is shared, far below the model's minimum
+    params = evidence._build_extraction_request("r", "text", index, candidates)
+    assert breakpoints(params) == []
+    monkeypatch.setattr(evidence, "_MIN_CACHEABLE_TOKENS", 0)
+    params = evidence._build_extraction_request("r", "text", index, candidates)
+    assert breakpoints(params) == [len(params["system"]) - 1]  # after the system prompt, before the shortlist
+    assert "CANDIDATE SKILLS" in params["messages"][0]["content"]
+
+
+def test_streamed_extraction_yields_skills_before_the_response_ends(tmp_path, fake_anthropic):
+    from repo_mesh.contracts import ExtractionOptions
+    from repo_mesh.evidence import extract_repo_evidence, extractor_version, iter_repo_evidence
+    from repo_mesh.profile import ProfileAccumulator
+
+    fake_anthropic.responder = lambda kwargs: [
+        {"skill_name": "Machine learning", "signal_type": "functionality", "summary": "Trains", "confidence": 0.9},
+        {"skill_name": "Not A Real Skill", "signal_type": "functionality", "summary": "x", "confidence": 0.9},
+        {"skill_name": "Python", "signal_type": "functionality", "summary": "Scripts", "confidence": 0.8},
+        {"skill_name": "Machine learning", "signal_type": "functionality", "summary": "Again", "confidence": 0.5},
+    ]
+    (tmp_path / "train.py").write_text("import sklearn\n", encoding="utf-8")
+    usage = {}
+    stream = iter_repo_evidence("r", str(tmp_path), usage=usage, options=ExtractionOptions(stream=True))
+
+    first = next(stream)
+    assert first.summary == "[Machine learning] Trains"
+    assert usage == {}  # the final message has not been consumed yet
+    profile = ProfileAccumulator("r").extend([first, *stream]).build()
+
+    assert profile.skills == ["Machine learning", "Python"]
+    assert usage["output_tokens"] == 20
+    unstreamed = extract_repo_evidence("r", str(tmp_path))
+    assert {i.evidence_id for i in unstreamed} == set(profile.evidence_ids)
+    # first call wins when streamed, highest confidence otherwise: stored profiles must not mix the two
+    assert extractor_version(ExtractionOptions(stream=True)) != extractor_version(ExtractionOptions())
@@ -0,0 +1,89 @@
+import json
+import subprocess
+
+
+def test_repo_state_tracks_git_head_and_uncommitted_edits(tmp_path):
+    from repo_mesh.manifest import repo_state
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("x = 1\n", encoding="utf-8")
+    before = repo_state(str(repo))
+    assert before.startswith("stat:")
+    (repo / "a.py").write_text("x = 22\n", encoding="utf-8")
+    assert repo_state(str(repo)) != before
+
+    git = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], check=True)
+    sha = subprocess.run([*git, "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+    assert repo_state(str(repo)) == f"git:{sha}"
+    (repo / "a.py").write_text("x = 333\n", encoding="utf-8")
+    dirty = repo_state(str(repo))
+    assert dirty.startswith(f"git:{sha}:")
+    (repo / "a.py").write_text("x = 4444\n", encoding="utf-8")  # already dirty, edited again
+    assert repo_state(str(repo)) not in (dirty, f"git:{sha}")
+    (repo / "a.py").write_text("x = 22\n", encoding="utf-8")
+    (repo / "new.md").write_text("untracked\n", encoding="utf-8")
+    assert repo_state(str(repo)).startswith(f"git:{sha}:")
+
+
+def test_run_once_only_reprofiles_changed_repos(tmp_path, monkeypatch, repos_yaml):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    from repo_mesh import coordinator
+
+    calls = []
+    real_extract = coordinator.iter_repo_evidence
+
+    def counting_extract(repo_id, repo_path, **kwargs):
+        calls.append(repo_id)
+        return real_extract(repo_id, repo_path, **kwargs)
+
+    monkeypatch.setattr(coordinator, "iter_repo_evidence", counting_extract)
+    repos_file = repos_yaml({repo_id: {"README.md": "Build a learning pipeline"} for repo_id in ["a", "b"]})
+    out_json = tmp_path / "out" / "profile.json"
+
+    coordinator.run_once(str(repos_file), str(out_json))
+    first = json.loads(out_json.read_text(encoding="utf-8"))
+    assert sorted(calls) == ["a", "b"]
+
+    calls.clear()
+    coordinator.run_once(str(repos_file), str(out_json))
+    assert calls == []
+    assert json.loads(out_json.read_text(encoding="utf-8")) == first
+
+    (tmp_path / "b" / "notes.md").write_text("Tracking health habits", encoding="utf-8")
+    coordinator.run_once(str(repos_file), str(out_json))
+    assert calls == ["b"]
+    payload = json.loads(out_json.read_text(encoding="utf-8"))
+    assert [p["repo_id"] for p in payload["profiles"]] == ["a", "b"]
+
+
+def test_run_once_sees_uncommitted_edits_in_a_git_checkout(tmp_path, monkeypatch, repos_yaml):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    from repo_mesh import coordinator
+
+    calls = []
+    real_extract = coordinator.iter_repo_evidence
+
+    def counting_extract(repo_id, repo_path, **kwargs):
+        calls.append(repo_id)
+        return real_extract(repo_id, repo_path, **kwargs)
+
+    monkeypatch.setattr(coordinator, "iter_repo_evidence", counting_extract)
+    repos_file = repos_yaml({"a": {"README.md": "Build a learning pipeline"}})
+    git = ["git", "-C", str(tmp_path / "a"), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], check=True)
+    out_json = tmp_path / "profile.json"
+
+    coordinator.run_once(str(repos_file), str(out_json))
+    coordinator.run_once(str(repos_file), str(out_json))
+    assert calls == ["a"]
+
+    with open(tmp_path / "a" / "README.md", "a", encoding="utf-8") as fh:
+        fh.write("\nTracking health habits\n")
+    coordinator.run_once(str(repos_file), str(out_json))
+    assert calls == ["a", "a"]
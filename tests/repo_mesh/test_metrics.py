@@ -0,0 +1,40 @@
+import json
+
+
+def test_run_once_profile_reports_metrics_and_chrome_trace(tmp_path, monkeypatch, repos_yaml):
+    from repo_mesh import metrics
+    from repo_mesh.coordinator import run_once
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    repos_file = repos_yaml({
+        repo_id: {
+            "node_modules/lib.js": "module.exports = {}\n",
+            "README.md": "We build machine learning tools.\n",
+            "logo.png": b"\x89PNG\0",
+        }
+        for repo_id in ["a", "b"]
+    })
+    out, trace = tmp_path / "out.json", tmp_path / "trace.json"
+
+    run_once(str(repos_file), str(out), max_workers=2, use_cache=False, incremental=False,
+             profile=True, trace_path=str(trace))
+
+    report = json.loads(out.read_text())["metrics"]
+    assert {"repo_loader.load", "repo", "evidence.extract", "profile.build", "discussion.synthesize"} <= set(report["spans"])
+    assert report["spans"]["repo"]["count"] == 2
+    assert report["repos"]["a"]["files_scanned"] == 1
+    assert report["repos"]["a"]["files_skipped"] == 1
+    assert report["repos"]["a"]["bytes_read"] > 0
+    assert report["repos"]["b"]["latency_ms"] >= 0
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert {e["ph"] for e in events} == {"X"}
+    assert any(e.get("args", {}).get("repo") == "b" for e in events)
+    assert metrics.span("x") is metrics.span("y")  # disabled again: shared no-op
+
+
+def test_run_once_without_profile_has_no_metrics(tmp_path, monkeypatch, repos_yaml):
+    from repo_mesh.coordinator import run_once
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    run_once(str(repos_yaml({})), str(tmp_path / "out.json"), use_cache=False)
+    assert "metrics" not in json.loads((tmp_path / "out.json").read_text())
@@ -1,4 +1,5 @@
 from pathlib import Path
+import pytest
 import yaml
 
 
@@ -37,3 +38,78 @@ def test_load_selected_repos_returns_only_selected_and_read_only(tmp_path):
     repos = load_selected_repos(str(cfg))
     assert [r.repo_id for r in repos] == ["a"]
     assert repos[0].read_only is True
+
+
+def _git(*args, cwd=None):
+    import subprocess
+
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_provision_clones_sparse_shallow_checkouts_from_a_mirror_and_refreshes_them(tmp_path, monkeypatch):
+    from repo_mesh import repo_loader
+    from repo_mesh.repo_loader import load_selected_repos, provision_repos
+
+    mirrors = tmp_path / "mirrors"
+    registrations = []
+    for name in ["a", "b"]:
+        src = tmp_path / "src" / name
+        src.mkdir(parents=True)
+        _git("init", "-q", cwd=src)
+        (src / "app.py").write_text("print('v1')\n", encoding="utf-8")
+        (src / "blob.bin").write_bytes(b"\0" * 64)
+        _git("add", ".", cwd=src)
+        _git("commit", "-qm", "one", cwd=src)
+        (src / "README.md").write_text("# v2\n", encoding="utf-8")
+        _git("add", ".", cwd=src)
+        _git("commit", "-qm", "two", cwd=src)
+        _git("clone", "-q", "--mirror", str(src), str(mirrors / "org" / f"{name}.git"))
+        registrations.append({
+            "repo_id": name, "display_name": name, "github_full_name": f"org/{name}",
+            "local_path": str(tmp_path / "workspace" / name), "selected": True, "read_only": True,
+        })
+    cfg = tmp_path / "repos.yaml"
+    cfg.write_text(yaml.safe_dump({"repos": registrations}), encoding="utf-8")
+    monkeypatch.setattr(repo_loader, "assert_github_auth_present", lambda: pytest.fail("mirror clones need no GitHub auth"))
+
+    results = provision_repos(str(cfg), mirror_dir=str(mirrors), max_workers=2)
+
+    assert [(r.repo_id, r.action, r.error) for r in results] == [("a", "cloned", None), ("b", "cloned", None)]
+    checkout = tmp_path / "workspace" / "a"
+    assert (checkout / "app.py").exists() and (checkout / "README.md").exists()
+    assert not (checkout / "blob.bin").exists()  # not an extracted file type
+    assert (checkout / ".git" / "shallow").exists()
+    assert [r.repo_id for r in load_selected_repos(str(cfg))] == ["a", "b"]
+
+    src = tmp_path / "src" / "a"
+    (src / "new.py").write_text("x = 1\n", encoding="utf-8")
+    _git("add", ".", cwd=src)
+    _git("commit", "-qm", "three", cwd=src)
+    _git("push", "-q", str(mirrors / "org" / "a.git"), "HEAD", cwd=src)
+    results = provision_repos(str(cfg), mirror_dir=str(mirrors))
+    assert [r.action for r in results] == ["fetched", "fetched"]
+    assert (checkout / "new.py").exists()
+
+
+def test_provision_leaves_foreign_checkouts_alone_and_caches_the_auth_check(monkeypatch, repos_yaml):
+    import subprocess
+    from repo_mesh import repo_loader
+    from repo_mesh.repo_loader import assert_github_auth_present, provision_repos
+
+    cfg = repos_yaml({"mine": {}})
+    calls = []
+    real_run = subprocess.run
+
+    def fake_run(cmd, *args, **kwargs):
+        if cmd[0] == "gh":
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+        return real_run(cmd, *args, **kwargs)
+
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.setattr(repo_loader, "_AUTH_OK", False)
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    assert [r.action for r in provision_repos(str(cfg))] == ["present"]
+    assert_github_auth_present()
+    assert len(calls) == 1
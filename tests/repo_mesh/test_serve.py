@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _get(base, path, etag=None):
+    request = urllib.request.Request(base + path, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as resp:
+            return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers.get("ETag"), None
+
+
+def _write(path, profiles):
+    tmp = path.with_name(".tmp")
+    tmp.write_text(json.dumps({"repo_count": len(profiles), "profiles": profiles, "consensus": {}, "errors": []}))
+    os.replace(tmp, path)
+
+
+def test_serve_indexes_paginates_and_revalidates(tmp_path):
+    from repo_mesh.serve import make_server
+
+    out = tmp_path / "latest_profile.json"
+    _write(out, [
+        {"repo_id": f"r{i}", "skills": ["Python"] + (["React"] if i % 2 else []), "intentions": [],
+         "interests": ["education"], "evidence_ids": [f"r{i}:x"]}
+        for i in range(5)
+    ])
+    server = make_server(str(out), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        status, etag, body = _get(base, "/skills/react?limit=1")
+        assert status == 200 and body["value"] == "React"
+        assert body["items"] == ["r1"] and body["total"] == 2 and body["next_offset"] == 1
+        assert _get(base, "/skills/react?limit=1", etag)[0] == 304
+
+        status, _, body = _get(base, "/signals/functionality")
+        assert body["items"][0] == {"value": "Python", "repo_count": 5}
+        assert _get(base, "/repos/r3")[2] == {"repo_id": "r3", "skills": ["Python", "React"],
+                                              "intentions": [], "interests": ["education"]}
+        assert _get(base, "/repos/missing")[0] == 404
+
+        _write(out, [{"repo_id": "r9", "skills": ["React"], "intentions": [], "interests": [], "evidence_ids": []}])
+        os.utime(out, ns=(1, 1))  # distinct stat even on coarse-mtime filesystems
+        time.sleep(0.6)  # past the store's stat check interval
+        status, new_etag, body = _get(base, "/skills/react?limit=1", etag)
+        assert status == 200 and new_etag != etag and body["items"] == ["r9"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,70 @@
+import pytest
+
+TEXTS = [
+    "Build tools to help teams learn faster",
+    "def train(): pass  # machine learning pipeline for health habits",
+    "class Api: improve productivity with design systems",
+    "function render() {} learning support",
+    "plain notes",
+    "def api(): support learning and health",
+]
+
+
+def _workspace(repos_yaml):
+    repos = {f"r{i}": {"README.md": text} for i, text in enumerate(TEXTS)}
+    # "bad" fails extraction (see _failing); its error entry must land in the right place too
+    order = [*list(repos)[:3], "bad", *list(repos)[3:]]
+    return repos_yaml({repo_id: repos.get(repo_id, {"README.md": TEXTS[0]}) for repo_id in order})
+
+
+def _failing(monkeypatch):
+    from repo_mesh import coordinator
+
+    real = coordinator.iter_repo_evidence
+
+    def extract(repo_id, repo_path, **kwargs):
+        if repo_id == "bad":
+            raise RuntimeError("unreadable")
+        return real(repo_id, repo_path, **kwargs)
+
+    monkeypatch.setattr(coordinator, "iter_repo_evidence", extract)
+
+
+def test_sharded_runs_merge_byte_identical_to_a_single_run(tmp_path, monkeypatch, repos_yaml):
+    import json
+    from repo_mesh.cli import main
+    from repo_mesh.shard import in_shard
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    _failing(monkeypatch)
+    repos_file = _workspace(repos_yaml)
+
+    common = ["--repos", str(repos_file), "--no-cache", "--shared-threshold", "2", "--neighbors", "2", "--compact"]
+    main([*common, "--out", str(tmp_path / "single.json")])
+    partials = []
+    for i in (1, 2, 3):
+        partials.append(str(tmp_path / f"part{i}.json"))
+        main([*common, "--out", partials[-1], "--shard", f"{i}/3"])
+    main(["merge", *reversed(partials), "--out", str(tmp_path / "merged.json"),
+          "--shared-threshold", "2", "--neighbors", "2", "--compact"])
+
+    single = (tmp_path / "single.json").read_bytes()
+    assert (tmp_path / "merged.json").read_bytes() == single
+    assert json.loads(single)["errors"] == [{"repo_id": "bad", "error": "RuntimeError: unreadable"}]
+    repo_ids = ["r0", "r1", "r2", "bad", "r3", "r4", "r5"]
+    sizes = [sum(in_shard(r, (i, 3)) for r in repo_ids) for i in (1, 2, 3)]
+    assert sum(sizes) == len(repo_ids) and max(sizes) < len(repo_ids)  # a partition that actually splits
+
+
+def test_merge_rejects_an_incomplete_set_of_shards(tmp_path, monkeypatch, repos_yaml):
+    from repo_mesh.coordinator import run_once
+    from repo_mesh.shard import merge_partials, parse_shard
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    repos_file = _workspace(repos_yaml)
+    run_once(str(repos_file), str(tmp_path / "p1.json"), use_cache=False, shard=(1, 2))
+
+    with pytest.raises(ValueError, match="shards 1..2"):
+        merge_partials([str(tmp_path / "p1.json")])
+    with pytest.raises(ValueError):
+        parse_shard("3/2")
@@ -0,0 +1,40 @@
+import os
+
+HEADER = "skill,category,type,demand,scarcity,future_proof\n"
+
+
+def test_skill_index_lookups_and_prefix_search(tmp_path):
+    from repo_mesh.skill_index import get_skill_index
+
+    (tmp_path / "tech.csv").write_text(
+        HEADER + "JavaScript,Technology,hard,88,50,70\nJava,Technology,hard,80,40,60\nMachine learning,Technology,hard,93,60,70\n",
+        encoding="utf-8",
+    )
+    synonyms = tmp_path / "synonyms.yaml"
+    synonyms.write_text("JS: JavaScript\nML: Deep learning\n", encoding="utf-8")
+
+    index = get_skill_index(str(tmp_path), str(synonyms))
+
+    assert index.get("JavaScript").name == "JavaScript"
+    assert index.get("machine LEARNING").name == "Machine learning"
+    assert index.get("js").name == "JavaScript"
+    assert index.get("ML") is None  # canonical form not in the taxonomy
+    assert [s.name for s in index.search_prefix("jav")] == ["Java", "JavaScript"]
+
+
+def test_skill_index_is_cached_until_csv_changes(tmp_path):
+    from repo_mesh.skill_index import get_skill_index
+
+    csv_path = tmp_path / "tech.csv"
+    csv_path.write_text(HEADER + "Java,Technology,hard,80,40,60\n", encoding="utf-8")
+    synonyms = str(tmp_path / "missing.yaml")
+
+    first = get_skill_index(str(tmp_path), synonyms)
+    assert get_skill_index(str(tmp_path), synonyms) is first
+
+    csv_path.write_text(HEADER + "Java,Technology,hard,80,40,60\nRust,Technology,hard,70,80,90\n", encoding="utf-8")
+    os.utime(csv_path, ns=(1, 1))
+    second = get_skill_index(str(tmp_path), synonyms)
+    assert second is not first
+    assert "Rust" in second
+    assert second.version != first.version
@@ -0,0 +1,29 @@
+import os
+
+HEADER = "skill,category,type,demand,scarcity,future_proof\n"
+
+
+def test_snapshot_round_trips_and_detects_stale_sources(tmp_path):
+    from repo_mesh.skill_index import SkillIndex, _load_synonyms, _parse_csvs
+    from repo_mesh.skill_snapshot import build_snapshot, load_snapshot
+
+    by_category = tmp_path / "by_category"
+    by_category.mkdir()
+    csv_path = by_category / "tech.csv"
+    csv_path.write_text(HEADER + "JavaScript,Technology,hard,88.5,50,70\nFigma,Design,hard,70,40,60.25\n", encoding="utf-8")
+    synonyms = tmp_path / "synonyms.yaml"
+    synonyms.write_text("JS: JavaScript\n", encoding="utf-8")
+    snap = build_snapshot(str(by_category), str(synonyms), str(tmp_path / "taxonomy.snapshot"))
+
+    loaded = load_snapshot(snap, str(by_category), str(synonyms))
+    expected = SkillIndex(_parse_csvs(str(by_category)), _load_synonyms(str(synonyms)))
+    assert loaded.skills == expected.skills
+    assert loaded.version == expected.version
+    assert loaded.get("js").name == "JavaScript"
+
+    # same bytes, new mtime (e.g. a fresh checkout): still usable via the content digest
+    os.utime(csv_path, ns=(1, 1))
+    assert load_snapshot(snap, str(by_category), str(synonyms)) is not None
+
+    csv_path.write_text(HEADER + "Rust,Technology,hard,70,80,90\n", encoding="utf-8")
+    assert load_snapshot(snap, str(by_category), str(synonyms)) is None
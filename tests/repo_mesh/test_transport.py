@@ -0,0 +1,128 @@
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from repo_mesh.transport import TokenBucket, Transport, TransportError, TransportLimits
+
+
+class FakeModelServer:
+    """Local HTTP stand-in for the Messages API that injects throttling and latency."""
+
+    def __init__(self, throttle_first=0, retry_after="0.05", latency=0.0, slow_first=0, slow_latency=0.0):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttled_at = []
+        self.served_at = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with server.lock:
+                    server.hits += 1
+                    hit = server.hits
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if hit <= throttle_first:
+                        server.throttled_at.append(time.monotonic())
+                        self.send_response(429)
+                        self.send_header("retry-after", retry_after)
+                        self.end_headers()
+                        return
+                    time.sleep(slow_latency if hit <= throttle_first + slow_first else latency)
+                    body = json.dumps({"usage": {"input_tokens": 10, "output_tokens": 5}}).encode()
+                    server.served_at.append(time.monotonic())
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v1/messages"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def send(self, params, timeout):
+        request = urllib.request.Request(self.url, data=json.dumps(params).encode(), method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as resp:
+                usage = json.loads(resp.read())["usage"]
+        except urllib.error.HTTPError as exc:
+            raise TransportError.from_response(exc.code, exc.headers) from exc
+        except (socket.timeout, TimeoutError, urllib.error.URLError) as exc:
+            raise TransportError(str(exc)) from exc
+        return SimpleNamespace(usage=SimpleNamespace(**usage))
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**kwargs):
+        servers.append(FakeModelServer(**kwargs))
+        return servers[-1]
+
+    yield start
+    for s in servers:
+        s.httpd.shutdown()
+        s.httpd.server_close()
+
+
+def _params(i):
+    return {"model": "m", "max_tokens": 16, "messages": [{"role": "user", "content": f"repo {i}"}]}
+
+
+def test_transport_honors_retry_after_and_in_flight_cap(server):
+    fake = server(throttle_first=2, retry_after="0.2", latency=0.05)
+    transport = Transport(TransportLimits(requests_per_minute=0, max_in_flight=2), send=fake.send)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(lambda i: transport.create(_params(i)), range(6)))
+
+    assert all(r.usage.output_tokens == 5 for r in responses)
+    assert fake.max_in_flight <= 2
+    assert transport.stats()["retries"] == 2
+    # nobody was served until the server's retry-after window had passed
+    assert min(fake.served_at) - max(fake.throttled_at) >= 0.15
+
+
+def test_transport_retries_timeouts_then_gives_up_on_client_errors(server):
+    fake = server(slow_first=1, slow_latency=0.5)
+    transport = Transport(TransportLimits(timeout=0.1, backoff_base=0.01), send=fake.send)
+    assert transport.create(_params(0)).usage.input_tokens == 10
+    assert transport.stats()["retries"] == 1
+
+    def bad_request(params, timeout):
+        raise TransportError.from_response(400, {})
+
+    with pytest.raises(TransportError):
+        Transport(send=bad_request).create(_params(0))
+
+
+def test_token_bucket_queues_reservations_at_the_configured_rate():
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])  # one per second, burst of 60
+    assert [bucket.reserve(30), bucket.reserve(30)] == [0.0, 0.0]
+    assert bucket.reserve(3) == pytest.approx(3.0)
+    assert bucket.reserve(1) == pytest.approx(4.0)
+    now[0] = 10.0
+    bucket.settle(-10)  # refund unused estimate
+    assert bucket.reserve(10) == 0.0
@@ -0,0 +1,23 @@
+def test_walker_prunes_ignored_dirs_binaries_and_bounds_reads(tmp_path):
+    from repo_mesh.walker import iter_repo_files
+
+    (tmp_path / ".gitignore").write_text("generated/\n*.log\n/local.md\n", encoding="utf-8")
+    (tmp_path / "README.md").write_text("x" * 10_000, encoding="utf-8")
+    (tmp_path / "local.md").write_text("ignored at root", encoding="utf-8")
+    (tmp_path / "blob.txt").write_bytes(b"PK\x03\x04\x00\x00binary")
+    (tmp_path / "debug.log").write_text("noise", encoding="utf-8")
+    for denied in ["node_modules/pkg", ".next/server", "generated"]:
+        (tmp_path / denied).mkdir(parents=True)
+        (tmp_path / denied / "index.js").write_text("module.exports = 1", encoding="utf-8")
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / ".gitignore").write_text("*.md\n!keep.md\n", encoding="utf-8")
+    (src / "local.md").write_text("nested, ignored by src/.gitignore", encoding="utf-8")
+    (src / "keep.md").write_text("kept", encoding="utf-8")
+    (src / "app.ts").write_text("export const a = 1", encoding="utf-8")
+
+    files = list(iter_repo_files(str(tmp_path), {".md", ".ts", ".txt", ".js", ".log"}, max_chars=100))
+
+    assert [f.rel_path for f in files] == ["README.md", "src/app.ts", "src/keep.md"]
+    assert len(files[0].text) == 100
+
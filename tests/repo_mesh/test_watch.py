@@ -0,0 +1,103 @@
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.parametrize("backend", ["poll", pytest.param("inotify", marks=pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux only"))])
+def test_watch_reprofiles_only_changed_repos_after_debounce(tmp_path, monkeypatch, backend, repos_yaml):
+    from repo_mesh import coordinator
+    from repo_mesh.watch import watch
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    repos_file = repos_yaml({repo_id: {"README.md": "hello\n"} for repo_id in ["a", "b"]})
+    out = tmp_path / "a" / "latest_profile.json"  # output inside a watched repo must not retrigger
+
+    profiled = []
+    real_profile_repo = coordinator._profile_repo
+    monkeypatch.setattr("repo_mesh.watch._profile_repo",
+                        lambda repo, *a: profiled.append(repo.repo_id) or real_profile_repo(repo, *a))
+    updates = []
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(str(repos_file), str(out)), kwargs=dict(
+        debounce=0.2, backend=backend, poll_interval=0.05, use_cache=False, stop=stop, on_update=updates.append))
+    thread.start()
+    try:
+        assert _wait_for(lambda: out.exists())
+        time.sleep(0.2)
+        for i in range(5):  # one burst -> one refresh
+            (tmp_path / "b" / "README.md").write_text(f"Build tools to help teams learn faster {i}\n", encoding="utf-8")
+            time.sleep(0.02)
+        assert _wait_for(lambda: updates)
+        time.sleep(0.5)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert updates == [{"b"}]
+    assert profiled == ["b"]
+    payload = json.loads(out.read_text())
+    by_id = {p["repo_id"]: p for p in payload["profiles"]}
+    assert by_id["b"]["intentions"] or by_id["b"]["interests"]
+    assert not (by_id["a"]["intentions"] or by_id["a"]["interests"])
+    assert not list(out.parent.glob(".latest_profile.json.*"))
+
+
+def test_own_writes_inside_a_git_repo_do_not_change_its_state(tmp_path, monkeypatch, repos_yaml):
+    import subprocess
+    from repo_mesh import coordinator
+    from repo_mesh.watch import watch
+
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    repos_file = repos_yaml({"a": {"README.md": "Build tools to help teams learn\n"}})
+    git = ["git", "-C", str(tmp_path / "a"), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], check=True)
+    out = tmp_path / "a" / "out" / "latest_profile.json"  # output, manifest and cache all inside the repo
+    cache_dir = tmp_path / "a" / ".repo_mesh_cache"
+
+    calls = []
+    real_extract = coordinator.iter_repo_evidence
+    monkeypatch.setattr(coordinator, "iter_repo_evidence",
+                        lambda repo_id, *a, **kw: calls.append(repo_id) or real_extract(repo_id, *a, **kw))
+    updates = []
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(str(repos_file), str(out)), kwargs=dict(
+        debounce=0.1, backend="poll", poll_interval=0.05, cache_dir=str(cache_dir), stop=stop,
+        on_update=updates.append))
+    thread.start()
+    try:
+        assert _wait_for(lambda: out.exists())
+        time.sleep(0.5)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert updates == [] and calls == ["a"]
+    coordinator.run_once(str(repos_file), str(out), cache_dir=str(cache_dir))
+    assert calls == ["a"]  # restart reuses the stored profile
+
+
+def test_output_ignore_covers_own_files_and_git_internals(tmp_path):
+    from repo_mesh.manifest import output_ignore
+
+    ignore = output_ignore(str(tmp_path / "repo" / "profile.json"), str(tmp_path / "repo" / "cache"))
+    assert ignore(str(tmp_path / "repo" / "profile.json"))
+    assert ignore(str(tmp_path / "repo" / "profile.manifest.json"))
+    assert ignore(str(tmp_path / "repo" / ".profile.json.123.tmp"))
+    assert ignore(str(tmp_path / "repo" / "cache" / "ab" / "abcd.json"))
+    assert ignore(str(tmp_path / "repo" / ".git" / "index"))
+    assert not ignore(str(tmp_path / "repo" / "README.md"))
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_run_pipeline_help_does_not_import_pandas():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "research_v2.pipeline.run_pipeline", "--help"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    loaded = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    assert not {"pandas", "numpy"} & loaded